@@ -0,0 +1,41 @@
+"""Este es el router del modulo cache"""
+from typing import Literal, Optional
+from fastapi import APIRouter, Query
+from app.utils.cache_resultados import obtener_cache_resultados
+from app.repositorios.marcas_agua import (
+    llamar_almacen,
+    obtener_almacen_marcas
+)
+
+router = APIRouter()
+
+
+@router.delete("/v1/cache/resultados")
+async def invalidar_cache_resultados(
+    espacio: Optional[Literal[
+        "repositorios", "productividad",
+        "dependabots", "dependabots_organizacion"
+    ]] = Query(
+        None, description="Endpoint a invalidar (por defecto, todos)"
+    ),
+    usuario: Optional[str] = Query(
+        None,
+        description="Borrar también las marcas de agua de la clasificación "
+                    "incremental de este usuario"
+    )
+):
+    """
+    Endpoint que invalida la caché de resultados de un endpoint, o de
+    todos, para que la siguiente consulta se recalcule. Con ``usuario``
+    (y el espacio de repositorios, o todos) se borran además sus marcas
+    de agua, de modo que la siguiente clasificación incremental vuelve a
+    pedir todos los datos a GitHub.
+    """
+    respuesta = {
+        "invalidadas": obtener_cache_resultados().invalidar(espacio)
+    }
+    if usuario is not None and espacio in (None, "repositorios"):
+        respuesta["marcas_borradas"] = await llamar_almacen(
+            obtener_almacen_marcas(), "borrar", usuario
+        )
+    return respuesta
@@ -1,9 +1,21 @@
 """Este es el router del modulo dependabots"""
 from typing import Optional
 from fastapi import APIRouter, Query
+from config import Config
 from app.dependabots.dependabots_service import (
-    obtener_dependabots_solucionados_y_no_solucionados
+    documentos_dependabots,
+    iterar_dependabots_organizacion,
+    obtener_dependabots_solucionados_y_no_solucionados,
+    obtener_resumen_dependabots_organizacion
 )
+from app.utils.cache_resultados import obtener_cache_resultados
+from app.utils.errores_http import excepcion_http
+from app.elasticsearch.consultas_elasticsearch import (
+    ELASTIC_LECTURA_TAMANO_MAX,
+    leer_con_respaldo,
+    max_edad_lectura
+)
+from app.utils.streaming import respuesta_ndjson
 
 # Crear una instancia del router
 router = APIRouter()
@@ -26,12 +38,110 @@ async def get_dependabots(
     y rango de fechas.
     """
     # Llamar a la función que obtiene los datos
-    result = await obtener_dependabots_solucionados_y_no_solucionados(
-        repo_owner=repo_owner,
-        repo_name=repo_name,
-        start_date=start_date,
-        end_date=end_date
-    )
+    parametros = {
+        "repo_owner": repo_owner,
+        "repo_name": repo_name,
+        "start_date": start_date,
+        "end_date": end_date
+    }
+    try:
+        result = await obtener_cache_resultados().obtener_o_calcular(
+            "dependabots",
+            parametros,
+            lambda: obtener_dependabots_solucionados_y_no_solucionados(
+                **parametros
+            )
+        )
+    except Exception as e:
+        raise excepcion_http(e) from e
 
     # Devolver el resultado en formato JSON
     return result
+
+
+@router.get("/v1/dependabots/organizacion/{org}")
+async def get_dependabots_organizacion(
+    org: str,
+    state: Optional[str] = Query(
+        None, description="Estados separados por comas (por defecto, todos)"
+    ),
+    start_date: Optional[str] = Query(
+        None, description="Fecha de inicio en formato YYYY-MM-DD"
+    ),
+    end_date: Optional[str] = Query(
+        None, description="Fecha de fin en formato YYYY-MM-DD"
+    ),
+    detalle: bool = Query(
+        False, description="Enviar cada alerta en streaming (NDJSON)"
+    )
+):
+    """
+    Endpoint con el resumen de alertas de Dependabot de toda una
+    organización, agrupado por repositorio, severidad, paquete y estado.
+    Con ``detalle=true`` devuelve NDJSON: una línea por alerta y una
+    última línea con el resumen, o con ``{"tipo": "error"}`` si el
+    listado falla cuando ya se ha empezado a enviar.
+    """
+    try:
+        if detalle:
+            return await respuesta_ndjson(iterar_dependabots_organizacion(
+                org, state, start_date, end_date
+            ))
+
+        return await obtener_cache_resultados().obtener_o_calcular(
+            "dependabots_organizacion",
+            {"org": org, "state": state,
+             "start_date": start_date, "end_date": end_date},
+            lambda: obtener_resumen_dependabots_organizacion(
+                org, state, start_date, end_date
+            )
+        )
+    except Exception as e:
+        raise excepcion_http(e) from e
+
+
+@router.get("/v1/dependabots/indexados/{repo_owner}")
+async def get_dependabots_indexados(
+    repo_owner: str,
+    repo_name: Optional[str] = Query(
+        None, description="Repositorio (por defecto, todos los indexados)"
+    ),
+    start_date: Optional[str] = Query(
+        None, description="Fecha de inicio en formato YYYY-MM-DD"
+    ),
+    end_date: Optional[str] = Query(
+        None, description="Fecha de fin en formato YYYY-MM-DD"
+    ),
+    tamano: int = Query(
+        100, ge=1, le=ELASTIC_LECTURA_TAMANO_MAX,
+        description="Documentos por página"
+    ),
+    despues: Optional[str] = Query(
+        None, description="Valor 'siguiente' de la página anterior"
+    )
+):
+    """
+    Endpoint que lee desde Elasticsearch el último resumen de alertas de
+    Dependabot de cada repositorio del propietario, paginado por nombre.
+    Solo se usan los resúmenes del mismo rango de fechas: sin fechas, los
+    calculados sin filtrar. Si se indica un repositorio sin datos
+    recientes se consulta GitHub.
+    """
+    rango = {
+        "rango_fechas.desde": start_date, "rango_fechas.hasta": end_date
+    }
+    try:
+        return await leer_con_respaldo(
+            "github_dependabot_alerts", "repo",
+            {"repo_owner": repo_owner, "repo": repo_name, **rango},
+            lambda: documentos_dependabots(
+                repo_owner, repo_name, start_date, end_date
+            ),
+            tamano, despues,
+            max_edad=max_edad_lectura(
+                Config.PROGRAMADOR_INTERVALO_DEPENDABOTS
+            ),
+            ausentes=[campo for campo, valor in rango.items() if valor is None]
+        )
+    except Exception as e:
+        raise excepcion_http(e) from e
@@ -1,9 +1,69 @@
 """Este es el service del modulo dependabots"""
+import asyncio
 import sys
+from collections import Counter
 sys.path.append('.')
-from typing import Dict
-from app.utils.github_utils import get_dependabot_alerts
-from app.elasticsearch.conexion_elasticsearch import indexar_documento_elasticsearch
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from app.utils.github_utils import (
+    get_dependabot_alerts,
+    iterar_dependabot_alerts_organizacion,
+    GithubAPIException,
+    GithubLimiteUsoException
+)
+from app.elasticsearch.indexador_bulk import encolar_documento
+
+# Estados de las alertas que vamos a consultar
+ESTADOS = ["open", "dismissed", "fixed"]
+
+
+def _detalle_alerta(alerta: Dict) -> Dict:
+    """Campos de una alerta que se muestran en la tabla o gráfica."""
+    return {
+        "paquete": alerta.get(
+            "dependency", {}
+            ).get("package", {}).get("name"),
+        "estado": alerta.get("state"),
+        "severidad": alerta.get("security_advisory", {}).get("severity"),
+        "creado_en": alerta.get("created_at")
+    }
+
+
+async def _obtener_alertas_por_estado(
+    repo_owner: str,
+    repo_name: str,
+    start_date=None,
+    end_date=None
+) -> Tuple[List[Dict], List[str]]:
+    """
+    Pide a la vez las alertas de cada estado. Si un estado falla se
+    devuelven las de los demás junto con la lista de estados fallidos;
+    solo se propaga el error si fallan todos.
+    """
+    resultados = await asyncio.gather(*(
+        get_dependabot_alerts(
+            repo_owner, repo_name, state=estado,
+            start_date=start_date, end_date=end_date
+        )
+        for estado in ESTADOS
+    ), return_exceptions=True)
+
+    alertas = []
+    estados_fallidos = []
+    for estado, resultado in zip(ESTADOS, resultados):
+        if isinstance(resultado, GithubLimiteUsoException):
+            # Sin presupuesto el resultado no sería parcial sino inútil
+            raise resultado
+        if isinstance(resultado, GithubAPIException):
+            estados_fallidos.append(estado)
+        elif isinstance(resultado, BaseException):
+            raise resultado
+        else:
+            alertas.extend(resultado)
+
+    if len(estados_fallidos) == len(ESTADOS):
+        raise resultados[0]
+    return alertas, estados_fallidos
+
 
 async def obtener_dependabots_solucionados_y_no_solucionados(
     repo_owner: str,
@@ -20,33 +80,21 @@ async def obtener_dependabots_solucionados_y_no_solucionados(
     - Solucionadas: alertas con estado "fixed".
 
     Además, incluye la opción de filtrar por repositorio y rango de fechas.
+    Los estados se consultan en paralelo; los que fallen se indican en
+    ``estados_fallidos`` sin perder las alertas del resto.
     """
 
-    # Estados de las alertas que vamos a consultar
-    estados = ["open", "dismissed", "fixed"]
-    alertas = []
-
     # Obtener todas las alertas para los estados especificados
-    for estado in estados:
-        alertas_estado = await get_dependabot_alerts(
-            repo_owner, repo_name, state=estado,
-            start_date=start_date, end_date=end_date
-        )
-        alertas.extend(alertas_estado)
+    alertas, estados_fallidos = await _obtener_alertas_por_estado(
+        repo_owner, repo_name, start_date, end_date
+    )
 
     # Clasificar las alertas en solucionadas y no solucionadas
     no_solucionadas = []
     solucionadas = []
 
     for alerta in alertas:
-        detalle_alerta = {
-            "paquete": alerta.get(
-                "dependency", {}
-                ).get("package", {}).get("name"),
-            "estado": alerta.get("state"),
-            "severidad": alerta.get("security_advisory", {}).get("severity"),
-            "creado_en": alerta.get("created_at")
-        }
+        detalle_alerta = _detalle_alerta(alerta)
 
         # Clasificación de la alerta según su estado
         if alerta["state"] in ["open", "dismissed"]:
@@ -55,6 +103,7 @@ async def obtener_dependabots_solucionados_y_no_solucionados(
             solucionadas.append(detalle_alerta)
 
     documento = {
+        "repo_owner": repo_owner,
         "repo": repo_name,
         "rango_fechas": {"desde": start_date, "hasta": end_date},
         "total_alertas": len(alertas),
@@ -62,9 +111,10 @@ async def obtener_dependabots_solucionados_y_no_solucionados(
         "total_solucionadas": len(solucionadas),
         "no_solucionadas": no_solucionadas,
         "solucionadas": solucionadas,
+        "estados_fallidos": estados_fallidos,
     }
-        # Indexar el documento en Elasticsearch
-    await indexar_documento_elasticsearch("github_dependabot_alerts", documento)
+    # Encolar el documento para indexarlo en lote en Elasticsearch
+    await encolar_documento("github_dependabot_alerts", documento)
 
     # Resumen con los totales
     return {
@@ -75,4 +125,110 @@ async def obtener_dependabots_solucionados_y_no_solucionados(
         "total_solucionadas": len(solucionadas),
         "no_solucionadas": no_solucionadas,
         "solucionadas": solucionadas,
-        }
\ No newline at end of file
+        "estados_fallidos": estados_fallidos,
+        }
+
+
+async def documentos_dependabots(
+    repo_owner: str,
+    repo_name: Optional[str],
+    start_date=None,
+    end_date=None
+) -> List[Dict]:
+    """
+    Consulta en vivo las alertas del repositorio y las devuelve con el
+    formato de los documentos del índice ``github_dependabot_alerts``.
+    Sin repositorio no se puede consultar en vivo y se devuelve vacío.
+    """
+    if repo_name is None:
+        return []
+    resultado = await obtener_dependabots_solucionados_y_no_solucionados(
+        repo_owner, repo_name, start_date, end_date
+    )
+    return [{"repo_owner": repo_owner, **resultado}]
+
+
+class ResumenAlertas:
+    """
+    Cuenta las alertas por repositorio, severidad, paquete y estado a
+    medida que llegan, sin guardar las alertas en memoria.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.por_repositorio = Counter()
+        self.por_severidad = Counter()
+        self.por_paquete = Counter()
+        self.por_estado = Counter()
+
+    def agregar(self, alerta: Dict) -> Dict:
+        """Suma una alerta a los contadores y devuelve su detalle."""
+        detalle = _detalle_alerta(alerta)
+        detalle["repo"] = alerta.get("repository", {}).get("name")
+
+        self.total += 1
+        self.por_repositorio[detalle["repo"]] += 1
+        self.por_severidad[detalle["severidad"]] += 1
+        self.por_paquete[detalle["paquete"]] += 1
+        self.por_estado[detalle["estado"]] += 1
+        return detalle
+
+    def resultado(self) -> Dict:
+        """Totales acumulados hasta el momento."""
+        return {
+            "total_alertas": self.total,
+            "por_repositorio": dict(self.por_repositorio),
+            "por_severidad": dict(self.por_severidad),
+            "por_paquete": dict(self.por_paquete),
+            "por_estado": dict(self.por_estado),
+        }
+
+
+async def iterar_dependabots_organizacion(
+    org: str,
+    state: Optional[str] = None,
+    start_date=None,
+    end_date=None
+) -> AsyncIterator[Dict]:
+    """
+    Recorre las alertas de Dependabot de una organización con el listado
+    de organización de GitHub (una sola secuencia paginada en lugar de
+    tres consultas por repositorio).
+
+    Produce un registro ``{"tipo": "alerta", ...}`` por alerta y, al final,
+    un registro ``{"tipo": "resumen", ...}`` con los totales, que también
+    se indexa en Elasticsearch.
+    """
+    resumen = ResumenAlertas()
+    async for alerta in iterar_dependabot_alerts_organizacion(
+        org, state=state, start_date=start_date, end_date=end_date
+    ):
+        yield {"tipo": "alerta", **resumen.agregar(alerta)}
+
+    documento = {
+        "org": org,
+        "state": state,
+        "rango_fechas": {"desde": start_date, "hasta": end_date},
+        **resumen.resultado(),
+    }
+    # Encolar el documento para indexarlo en lote en Elasticsearch
+    await encolar_documento("github_dependabot_organizacion", dict(documento))
+
+    yield {"tipo": "resumen", **documento}
+
+
+async def obtener_resumen_dependabots_organizacion(
+    org: str,
+    state: Optional[str] = None,
+    start_date=None,
+    end_date=None
+) -> Dict:
+    """Devuelve solo el resumen de alertas de Dependabot de la organización."""
+    resumen = {}
+    async for registro in iterar_dependabots_organizacion(
+        org, state, start_date, end_date
+    ):
+        if registro["tipo"] == "resumen":
+            resumen = registro
+    resumen.pop("tipo", None)
+    return resumen
@@ -1,9 +1,23 @@
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
-from elasticsearch import Elasticsearch
-from typing import Dict
+from elasticsearch import AsyncElasticsearch
+from typing import Dict, Optional
 from datetime import datetime, timezone
 import logging
+from app.elasticsearch.plantillas_elasticsearch import (
+    id_documento,
+    instalar_plantillas
+)
+from app.elasticsearch.interruptor_circuito import InterruptorCircuito
+from app.elasticsearch.spool_elasticsearch import obtener_spool
+from app.elasticsearch.indices_elasticsearch import (
+    ELASTIC_INTERVALO_RETENCION,
+    aplicar_retencion,
+    detectar_heredados,
+    indice_escritura
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -11,22 +25,145 @@ logger.setLevel(logging.INFO)
 # Cargar las variables de entorno desde el archivo .env
 load_dotenv()
 
-ELASTIC_HOST = os.getenv("ELASTIC_HOST")
-ELASTIC_PORT = int(os.getenv("ELASTIC_PORT"))
-ELASTIC_SCHEME = os.getenv("ELASTIC_SCHEME")
+ELASTIC_HOST = os.getenv("ELASTIC_HOST", "localhost")
+ELASTIC_PORT = int(os.getenv("ELASTIC_PORT", "9200"))
+ELASTIC_SCHEME = os.getenv("ELASTIC_SCHEME", "http")
 ELASTIC_USER = os.getenv("ELASTIC_USER")
 ELASTIC_PASSWORD = os.getenv("ELASTIC_PASSWORD")
 
-# Conexión a Elasticsearch
-es = Elasticsearch(
-    [{'host': ELASTIC_HOST, 'port': ELASTIC_PORT, 'scheme': ELASTIC_SCHEME}],
-    basic_auth=(ELASTIC_USER, ELASTIC_PASSWORD), #Establecer la autenticación básica
-)  
+# Pool de conexiones y tiempos del cliente asíncrono
+ELASTIC_CONEXIONES_POR_NODO = int(os.getenv("ELASTIC_CONEXIONES_POR_NODO", "10"))
+ELASTIC_TIMEOUT = float(os.getenv("ELASTIC_TIMEOUT", "10"))
+ELASTIC_NODE_CLASS = os.getenv("ELASTIC_NODE_CLASS", "httpxasync")
+# Segundos entre comprobaciones de salud en segundo plano
+ELASTIC_INTERVALO_SALUD = float(os.getenv("ELASTIC_INTERVALO_SALUD", "30"))
+# Fallos seguidos que abren el interruptor y segundos que permanece abierto
+ELASTIC_UMBRAL_FALLOS = int(os.getenv("ELASTIC_UMBRAL_FALLOS", "5"))
+ELASTIC_TIEMPO_APERTURA = float(os.getenv("ELASTIC_TIEMPO_APERTURA", "30"))
 
-if es.ping():
-    logger.info("Conexión exitosa con Elasticsearch")
-else:
-    logger.error("Error al conectar con Elasticsearch")
+# Cliente compartido; se crea la primera vez que se necesita
+es: Optional[AsyncElasticsearch] = None
+
+# None mientras no se haya comprobado; False activa el modo degradado
+_disponible: Optional[bool] = None
+_tarea_salud: Optional[asyncio.Task] = None
+_plantillas_instaladas = False
+
+# Deja de intentar llamadas al clúster tras varios fallos seguidos
+interruptor = InterruptorCircuito(ELASTIC_UMBRAL_FALLOS, ELASTIC_TIEMPO_APERTURA)
+_ultima_retencion: Optional[float] = None
+
+
+def crear_cliente() -> AsyncElasticsearch:
+    """Crea el cliente asíncrono sin hacer ninguna petición de red."""
+    basic_auth = None
+    if ELASTIC_USER and ELASTIC_PASSWORD:
+        basic_auth = (ELASTIC_USER, ELASTIC_PASSWORD) #Establecer la autenticación básica
+    return AsyncElasticsearch(
+        [{'host': ELASTIC_HOST, 'port': ELASTIC_PORT, 'scheme': ELASTIC_SCHEME}],
+        basic_auth=basic_auth,
+        node_class=ELASTIC_NODE_CLASS,
+        connections_per_node=ELASTIC_CONEXIONES_POR_NODO,
+        request_timeout=ELASTIC_TIMEOUT,
+    )
+
+
+def obtener_es() -> AsyncElasticsearch:
+    """Devuelve el cliente compartido, creándolo si aún no existe."""
+    global es
+    if es is None:
+        es = crear_cliente()
+    return es
+
+
+def esta_disponible() -> bool:
+    """
+    Indica si el clúster se puede usar (o aún no se ha comprobado) y el
+    interruptor de circuito no está abierto.
+    """
+    return _disponible is not False and interruptor.permite()
+
+
+def registrar_exito():
+    """Anota una llamada correcta al clúster (cierra el interruptor)."""
+    interruptor.registrar_exito()
+
+
+def registrar_fallo():
+    """Anota una llamada fallida al clúster."""
+    interruptor.registrar_fallo()
+
+
+async def comprobar_salud() -> bool:
+    """Hace un ping al clúster y actualiza el modo degradado."""
+    global _disponible
+    try:
+        ok = await obtener_es().ping()
+    except Exception:
+        ok = False
+
+    if ok and _disponible is not True:
+        logger.info("Conexión exitosa con Elasticsearch")
+    elif not ok and _disponible is not False:
+        logger.error(
+            "Error al conectar con Elasticsearch; se pasa a modo degradado"
+        )
+    _disponible = ok
+    if ok:
+        registrar_exito()
+        await _asegurar_plantillas()
+    return ok
+
+
+async def _asegurar_plantillas():
+    """Instala las plantillas de índice la primera vez que hay clúster."""
+    global _plantillas_instaladas
+    if not _plantillas_instaladas:
+        instaladas = await instalar_plantillas(obtener_es())
+        await detectar_heredados(obtener_es())
+        _plantillas_instaladas = instaladas > 0
+
+
+async def _aplicar_retencion_si_toca():
+    """Borra los índices caducados como mucho una vez por intervalo."""
+    global _ultima_retencion
+    ahora = time.monotonic()
+    if (_ultima_retencion is None
+            or ahora - _ultima_retencion >= ELASTIC_INTERVALO_RETENCION):
+        _ultima_retencion = ahora
+        await aplicar_retencion(obtener_es())
+
+
+async def _vigilar_salud():
+    """Comprueba la salud del clúster periódicamente."""
+    while True:
+        if await comprobar_salud():
+            await _aplicar_retencion_si_toca()
+        await asyncio.sleep(ELASTIC_INTERVALO_SALUD)
+
+
+async def iniciar_elasticsearch():
+    """
+    Crea el cliente y lanza las comprobaciones de salud en segundo plano
+    (se llama desde el lifespan de FastAPI). No bloquea el arranque si el
+    clúster no responde.
+    """
+    global _tarea_salud
+    obtener_es()
+    if _tarea_salud is None:
+        _tarea_salud = asyncio.create_task(_vigilar_salud())
+
+
+async def cerrar_elasticsearch():
+    """Detiene las comprobaciones de salud y cierra el cliente."""
+    global es, _tarea_salud, _disponible
+    if _tarea_salud is not None:
+        _tarea_salud.cancel()
+        _tarea_salud = None
+    if es is not None:
+        await es.close()
+        es = None
+    _disponible = None
 
 
 # Función para indexar un documento
@@ -40,13 +177,29 @@ async def indexar_documento_elasticsearch(index_name: str, documento: Dict):
     
     Returns:
         dict: Respuesta de Elasticsearch con los detalles de la operación.
+
+    Si el clúster no está disponible o falla, el documento se guarda en el
+    spool local y el indexador en lote lo reenvía cuando se recupera.
     """
+    # Agregar un timestamp al documento
+    documento["timestamp"] = datetime.now(timezone.utc).isoformat()
+
+    if not esta_disponible():
+        # Modo degradado: no se paga el timeout de conexión
+        return await _guardar_en_spool(
+            index_name, documento, "Elasticsearch no disponible"
+        )
+
     try:
-        # Agregar un timestamp al documento
-        documento["timestamp"] = datetime.now(timezone.utc).isoformat()
 
-        # Indexar el documento
-        response = es.index(index=index_name, document=documento)
+        # Indexar el documento con un id determinista (upsert por día)
+        response = await obtener_es().index(
+            index=indice_escritura(index_name, documento),
+            id=id_documento(index_name, documento),
+            document=documento
+        )
+
+        registrar_exito()
 
         # Validar la respuesta
         if response.get("result") in ["created", "updated"]:
@@ -58,4 +211,14 @@ async def indexar_documento_elasticsearch(index_name: str, documento: Dict):
 
     except Exception as e:
         logger.error(f"Error al indexar el documento en Elasticsearch: {e}", exc_info=True)
-        return {"error": str(e)}
\ No newline at end of file
+        registrar_fallo()
+        return await _guardar_en_spool(index_name, documento, str(e))
+
+
+async def _guardar_en_spool(index_name: str, documento: Dict, error: str):
+    """Guarda el documento en el spool local para reenviarlo más tarde."""
+    spool = obtener_spool()
+    guardado = spool is not None and await asyncio.to_thread(
+        spool.escribir, [(index_name, documento)]
+    ) > 0
+    return {"error": error, "spool": guardado}
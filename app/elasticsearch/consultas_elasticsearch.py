@@ -0,0 +1,193 @@
+"""Lecturas desde Elasticsearch con respaldo en vivo contra GitHub."""
+import logging
+import os
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+from app.elasticsearch import conexion_elasticsearch
+from app.elasticsearch.plantillas_elasticsearch import valor_campo
+
+logger = logging.getLogger(__name__)
+
+# Antigüedad máxima (segundos) de los documentos que se sirven desde el
+# índice; si no hay ninguno más reciente se consulta GitHub. Sin fijarla,
+# cada lectura usa el intervalo del programador que refresca sus datos
+# más ELASTIC_LECTURA_MARGEN, para que no caduquen antes del refresco
+_MAX_EDAD = os.getenv("ELASTIC_LECTURA_MAX_EDAD")
+ELASTIC_LECTURA_MAX_EDAD = float(_MAX_EDAD) if _MAX_EDAD else None
+ELASTIC_LECTURA_MARGEN = float(os.getenv("ELASTIC_LECTURA_MARGEN", "900"))
+# Antigüedad máxima de las lecturas que no indican intervalo
+ELASTIC_LECTURA_MAX_EDAD_DEFECTO = 3600.0
+
+# Máximo de documentos por página en las lecturas
+ELASTIC_LECTURA_TAMANO_MAX = 1000
+
+
+def max_edad_lectura(intervalo: float) -> float:
+    """
+    Antigüedad máxima de los documentos que el programador refresca cada
+    ``intervalo`` segundos (ELASTIC_LECTURA_MAX_EDAD si está fijada).
+    """
+    if ELASTIC_LECTURA_MAX_EDAD is not None:
+        return ELASTIC_LECTURA_MAX_EDAD
+    return intervalo + ELASTIC_LECTURA_MARGEN
+
+
+def _cumple_filtros(
+    documento: Dict, filtros: Dict[str, Any], ausentes: Sequence[str]
+) -> bool:
+    """Aplica en memoria los mismos filtros que ``consultar_indice``."""
+    return all(
+        valor is None or valor_campo(documento, campo) == valor
+        for campo, valor in filtros.items()
+    ) and all(valor_campo(documento, campo) is None for campo in ausentes)
+
+
+def paginar_documentos(
+    documentos: List[Dict],
+    campo_grupo: str,
+    tamano: int,
+    despues: Optional[str] = None,
+    agregaciones: Sequence[str] = ()
+) -> Dict:
+    """
+    Ordena, pagina y agrega en memoria unos documentos con el mismo
+    formato de respuesta que ``consultar_indice``.
+    """
+    ordenados = sorted(documentos, key=lambda doc: doc[campo_grupo])
+    resumen = {
+        campo: dict(Counter(doc.get(campo) for doc in ordenados))
+        for campo in agregaciones
+    }
+    if despues is not None:
+        ordenados = [doc for doc in ordenados if doc[campo_grupo] > despues]
+    pagina = ordenados[:tamano]
+    return {
+        "total": len(documentos),
+        "documentos": pagina,
+        "siguiente": (
+            pagina[-1][campo_grupo] if len(ordenados) > tamano else None
+        ),
+        "agregaciones": resumen,
+    }
+
+
+async def consultar_indice(
+    index: str,
+    campo_grupo: str,
+    filtros: Dict[str, Any],
+    tamano: int,
+    despues: Optional[str] = None,
+    agregaciones: Sequence[str] = (),
+    max_edad: float = None,
+    ausentes: Sequence[str] = ()
+) -> Optional[Dict]:
+    """
+    Devuelve el documento más reciente de cada ``campo_grupo`` (un
+    repositorio, un usuario...) que cumpla los filtros, no tenga valor en
+    los campos ``ausentes`` y tenga menos de ``max_edad`` segundos,
+    paginado con ``search_after`` por ``campo_grupo``. Las agregaciones
+    cuentan grupos distintos por valor.
+
+    ``index`` es el alias que agrupa los índices de todos los periodos.
+    Devuelve None si Elasticsearch no está disponible, falla o no tiene
+    datos recientes, para que el llamador recurra a GitHub.
+    """
+    if not conexion_elasticsearch.esta_disponible():
+        return None
+    if max_edad is None:
+        max_edad = (
+            ELASTIC_LECTURA_MAX_EDAD if ELASTIC_LECTURA_MAX_EDAD is not None
+            else ELASTIC_LECTURA_MAX_EDAD_DEFECTO
+        )
+    # Los campos de filtro y agrupación son keyword en las plantillas
+    grupo = campo_grupo
+
+    consulta = {"bool": {
+        "filter": [
+            {"range": {"timestamp": {"gte": f"now-{int(max_edad)}s"}}},
+            *(
+                {"term": {campo: valor}}
+                for campo, valor in filtros.items() if valor is not None
+            ),
+        ],
+        "must_not": [{"exists": {"field": campo}} for campo in ausentes],
+    }}
+    aggs = {"total": {"cardinality": {"field": grupo}}}
+    for campo in agregaciones:
+        aggs[campo] = {
+            "terms": {"field": campo},
+            "aggs": {"grupos": {"cardinality": {"field": grupo}}},
+        }
+
+    try:
+        respuesta = await conexion_elasticsearch.obtener_es().search(
+            index=index,
+            query=consulta,
+            size=tamano,
+            sort=[{grupo: "asc"}],
+            collapse={"field": grupo, "inner_hits": {
+                "name": "ultimo", "size": 1,
+                "sort": [{"timestamp": "desc"}],
+            }},
+            search_after=[despues] if despues is not None else None,
+            aggs=aggs,
+            ignore_unavailable=True,
+        )
+    except Exception as e:
+        logger.warning(f"No se pudo consultar {index}: {e}")
+        return None
+
+    total = respuesta["aggregations"]["total"]["value"]
+    if not total:
+        return None
+    hits = respuesta["hits"]["hits"]
+    return {
+        "total": total,
+        "documentos": [
+            hit["inner_hits"]["ultimo"]["hits"]["hits"][0]["_source"]
+            for hit in hits
+        ],
+        "siguiente": hits[-1]["sort"][0] if len(hits) == tamano else None,
+        "agregaciones": {
+            campo: {
+                cubo["key"]: cubo["grupos"]["value"]
+                for cubo in respuesta["aggregations"][campo]["buckets"]
+            }
+            for campo in agregaciones
+        },
+    }
+
+
+async def leer_con_respaldo(
+    index: str,
+    campo_grupo: str,
+    filtros: Dict[str, Any],
+    en_vivo: Callable[[], Awaitable[List[Dict]]],
+    tamano: int,
+    despues: Optional[str] = None,
+    agregaciones: Sequence[str] = (),
+    max_edad: float = None,
+    ausentes: Sequence[str] = ()
+) -> Dict:
+    """
+    Lee del índice y, si no hay datos recientes, calcula los documentos en
+    vivo con ``en_vivo`` (que además los indexa) y los pagina en memoria.
+    El campo ``fuente`` indica de dónde salen los datos.
+    """
+    resultado = await consultar_indice(
+        index, campo_grupo, filtros, tamano, despues, agregaciones,
+        max_edad, ausentes
+    )
+    if resultado is not None:
+        return {"fuente": "elasticsearch", **resultado}
+
+    documentos = [
+        doc for doc in await en_vivo()
+        if _cumple_filtros(doc, filtros, ausentes)
+    ]
+    return {
+        "fuente": "github",
+        **paginar_documentos(
+            documentos, campo_grupo, tamano, despues, agregaciones
+        ),
+    }
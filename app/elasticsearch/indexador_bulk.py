@@ -0,0 +1,269 @@
+"""Indexador en lote para Elasticsearch usando la API _bulk."""
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from app.elasticsearch import conexion_elasticsearch
+from app.elasticsearch.plantillas_elasticsearch import id_documento
+from app.elasticsearch.indices_elasticsearch import indice_escritura
+from app.elasticsearch.spool_elasticsearch import SpoolDisco, obtener_spool
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Cargar las variables de entorno desde el archivo .env
+load_dotenv()
+
+# Umbrales de envío del lote: documentos, bytes y segundos
+BULK_MAX_DOCUMENTOS = int(os.getenv("ELASTIC_BULK_MAX_DOCUMENTOS", "500"))
+BULK_MAX_BYTES = int(os.getenv("ELASTIC_BULK_MAX_BYTES", str(5 * 1024 * 1024)))
+BULK_INTERVALO = float(os.getenv("ELASTIC_BULK_INTERVALO", "2"))
+# Tamaño de la cola; al llenarse, encolar espera (contrapresión)
+BULK_MAX_COLA = int(os.getenv("ELASTIC_BULK_MAX_COLA", "10000"))
+
+_FIN = object()
+
+
+class IndexadorBulk:
+    """
+    Acumula documentos en una cola y los envía a Elasticsearch en lotes
+    desde una tarea en segundo plano, de modo que las peticiones HTTP no
+    esperan a la indexación. Un lote se envía al alcanzar el número de
+    documentos, el tamaño en bytes o el intervalo máximo, lo que ocurra
+    antes. Los errores de cada documento se registran por separado.
+
+    Si Elasticsearch no está disponible los lotes van al spool en disco y,
+    cuando se recupera, se reenvían en orden antes que los nuevos (que
+    mientras tanto también pasan por el spool). Los ids deterministas
+    hacen que reenviar dos veces un lote no duplique documentos.
+    """
+
+    def __init__(
+        self,
+        cliente: Optional[Callable] = None,
+        max_documentos: int = BULK_MAX_DOCUMENTOS,
+        max_bytes: int = BULK_MAX_BYTES,
+        intervalo: float = BULK_INTERVALO,
+        max_cola: int = BULK_MAX_COLA,
+        spool: Optional[SpoolDisco] = None
+    ):
+        self._cliente = cliente or conexion_elasticsearch.obtener_es
+        self._spool = spool if spool is not None else obtener_spool()
+        self.max_documentos = max_documentos
+        self.max_bytes = max_bytes
+        self.intervalo = intervalo
+        self._cola: asyncio.Queue = asyncio.Queue(maxsize=max_cola)
+        self._tarea: Optional[asyncio.Task] = None
+        self.indexados = 0
+        self.errores = 0
+        self.en_spool = 0
+        self.reenviados = 0
+        self.errores_recientes: deque = deque(maxlen=100)
+
+    @property
+    def activo(self) -> bool:
+        """Indica si la tarea en segundo plano está en marcha."""
+        return self._tarea is not None and not self._tarea.done()
+
+    def iniciar(self):
+        """Arranca la tarea que envía los lotes."""
+        if not self.activo:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self):
+        """Envía lo pendiente y detiene la tarea en segundo plano."""
+        if self.activo:
+            await self._cola.put(_FIN)
+            await self._tarea
+        self._tarea = None
+        if self._spool is not None:
+            self._spool.cerrar()
+
+    async def encolar(self, index_name: str, documento: Dict):
+        """Añade un documento al lote; espera si la cola está llena."""
+        documento["timestamp"] = datetime.now(timezone.utc).isoformat()
+        await self._cola.put((index_name, documento))
+
+    async def _bucle(self):
+        """Agrupa los documentos de la cola y envía los lotes."""
+        bucle = asyncio.get_running_loop()
+        lote: List[Tuple[str, Dict]] = []
+        tamano = 0
+        limite = None
+
+        while True:
+            espera = None if limite is None else max(0, limite - bucle.time())
+            if espera is None and self._pendientes_en_spool():
+                # Se despierta de vez en cuando para vaciar el spool
+                espera = self.intervalo
+            try:
+                elemento = await asyncio.wait_for(self._cola.get(), espera)
+            except asyncio.TimeoutError:
+                elemento = None
+
+            if elemento is not None and elemento is not _FIN:
+                if not lote:
+                    limite = bucle.time() + self.intervalo
+                lote.append(elemento)
+                tamano += len(json.dumps(elemento[1], default=str))
+
+            if lote and (
+                elemento is None or elemento is _FIN
+                or len(lote) >= self.max_documentos
+                or tamano >= self.max_bytes
+            ):
+                await self._enviar(lote)
+                lote, tamano, limite = [], 0, None
+            elif elemento is None:
+                await self._reenviar_spool()
+
+            if elemento is _FIN:
+                return
+
+    def _pendientes_en_spool(self) -> bool:
+        """Indica si quedan documentos en el spool."""
+        return self._spool is not None and self._spool.pendientes > 0
+
+    async def _enviar(self, lote: List[Tuple[str, Dict]]):
+        """
+        Envía un lote con la API _bulk o, si el clúster no está disponible,
+        falla o aún hay documentos anteriores en el spool, lo guarda en el
+        spool para conservar el orden.
+        """
+        if (not conexion_elasticsearch.esta_disponible()
+                or self._pendientes_en_spool()):
+            await self._guardar_en_spool(lote)
+            await self._reenviar_spool()
+            return
+
+        if not await self._enviar_bulk(lote):
+            await self._guardar_en_spool(lote)
+
+    async def _guardar_en_spool(self, lote: List[Tuple[str, Dict]]):
+        """Guarda un lote en el spool; sin spool, el lote se pierde."""
+        guardados = 0
+        if self._spool is not None:
+            guardados = await asyncio.to_thread(self._spool.escribir, lote)
+        self.en_spool += guardados
+        if guardados < len(lote):
+            self.errores += len(lote) - guardados
+            logger.warning(
+                f"Elasticsearch no disponible; {len(lote) - guardados} "
+                "documentos sin indexar"
+            )
+
+    async def _reenviar_spool(self):
+        """Reenvía los segmentos del spool en orden mientras el clúster responda."""
+        if (not self._pendientes_en_spool()
+                or not conexion_elasticsearch.esta_disponible()):
+            return
+        for ruta in await asyncio.to_thread(self._spool.segmentos):
+            documentos = await asyncio.to_thread(self._spool.leer, ruta)
+            for inicio in range(0, len(documentos), self.max_documentos):
+                trozo = documentos[inicio:inicio + self.max_documentos]
+                if not await self._enviar_bulk(trozo):
+                    # El segmento sigue en disco y se reintenta entero
+                    return
+            await asyncio.to_thread(self._spool.confirmar, ruta)
+            self.reenviados += len(documentos)
+            logger.info(f"Reenviados {len(documentos)} documentos del spool")
+
+    async def _enviar_bulk(self, lote: List[Tuple[str, Dict]]) -> bool:
+        """
+        Envía un lote con la API _bulk y contabiliza cada documento.
+        Devuelve False si el envío entero falla (el clúster no responde).
+        """
+        operaciones = []
+        for index_name, documento in lote:
+            # Se escribe en el índice del periodo; se lee por el alias
+            accion = {"_index": indice_escritura(index_name, documento)}
+            id_doc = id_documento(index_name, documento)
+            if id_doc is not None:
+                # Reindexar el mismo día sobrescribe en lugar de duplicar
+                accion["_id"] = id_doc
+            operaciones.append({"index": accion})
+            operaciones.append(documento)
+
+        try:
+            respuesta = await self._cliente().bulk(operations=operaciones)
+        except Exception as e:
+            conexion_elasticsearch.registrar_fallo()
+            logger.error(
+                f"Error al enviar un lote de {len(lote)} documentos: {e}",
+                exc_info=True
+            )
+            return False
+        conexion_elasticsearch.registrar_exito()
+
+        for item, (index_name, _documento) in zip(respuesta["items"], lote):
+            resultado = item.get("index", {})
+            if "error" in resultado:
+                self.errores += 1
+                self.errores_recientes.append(
+                    {"index": index_name, "error": resultado["error"]}
+                )
+                logger.warning(
+                    f"Documento no indexado en {index_name}: "
+                    f"{resultado['error']}"
+                )
+            else:
+                self.indexados += 1
+        return True
+
+    def estadisticas(self) -> Dict:
+        """Contadores del indexador para exponerlos como métrica."""
+        return {
+            "activo": self.activo,
+            "pendientes": self._cola.qsize(),
+            "indexados": self.indexados,
+            "errores": self.errores,
+            "en_spool": self.en_spool,
+            "reenviados": self.reenviados,
+            "spool": (
+                self._spool.estadisticas() if self._spool is not None
+                else None
+            ),
+            "errores_recientes": list(self.errores_recientes),
+        }
+
+
+_indexador: Optional[IndexadorBulk] = None
+
+
+def obtener_indexador() -> Optional[IndexadorBulk]:
+    """Devuelve el indexador de la aplicación, si se ha iniciado."""
+    return _indexador
+
+
+async def iniciar_indexador() -> IndexadorBulk:
+    """Crea y arranca el indexador (se llama desde el lifespan de FastAPI)."""
+    global _indexador
+    if _indexador is None:
+        _indexador = IndexadorBulk()
+    _indexador.iniciar()
+    return _indexador
+
+
+async def detener_indexador():
+    """Envía los documentos pendientes y detiene el indexador."""
+    global _indexador
+    if _indexador is not None:
+        await _indexador.detener()
+        _indexador = None
+
+
+async def encolar_documento(index_name: str, documento: Dict):
+    """
+    Encola un documento para indexarlo en lote. Si el indexador no está
+    en marcha (por ejemplo, fuera de la aplicación) se indexa directamente.
+    """
+    if _indexador is not None and _indexador.activo:
+        await _indexador.encolar(index_name, documento)
+    else:
+        await conexion_elasticsearch.indexar_documento_elasticsearch(
+            index_name, documento
+        )
@@ -0,0 +1,128 @@
+"""Índices por periodo detrás de un alias y retención por índices enteros."""
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set
+from app.elasticsearch.plantillas_elasticsearch import MAPEOS
+
+logger = logging.getLogger(__name__)
+
+# Periodo de cada índice: "mensual" (github_repositorios-2025.04) o
+# "diario" (github_repositorios-2025.04.01)
+ELASTIC_PERIODO_INDICES = os.getenv("ELASTIC_PERIODO_INDICES", "mensual").lower()
+# Días que se conservan los datos (0 = sin límite) y cada cuántos
+# segundos se comprueba
+ELASTIC_RETENCION_DIAS = int(os.getenv("ELASTIC_RETENCION_DIAS", "90"))
+ELASTIC_INTERVALO_RETENCION = float(
+    os.getenv("ELASTIC_INTERVALO_RETENCION", "3600")
+)
+
+_FORMATOS = {"mensual": "%Y.%m", "diario": "%Y.%m.%d"}
+
+# Índices antiguos con el nombre del alias: mientras existan se sigue
+# escribiendo en ellos, porque el alias no se puede crear
+_heredados: Set[str] = set()
+
+
+def _formato(periodo: str) -> str:
+    """Formato de fecha del sufijo para el periodo indicado."""
+    return _FORMATOS.get(periodo, _FORMATOS["mensual"])
+
+
+def indice_escritura(
+    alias: str, documento: Dict, periodo: str = None
+) -> str:
+    """
+    Índice concreto en el que se escribe un documento del alias según su
+    ``timestamp``. Las plantillas añaden cada índice nuevo al alias, que
+    es lo que consultan las lecturas.
+    """
+    if alias not in MAPEOS or alias in _heredados:
+        return alias
+    periodo = periodo or ELASTIC_PERIODO_INDICES
+    timestamp = documento.get("timestamp")
+    fecha = (
+        datetime.fromisoformat(timestamp) if timestamp
+        else datetime.now(timezone.utc)
+    )
+    return f"{alias}-{fecha.strftime(_formato(periodo))}"
+
+
+def _fin_periodo(sufijo: str) -> Optional[datetime]:
+    """Primer instante posterior al periodo de un sufijo, o None."""
+    for periodo, formato in _FORMATOS.items():
+        try:
+            inicio = datetime.strptime(sufijo, formato)
+        except ValueError:
+            continue
+        if periodo == "diario":
+            return inicio + timedelta(days=1)
+        return (inicio.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return None
+
+
+def indices_caducados(
+    alias: str,
+    indices: Iterable[str],
+    ahora: datetime,
+    retencion_dias: int = None
+) -> List[str]:
+    """Índices del alias cuyo periodo terminó antes de la retención."""
+    retencion_dias = (
+        ELASTIC_RETENCION_DIAS if retencion_dias is None else retencion_dias
+    )
+    if retencion_dias <= 0:
+        return []
+    limite = ahora - timedelta(days=retencion_dias)
+    caducados = []
+    for indice in indices:
+        if not indice.startswith(f"{alias}-"):
+            continue
+        fin = _fin_periodo(indice[len(alias) + 1:])
+        if fin is not None and fin <= limite:
+            caducados.append(indice)
+    return sorted(caducados)
+
+
+async def detectar_heredados(cliente):
+    """
+    Detecta índices concretos que se llaman como el alias (datos
+    anteriores a los índices por periodo) y sigue escribiendo en ellos.
+    """
+    for alias in MAPEOS:
+        try:
+            es_indice = (
+                await cliente.indices.exists(index=alias)
+                and not await cliente.indices.exists_alias(name=alias)
+            )
+        except Exception as e:
+            logger.warning(f"No se pudo comprobar el índice {alias}: {e}")
+            continue
+        if es_indice:
+            if alias not in _heredados:
+                logger.warning(
+                    f"El índice {alias} es anterior a los índices por "
+                    "periodo; se sigue usando hasta que se migre o borre"
+                )
+            _heredados.add(alias)
+        else:
+            _heredados.discard(alias)
+
+
+async def aplicar_retencion(cliente, ahora: datetime = None) -> List[str]:
+    """Borra de una vez los índices caducados; devuelve sus nombres."""
+    ahora = ahora or datetime.now()
+    borrados = []
+    for alias in MAPEOS:
+        try:
+            indices = await cliente.indices.get(
+                index=f"{alias}-*", allow_no_indices=True
+            )
+            caducados = indices_caducados(alias, indices.keys(), ahora)
+            if caducados:
+                await cliente.indices.delete(index=",".join(caducados))
+                logger.info(f"Índices borrados por retención: {caducados}")
+                borrados.extend(caducados)
+        except Exception as e:
+            logger.error(f"Error al aplicar la retención de {alias}: {e}")
+    return borrados
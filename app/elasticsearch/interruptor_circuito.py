@@ -0,0 +1,64 @@
+"""Interruptor de circuito para no insistir contra un clúster caído."""
+import time
+from typing import Callable, Dict
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+
+class InterruptorCircuito:
+    """
+    Se abre tras ``umbral_fallos`` fallos seguidos y, mientras está
+    abierto, las llamadas no se intentan (no se paga el timeout). Pasado
+    ``tiempo_apertura`` queda semiabierto: se vuelve a intentar y el
+    primer éxito lo cierra, mientras que un fallo lo abre de nuevo.
+    """
+
+    def __init__(
+        self,
+        umbral_fallos: int = 5,
+        tiempo_apertura: float = 30,
+        reloj: Callable[[], float] = time.monotonic
+    ):
+        self.umbral_fallos = umbral_fallos
+        self.tiempo_apertura = tiempo_apertura
+        self._reloj = reloj
+        self._fallos_seguidos = 0
+        self._abierto_desde = None
+        self.aperturas = 0
+
+    @property
+    def estado(self) -> str:
+        """Estado actual del interruptor."""
+        if self._abierto_desde is None:
+            return CERRADO
+        if self._reloj() - self._abierto_desde < self.tiempo_apertura:
+            return ABIERTO
+        return SEMIABIERTO
+
+    def permite(self) -> bool:
+        """Indica si se puede intentar una llamada."""
+        return self.estado != ABIERTO
+
+    def registrar_exito(self):
+        """Una llamada correcta cierra el interruptor."""
+        self._fallos_seguidos = 0
+        self._abierto_desde = None
+
+    def registrar_fallo(self):
+        """Cuenta un fallo y abre el interruptor si toca."""
+        self._fallos_seguidos += 1
+        if (self.estado == SEMIABIERTO
+                or self._fallos_seguidos >= self.umbral_fallos):
+            if self.estado != ABIERTO:
+                self.aperturas += 1
+            self._abierto_desde = self._reloj()
+
+    def estadisticas(self) -> Dict:
+        """Estado del interruptor para las métricas."""
+        return {
+            "estado": self.estado,
+            "fallos_seguidos": self._fallos_seguidos,
+            "aperturas": self.aperturas,
+        }
@@ -0,0 +1,160 @@
+"""Plantillas de índice, mapeos explícitos e ids deterministas."""
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Ajustes comunes de los índices de la aplicación
+ELASTIC_SHARDS = int(os.getenv("ELASTIC_SHARDS", "1"))
+ELASTIC_REPLICAS = int(os.getenv("ELASTIC_REPLICAS", "1"))
+# Los documentos llegan en lote cada pocos segundos; refrescar menos a
+# menudo que el valor por defecto (1s) abarata la indexación
+ELASTIC_REFRESH_INTERVAL = os.getenv("ELASTIC_REFRESH_INTERVAL", "30s")
+
+_KEYWORD = {"type": "keyword"}
+_ENTERO = {"type": "integer"}
+_FECHA = {"type": "date"}
+_RANGO_FECHAS = {"properties": {"desde": _FECHA, "hasta": _FECHA}}
+_ALERTA = {"properties": {
+    "paquete": _KEYWORD,
+    "estado": _KEYWORD,
+    "severidad": _KEYWORD,
+    "creado_en": _FECHA,
+    "repo": _KEYWORD,
+}}
+
+# Propiedades de cada índice. Con "dynamic: false" los campos que no
+# estén aquí se guardan en _source pero no se indexan, en lugar de crear
+# un mapeo text + keyword por cada uno
+MAPEOS: Dict[str, Dict] = {
+    "github_repositorios": {
+        "usuario": _KEYWORD,
+        "repo": _KEYWORD,
+        "url": {"type": "keyword", "index": False},
+        "status": _KEYWORD,
+        # "completo" o "rapido" (sin estadísticas de pull requests)
+        "modo": _KEYWORD,
+        "estado_repo": _KEYWORD,
+        "pull_requests_abiertos": _ENTERO,
+        "pull_requests_cerrados": _ENTERO,
+        "pull_requests_resueltos": _ENTERO,
+        "timestamp": _FECHA,
+    },
+    "github_productividad_usuarios": {
+        "repo_owner": _KEYWORD,
+        "repo": _KEYWORD,
+        "usuario": _KEYWORD,
+        "status": _KEYWORD,
+        "commits": _ENTERO,
+        "pull_requests_abiertos": _ENTERO,
+        "pull_requests_no_fusionados": _ENTERO,
+        "usuarios_productivos": _ENTERO,
+        "usuarios_improductivos": _ENTERO,
+        "timestamp": _FECHA,
+    },
+    "github_dependabot_alerts": {
+        "repo_owner": _KEYWORD,
+        "repo": _KEYWORD,
+        "rango_fechas": _RANGO_FECHAS,
+        "total_alertas": _ENTERO,
+        "total_no_solucionadas": _ENTERO,
+        "total_solucionadas": _ENTERO,
+        "no_solucionadas": _ALERTA,
+        "solucionadas": _ALERTA,
+        "estados_fallidos": _KEYWORD,
+        "timestamp": _FECHA,
+    },
+    "github_dependabot_organizacion": {
+        "org": _KEYWORD,
+        "state": _KEYWORD,
+        "rango_fechas": _RANGO_FECHAS,
+        "total_alertas": _ENTERO,
+        # Claves variables (nombres de repos y paquetes) en un solo campo
+        "por_repositorio": {"type": "flattened"},
+        "por_severidad": {"type": "flattened"},
+        "por_paquete": {"type": "flattened"},
+        "por_estado": {"type": "flattened"},
+        "timestamp": _FECHA,
+    },
+}
+
+# Campos que identifican un documento dentro de un día: reindexar el mismo
+# día sobrescribe el documento en lugar de duplicarlo. El modo de los
+# repositorios forma parte del id para que una clasificación rápida no
+# pise la completa del mismo día
+CLAVES_ID: Dict[str, Tuple[str, ...]] = {
+    "github_repositorios": ("usuario", "repo", "modo"),
+    "github_productividad_usuarios": ("repo_owner", "repo", "usuario"),
+    "github_dependabot_alerts": (
+        "repo_owner", "repo", "rango_fechas.desde", "rango_fechas.hasta"
+    ),
+    "github_dependabot_organizacion": (
+        "org", "state", "rango_fechas.desde", "rango_fechas.hasta"
+    ),
+}
+
+
+def valor_campo(documento: Dict, campo: str):
+    """Valor de un campo, admitiendo rutas con puntos."""
+    for parte in campo.split("."):
+        if not isinstance(documento, dict):
+            return None
+        documento = documento.get(parte)
+    return documento
+
+
+def id_documento(index_name: str, documento: Dict) -> Optional[str]:
+    """
+    Id determinista (campos clave + día del ``timestamp``) para los índices
+    conocidos; None deja que Elasticsearch genere uno.
+    """
+    campos = CLAVES_ID.get(index_name)
+    if campos is None or not documento.get("timestamp"):
+        return None
+    partes = [
+        "" if valor_campo(documento, campo) is None
+        else str(valor_campo(documento, campo))
+        for campo in campos
+    ]
+    partes.append(documento["timestamp"][:10])
+    return ":".join(partes)
+
+
+def plantilla(index_name: str) -> Dict:
+    """
+    Plantilla de los índices por periodo de ``index_name``, que se añaden
+    al alias ``index_name`` al crearse.
+    """
+    return {
+        "name": f"{index_name}_plantilla",
+        "index_patterns": [f"{index_name}-*"],
+        "priority": 100,
+        "template": {
+            "aliases": {index_name: {}},
+            "settings": {
+                "number_of_shards": ELASTIC_SHARDS,
+                "number_of_replicas": ELASTIC_REPLICAS,
+                "refresh_interval": ELASTIC_REFRESH_INTERVAL,
+            },
+            "mappings": {
+                "dynamic": False,
+                "properties": MAPEOS[index_name],
+            },
+        },
+    }
+
+
+async def instalar_plantillas(cliente) -> int:
+    """
+    Crea o actualiza las plantillas de todos los índices. Solo afectan a
+    los índices que se creen después; devuelve cuántas se instalaron.
+    """
+    instaladas = 0
+    for index_name in MAPEOS:
+        try:
+            await cliente.indices.put_index_template(**plantilla(index_name))
+            instaladas += 1
+        except Exception as e:
+            logger.error(f"No se pudo instalar la plantilla de {index_name}: {e}")
+    return instaladas
@@ -0,0 +1,150 @@
+"""Spool local en disco para los documentos que no llegan a Elasticsearch."""
+import glob
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ELASTIC_SPOOL_ACTIVO = os.getenv("ELASTIC_SPOOL_ACTIVO", "true").lower() == "true"
+ELASTIC_SPOOL_DIR = os.getenv("ELASTIC_SPOOL_DIR", ".cache/spool_elasticsearch")
+# Tamaño a partir del cual se empieza un segmento nuevo y tope total
+ELASTIC_SPOOL_SEGMENTO_BYTES = int(
+    os.getenv("ELASTIC_SPOOL_SEGMENTO_BYTES", str(8 * 1024 * 1024))
+)
+ELASTIC_SPOOL_MAX_BYTES = int(
+    os.getenv("ELASTIC_SPOOL_MAX_BYTES", str(512 * 1024 * 1024))
+)
+
+
+class SpoolDisco:
+    """
+    Registro de solo escritura por segmentos (``segmento-000001.ndjson``,
+    una línea por documento). Cada lote se escribe con un único fsync. Los
+    segmentos se reenvían en orden y se borran enteros al confirmarse.
+    Los métodos son bloqueantes; desde asyncio se llaman con to_thread.
+    """
+
+    def __init__(
+        self,
+        directorio: str,
+        max_bytes_segmento: int = ELASTIC_SPOOL_SEGMENTO_BYTES,
+        max_bytes: int = ELASTIC_SPOOL_MAX_BYTES
+    ):
+        self.directorio = directorio
+        self.max_bytes_segmento = max_bytes_segmento
+        self.max_bytes = max_bytes
+        os.makedirs(directorio, exist_ok=True)
+        self._lock = threading.Lock()
+        self._actual = None
+        self._actual_bytes = 0
+        self.pendientes = 0
+        self.bytes = 0
+        self.descartados = 0
+
+        # Lo que quedó de una ejecución anterior sigue pendiente
+        segmentos = self._listar()
+        for ruta in segmentos:
+            with open(ruta, "rb") as fichero:
+                self.pendientes += sum(1 for _linea in fichero)
+            self.bytes += os.path.getsize(ruta)
+        self._siguiente = (
+            int(os.path.basename(segmentos[-1])[9:15]) + 1 if segmentos else 1
+        )
+
+    def _listar(self) -> List[str]:
+        """Segmentos en disco, del más antiguo al más reciente."""
+        return sorted(glob.glob(
+            os.path.join(self.directorio, "segmento-*.ndjson")
+        ))
+
+    def _cerrar_actual(self):
+        """Cierra el segmento en escritura para poder reenviarlo."""
+        if self._actual is not None:
+            self._actual.close()
+            self._actual = None
+            self._actual_bytes = 0
+
+    def escribir(self, lote: List[Tuple[str, Dict]]) -> int:
+        """Añade un lote y devuelve cuántos documentos se guardaron."""
+        datos = "".join(
+            json.dumps({"index": index_name, "documento": documento},
+                       default=str) + "\n"
+            for index_name, documento in lote
+        ).encode()
+        with self._lock:
+            if self.bytes + len(datos) > self.max_bytes:
+                self.descartados += len(lote)
+                logger.error(
+                    f"Spool lleno; se descartan {len(lote)} documentos"
+                )
+                return 0
+            if self._actual is None:
+                ruta = os.path.join(
+                    self.directorio, f"segmento-{self._siguiente:06d}.ndjson"
+                )
+                self._siguiente += 1
+                self._actual = open(ruta, "ab")
+            self._actual.write(datos)
+            self._actual.flush()
+            os.fsync(self._actual.fileno())
+            self._actual_bytes += len(datos)
+            self.pendientes += len(lote)
+            self.bytes += len(datos)
+            if self._actual_bytes >= self.max_bytes_segmento:
+                self._cerrar_actual()
+        return len(lote)
+
+    def segmentos(self) -> List[str]:
+        """Cierra el segmento en curso y devuelve todos los pendientes."""
+        with self._lock:
+            self._cerrar_actual()
+            return self._listar()
+
+    def leer(self, ruta: str) -> List[Tuple[str, Dict]]:
+        """Documentos de un segmento (se ignora una última línea cortada)."""
+        lote = []
+        with open(ruta, "rb") as fichero:
+            for linea in fichero:
+                try:
+                    registro = json.loads(linea)
+                except ValueError:
+                    logger.warning(f"Línea dañada en {ruta}; se ignora")
+                    continue
+                lote.append((registro["index"], registro["documento"]))
+        return lote
+
+    def confirmar(self, ruta: str):
+        """Borra un segmento ya reenviado."""
+        with self._lock:
+            with open(ruta, "rb") as fichero:
+                lineas = sum(1 for _linea in fichero)
+            self.bytes -= os.path.getsize(ruta)
+            self.pendientes -= lineas
+            os.remove(ruta)
+
+    def cerrar(self):
+        """Cierra el segmento en escritura."""
+        with self._lock:
+            self._cerrar_actual()
+
+    def estadisticas(self) -> Dict:
+        """Contadores del spool para las métricas."""
+        return {
+            "pendientes": self.pendientes,
+            "bytes": self.bytes,
+            "descartados": self.descartados,
+        }
+
+
+_spool: Optional[SpoolDisco] = None
+
+
+def obtener_spool() -> Optional[SpoolDisco]:
+    """Spool de la aplicación (None si está desactivado)."""
+    global _spool
+    if _spool is None and ELASTIC_SPOOL_ACTIVO:
+        _spool = SpoolDisco(ELASTIC_SPOOL_DIR)
+    return _spool
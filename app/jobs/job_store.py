@@ -0,0 +1,159 @@
+"""Almacenes de trabajos en segundo plano (memoria y SQLite)."""
+import json
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Optional
+from config import Config
+
+# Estados de un trabajo
+PENDIENTE = "pendiente"
+EN_CURSO = "en_curso"
+COMPLETADO = "completado"
+ERROR = "error"
+
+ESTADOS_ACTIVOS = (PENDIENTE, EN_CURSO)
+
+
+class AlmacenTrabajosMemoria:
+    """Almacén en memoria, pensado para pruebas y un único proceso."""
+
+    # Sus operaciones no hacen E/S y pueden ejecutarse en el bucle
+    bloqueante = False
+
+    def __init__(self):
+        self._trabajos: Dict[str, Dict] = {}
+
+    def guardar(self, trabajo: Dict):
+        """Crea o reemplaza un trabajo."""
+        self._trabajos[trabajo["id"]] = dict(trabajo)
+
+    def obtener(self, id_trabajo: str) -> Optional[Dict]:
+        """Devuelve una copia del trabajo, si existe."""
+        trabajo = self._trabajos.get(id_trabajo)
+        return dict(trabajo) if trabajo is not None else None
+
+    def buscar_activo(self, clave: str) -> Optional[Dict]:
+        """Devuelve un trabajo pendiente o en curso con la misma clave."""
+        for trabajo in self._trabajos.values():
+            if trabajo["clave"] == clave and trabajo["estado"] in ESTADOS_ACTIVOS:
+                return dict(trabajo)
+        return None
+
+    def purgar(self, ahora: float) -> int:
+        """Elimina los trabajos terminados cuyo resultado ha caducado."""
+        caducados = [
+            id_trabajo for id_trabajo, trabajo in self._trabajos.items()
+            if trabajo.get("expira_en") is not None
+            and trabajo["expira_en"] <= ahora
+        ]
+        for id_trabajo in caducados:
+            del self._trabajos[id_trabajo]
+        return len(caducados)
+
+    def interrumpir_huerfanos(
+        self, vivo: Callable[[Optional[str]], bool]
+    ) -> int:
+        """En memoria no sobrevive ningún trabajo a un reinicio."""
+        return 0
+
+
+class AlmacenTrabajosSQLite:
+    """
+    Almacén en un fichero SQLite para un único nodo. Puede compartirlo
+    más de un proceso; cada trabajo guarda qué proceso lo ejecuta.
+    """
+
+    # Sus operaciones hacen E/S de disco y conviene sacarlas del bucle
+    bloqueante = True
+
+    def __init__(self, ruta: str):
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS trabajos ("
+            "id TEXT PRIMARY KEY, clave TEXT NOT NULL, estado TEXT NOT NULL, "
+            "expira_en REAL, datos TEXT NOT NULL)"
+        )
+        self._conexion.execute(
+            "CREATE INDEX IF NOT EXISTS trabajos_clave "
+            "ON trabajos (clave, estado)"
+        )
+        self._conexion.commit()
+
+    def guardar(self, trabajo: Dict):
+        """Crea o reemplaza un trabajo."""
+        with self._lock:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO trabajos "
+                "(id, clave, estado, expira_en, datos) VALUES (?, ?, ?, ?, ?)",
+                (trabajo["id"], trabajo["clave"], trabajo["estado"],
+                 trabajo.get("expira_en"), json.dumps(trabajo))
+            )
+            self._conexion.commit()
+
+    def obtener(self, id_trabajo: str) -> Optional[Dict]:
+        """Devuelve el trabajo, si existe."""
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT datos FROM trabajos WHERE id = ?", (id_trabajo,)
+            ).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def buscar_activo(self, clave: str) -> Optional[Dict]:
+        """Devuelve un trabajo pendiente o en curso con la misma clave."""
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT datos FROM trabajos WHERE clave = ? "
+                "AND estado IN (?, ?) LIMIT 1",
+                (clave, *ESTADOS_ACTIVOS)
+            ).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def purgar(self, ahora: float) -> int:
+        """Elimina los trabajos terminados cuyo resultado ha caducado."""
+        with self._lock:
+            cursor = self._conexion.execute(
+                "DELETE FROM trabajos WHERE expira_en IS NOT NULL "
+                "AND expira_en <= ?", (ahora,)
+            )
+            self._conexion.commit()
+        return cursor.rowcount
+
+    def interrumpir_huerfanos(
+        self, vivo: Callable[[Optional[str]], bool]
+    ) -> int:
+        """
+        Marca como error los trabajos activos cuyo propietario ya no está
+        ``vivo``, ya que ningún worker los va a terminar. Los de otros
+        procesos que siguen en marcha no se tocan.
+        """
+        with self._lock:
+            filas = self._conexion.execute(
+                "SELECT datos FROM trabajos WHERE estado IN (?, ?)",
+                ESTADOS_ACTIVOS
+            ).fetchall()
+        interrumpidos = 0
+        for (datos,) in filas:
+            trabajo = json.loads(datos)
+            if vivo(trabajo.get("propietario")):
+                continue
+            trabajo["estado"] = ERROR
+            trabajo["error"] = "Trabajo interrumpido por un reinicio"
+            self.guardar(trabajo)
+            interrumpidos += 1
+        return interrumpidos
+
+    def cerrar(self):
+        """Cierra la conexión con el fichero."""
+        self._conexion.close()
+
+
+def crear_almacen():
+    """Crea el almacén según ``Config.JOBS_ALMACEN`` (memoria/sqlite)."""
+    if Config.JOBS_ALMACEN == "sqlite":
+        return AlmacenTrabajosSQLite(Config.JOBS_SQLITE_RUTA)
+    return AlmacenTrabajosMemoria()
@@ -0,0 +1,59 @@
+"""Este es el router del modulo jobs"""
+from typing import Any, Dict, Literal
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from app.jobs.job_store import COMPLETADO, ERROR
+from app.jobs.jobs_service import TrabajoNoEncontrado, obtener_gestor
+
+# Crear una instancia del router
+router = APIRouter()
+
+
+class PeticionTrabajo(BaseModel):
+    """Cuerpo de la petición para crear un trabajo."""
+    tipo: Literal["repositorios", "productividad", "dependabots"]
+    parametros: Dict[str, Any] = Field(default_factory=dict)
+
+
+@router.post("/v1/jobs", status_code=202)
+async def crear_trabajo(peticion: PeticionTrabajo):
+    """
+    Encola un trabajo en segundo plano y devuelve su id. Si ya hay un
+    trabajo idéntico pendiente o en curso se devuelve ese mismo.
+    """
+    try:
+        trabajo = await obtener_gestor().enviar(
+            peticion.tipo, peticion.parametros
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    return {"id": trabajo["id"], "estado": trabajo["estado"]}
+
+
+@router.get("/v1/jobs/{id_trabajo}")
+async def get_trabajo(id_trabajo: str):
+    """Estado, progreso y tiempo estimado restante de un trabajo."""
+    try:
+        return await obtener_gestor().consultar(id_trabajo)
+    except TrabajoNoEncontrado as e:
+        raise HTTPException(
+            status_code=404, detail="Trabajo no encontrado"
+        ) from e
+
+
+@router.get("/v1/jobs/{id_trabajo}/resultado")
+async def get_resultado_trabajo(id_trabajo: str):
+    """Resultado de un trabajo terminado."""
+    try:
+        trabajo = await obtener_gestor().resultado(id_trabajo)
+    except TrabajoNoEncontrado as e:
+        raise HTTPException(
+            status_code=404, detail="Trabajo no encontrado"
+        ) from e
+    if trabajo["estado"] == ERROR:
+        raise HTTPException(status_code=500, detail=trabajo["error"])
+    if trabajo["estado"] != COMPLETADO:
+        raise HTTPException(
+            status_code=409, detail=f"El trabajo está {trabajo['estado']}"
+        )
+    return trabajo["resultado"]
@@ -0,0 +1,364 @@
+"""Servicio de trabajos en segundo plano para clasificaciones largas."""
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import date
+from typing import Callable, Dict, Literal, Optional
+import sys
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+sys.path.append('.')
+from config import Config
+from app.jobs.job_store import (
+    COMPLETADO,
+    EN_CURSO,
+    ERROR,
+    PENDIENTE,
+    crear_almacen
+)
+from app.repositorios.activity_service import clasificar_repositorios
+from app.productividad.productividad_service import (
+    obtener_productividad_por_repositorio
+)
+from app.dependabots.dependabots_service import (
+    obtener_dependabots_solucionados_y_no_solucionados
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TrabajoNoEncontrado(Exception):
+    """El trabajo no existe o su resultado ha caducado."""
+
+
+async def _trabajo_repositorios(parametros: Dict, progreso: Callable):
+    """Clasificación de repositorios con progreso por repositorio."""
+    return await clasificar_repositorios(progreso=progreso, **parametros)
+
+
+async def _trabajo_productividad(parametros: Dict, progreso: Callable):
+    """Productividad de los usuarios de un repositorio."""
+    progreso(0, 1)
+    resultado = await obtener_productividad_por_repositorio(**parametros)
+    progreso(1, 1)
+    return resultado
+
+
+async def _trabajo_dependabots(parametros: Dict, progreso: Callable):
+    """Alertas de Dependabot de un repositorio."""
+    progreso(0, 1)
+    resultado = await obtener_dependabots_solucionados_y_no_solucionados(
+        **parametros
+    )
+    progreso(1, 1)
+    return resultado
+
+
+class ParametrosRepositorios(BaseModel):
+    """Parámetros admitidos por un trabajo de repositorios."""
+    model_config = ConfigDict(extra="forbid")
+
+    usuario: str = Field(min_length=1)
+    concurrencia: Optional[int] = Field(
+        None, ge=1, le=Config.JOBS_CONCURRENCIA_MAX
+    )
+    fuente: Literal["rest", "graphql"] = "rest"
+    incremental: bool = False
+    modo: Literal["completo", "rapido"] = "completo"
+
+
+class ParametrosProductividad(BaseModel):
+    """Parámetros admitidos por un trabajo de productividad."""
+    model_config = ConfigDict(extra="forbid")
+
+    repo_owner: str = Field(min_length=1)
+    repo_name: str = Field(min_length=1)
+
+
+class ParametrosDependabots(BaseModel):
+    """Parámetros admitidos por un trabajo de Dependabot."""
+    model_config = ConfigDict(extra="forbid")
+
+    repo_owner: str = Field(min_length=1)
+    repo_name: str = Field(min_length=1)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+
+# Tipo de trabajo -> (ejecutor, modelo con el que se validan los parámetros)
+TIPOS_TRABAJO = {
+    "repositorios": (_trabajo_repositorios, ParametrosRepositorios),
+    "productividad": (_trabajo_productividad, ParametrosProductividad),
+    "dependabots": (_trabajo_dependabots, ParametrosDependabots),
+}
+
+
+def propietario_actual() -> str:
+    """Identificador del proceso que ejecuta los trabajos (host:pid)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def proceso_vivo(propietario: Optional[str]) -> bool:
+    """
+    Indica si el proceso ``propietario`` puede seguir ejecutando sus
+    trabajos. Los de otra máquina no se pueden comprobar y se dan por
+    vivos; un pid igual al propio es de un proceso anterior que ya murió.
+    """
+    if not propietario:
+        return False
+    maquina, _, pid = propietario.rpartition(":")
+    if maquina != socket.gethostname():
+        return True
+    if not pid.isdigit() or int(pid) == os.getpid():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def clave_trabajo(tipo: str, parametros: Dict) -> str:
+    """Clave que identifica trabajos idénticos para no duplicarlos."""
+    return f"{tipo}:{json.dumps(parametros, sort_keys=True)}"
+
+
+class GestorTrabajos:
+    """
+    Encola trabajos, los ejecuta con un número fijo de workers y guarda
+    progreso y resultado en el almacén. Un trabajo idéntico a otro que
+    sigue pendiente o en curso devuelve el existente; los resultados
+    caducan ``ttl`` segundos después de terminar.
+
+    Todas las operaciones con el almacén pasan por ``_almacen``, que las
+    saca del bucle de eventos si el almacén hace E/S bloqueante.
+
+    Cada trabajo queda a nombre de ``propietario`` (el proceso que lo
+    encola y lo ejecuta), de modo que al arrancar solo se interrumpen los
+    de procesos que ya no existen. El progreso de los trabajos en curso se
+    sirve desde memoria y se guarda como mucho cada
+    ``intervalo_progreso`` segundos.
+    """
+
+    def __init__(
+        self,
+        almacen=None,
+        workers: int = None,
+        ttl: float = None,
+        tipos: Dict[str, tuple] = None,
+        reloj: Callable[[], float] = time.time,
+        propietario: str = None,
+        intervalo_progreso: float = None
+    ):
+        self.almacen = almacen if almacen is not None else crear_almacen()
+        self.workers = workers or Config.JOBS_WORKERS
+        self.ttl = Config.JOBS_TTL if ttl is None else ttl
+        self.tipos = tipos or TIPOS_TRABAJO
+        self.propietario = propietario or propietario_actual()
+        self.intervalo_progreso = (
+            Config.JOBS_PROGRESO_INTERVALO if intervalo_progreso is None
+            else intervalo_progreso
+        )
+        self._reloj = reloj
+        self._cola: asyncio.Queue = asyncio.Queue()
+        self._tareas = []
+        self._en_curso: Dict[str, Dict] = {}
+        # Evita que dos envíos idénticos simultáneos creen dos trabajos
+        self._lock_envio = asyncio.Lock()
+
+    async def iniciar(self):
+        """Arranca los workers."""
+        interrumpidos = await self._almacen(
+            "interrumpir_huerfanos", proceso_vivo
+        )
+        if interrumpidos:
+            logger.warning(f"{interrumpidos} trabajos interrumpidos")
+        if not self._tareas:
+            self._tareas = [
+                asyncio.create_task(self._worker())
+                for _ in range(self.workers)
+            ]
+
+    async def detener(self):
+        """Detiene los workers; los trabajos en curso se cancelan."""
+        for tarea in self._tareas:
+            tarea.cancel()
+        await asyncio.gather(*self._tareas, return_exceptions=True)
+        self._tareas = []
+
+    async def enviar(self, tipo: str, parametros: Dict) -> Dict:
+        """
+        Crea un trabajo (o devuelve el idéntico en curso) y lo encola.
+        Lanza ValueError si el tipo o los parámetros no son válidos; los
+        parámetros se normalizan con el modelo del tipo, así que dos
+        peticiones equivalentes comparten trabajo.
+        """
+        if tipo not in self.tipos:
+            raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+        _ejecutor, modelo = self.tipos[tipo]
+        try:
+            parametros = modelo.model_validate(parametros).model_dump(
+                mode="json"
+            )
+        except ValidationError as e:
+            raise ValueError(f"Parámetros no válidos para {tipo}: {e}") from e
+
+        clave = clave_trabajo(tipo, parametros)
+        async with self._lock_envio:
+            await self._almacen("purgar", self._reloj())
+            existente = await self._almacen("buscar_activo", clave)
+            if existente is not None:
+                return existente
+            trabajo = self._nuevo_trabajo(tipo, parametros, clave)
+            await self._almacen("guardar", trabajo)
+        self._cola.put_nowait(trabajo["id"])
+        return trabajo
+
+    def _nuevo_trabajo(self, tipo: str, parametros: Dict, clave: str) -> Dict:
+        """Registro inicial de un trabajo pendiente."""
+        return {
+            "id": uuid.uuid4().hex,
+            "tipo": tipo,
+            "parametros": parametros,
+            "clave": clave,
+            "propietario": self.propietario,
+            "estado": PENDIENTE,
+            "hechos": 0,
+            "total": None,
+            "creado_en": self._reloj(),
+            "iniciado_en": None,
+            "terminado_en": None,
+            "expira_en": None,
+            "resultado": None,
+            "error": None,
+        }
+
+    async def _obtener(self, id_trabajo: str) -> Dict:
+        """Devuelve el trabajo o lanza TrabajoNoEncontrado."""
+        if id_trabajo in self._en_curso:
+            return dict(self._en_curso[id_trabajo])
+        await self._almacen("purgar", self._reloj())
+        trabajo = await self._almacen("obtener", id_trabajo)
+        if trabajo is None:
+            raise TrabajoNoEncontrado(id_trabajo)
+        return trabajo
+
+    async def consultar(self, id_trabajo: str) -> Dict:
+        """Estado y progreso del trabajo (sin el resultado), con ETA."""
+        trabajo = await self._obtener(id_trabajo)
+        trabajo.pop("resultado", None)
+        trabajo.pop("clave", None)
+        trabajo["eta_segundos"] = self._eta(trabajo)
+        return trabajo
+
+    async def resultado(self, id_trabajo: str) -> Dict:
+        """Trabajo completo, incluido el resultado si ya ha terminado."""
+        return await self._obtener(id_trabajo)
+
+    def _eta(self, trabajo: Dict) -> Optional[float]:
+        """Estimación lineal del tiempo restante a partir del progreso."""
+        if trabajo["estado"] != EN_CURSO or not trabajo["total"]:
+            return None
+        if not trabajo["hechos"]:
+            return None
+        transcurrido = self._reloj() - trabajo["iniciado_en"]
+        restantes = trabajo["total"] - trabajo["hechos"]
+        return round(transcurrido / trabajo["hechos"] * restantes, 1)
+
+    async def _worker(self):
+        """Toma trabajos de la cola y los ejecuta uno a uno."""
+        while True:
+            id_trabajo = await self._cola.get()
+            try:
+                await self._ejecutar(id_trabajo)
+            finally:
+                self._cola.task_done()
+
+    async def _almacen(self, metodo: str, *args):
+        """
+        Llama a un método del almacén; si hace E/S bloqueante se ejecuta
+        en un hilo para no parar el bucle de eventos.
+        """
+        funcion = getattr(self.almacen, metodo)
+        if getattr(self.almacen, "bloqueante", False):
+            return await asyncio.to_thread(funcion, *args)
+        return funcion(*args)
+
+    async def _ejecutar(self, id_trabajo: str):
+        """Ejecuta un trabajo y guarda su progreso y resultado."""
+        trabajo = await self._almacen("obtener", id_trabajo)
+        if trabajo is None:
+            return
+        ejecutor, _modelo = self.tipos[trabajo["tipo"]]
+
+        trabajo["estado"] = EN_CURSO
+        trabajo["iniciado_en"] = self._reloj()
+        self._en_curso[id_trabajo] = trabajo
+        await self._almacen("guardar", dict(trabajo))
+
+        guardado: Optional[asyncio.Future] = None
+        ultimo_guardado = trabajo["iniciado_en"]
+
+        def progreso(hechos: int, total: Optional[int]):
+            # Se llama por cada repositorio: el estado en memoria siempre
+            # está al día, pero al almacén solo va de vez en cuando y sin
+            # solaparse con el guardado anterior
+            nonlocal guardado, ultimo_guardado
+            trabajo["hechos"] = hechos
+            trabajo["total"] = total
+            ahora = self._reloj()
+            if ahora - ultimo_guardado < self.intervalo_progreso:
+                return
+            if guardado is not None and not guardado.done():
+                return
+            ultimo_guardado = ahora
+            guardado = asyncio.ensure_future(
+                self._almacen("guardar", dict(trabajo))
+            )
+
+        try:
+            trabajo["resultado"] = await ejecutor(
+                trabajo["parametros"], progreso
+            )
+            trabajo["estado"] = COMPLETADO
+        except Exception as e:
+            logger.error(f"Error en el trabajo {id_trabajo}: {e}", exc_info=True)
+            trabajo["estado"] = ERROR
+            trabajo["error"] = str(e)
+        finally:
+            if guardado is not None:
+                await asyncio.gather(guardado, return_exceptions=True)
+
+        trabajo["terminado_en"] = self._reloj()
+        trabajo["expira_en"] = trabajo["terminado_en"] + self.ttl
+        try:
+            await self._almacen("guardar", trabajo)
+        finally:
+            self._en_curso.pop(id_trabajo, None)
+
+
+_gestor: Optional[GestorTrabajos] = None
+
+
+def obtener_gestor() -> GestorTrabajos:
+    """Devuelve el gestor de trabajos de la aplicación."""
+    global _gestor
+    if _gestor is None:
+        _gestor = GestorTrabajos()
+    return _gestor
+
+
+async def iniciar_trabajos():
+    """Arranca los workers (se llama desde el lifespan de FastAPI)."""
+    await obtener_gestor().iniciar()
+
+
+async def detener_trabajos():
+    """Detiene los workers del gestor de trabajos."""
+    if _gestor is not None:
+        await _gestor.detener()
@@ -0,0 +1,46 @@
+"""Este es el router del modulo metricas"""
+from fastapi import APIRouter
+from app.utils.github_utils import (
+    obtener_agrupador,
+    obtener_cache,
+    obtener_planificador,
+    obtener_pool
+)
+from app.utils.cache_resultados import obtener_cache_resultados
+from app.elasticsearch.conexion_elasticsearch import (
+    esta_disponible,
+    interruptor
+)
+from app.elasticsearch.indexador_bulk import obtener_indexador
+from app.programador.programador_service import obtener_programador
+
+router = APIRouter()
+
+
+@router.get("/v1/metricas")
+async def obtener_metricas():
+    """
+    Endpoint que expone el estado interno del acceso a GitHub:
+    presupuesto de límite de uso por token, uso del pool de credenciales,
+    contadores de la caché, peticiones idénticas agrupadas, caché de
+    resultados, estado del indexador en lote de Elasticsearch y del
+    programador de refrescos.
+    """
+    cache = obtener_cache()
+    indexador = obtener_indexador()
+    programador = obtener_programador()
+    return {
+        "github_rate_limit": obtener_planificador().presupuesto(),
+        "github_credenciales": obtener_pool().estadisticas(),
+        "github_cache": cache.estadisticas() if cache is not None else None,
+        "github_agrupacion": obtener_agrupador().estadisticas(),
+        "cache_resultados": obtener_cache_resultados().estadisticas(),
+        "elasticsearch_disponible": esta_disponible(),
+        "elasticsearch_interruptor": interruptor.estadisticas(),
+        "elasticsearch_bulk": (
+            indexador.estadisticas() if indexador is not None else None
+        ),
+        "programador": (
+            programador.estadisticas() if programador is not None else None
+        ),
+    }
@@ -1,9 +1,19 @@
 """Este es el router del modulo productividad"""
-from fastapi import APIRouter, HTTPException
+from typing import Literal, Optional
+from fastapi import APIRouter, Query
 from pydantic import BaseModel
+from config import Config
 from app.productividad.productividad_service import (
+    documentos_productividad,
     obtener_productividad_por_repositorio
 )
+from app.elasticsearch.consultas_elasticsearch import (
+    ELASTIC_LECTURA_TAMANO_MAX,
+    leer_con_respaldo,
+    max_edad_lectura
+)
+from app.utils.cache_resultados import obtener_cache_resultados
+from app.utils.errores_http import excepcion_http
 
 router = APIRouter()
 
@@ -26,15 +36,46 @@ async def obtener_productividad(repo_owner: str, repo_name: str):
 
     try:
         # Llamamos al servicio para obtener la productividad
-        resultado = obtener_productividad_por_repositorio(
-            repo_owner, repo_name
+        return await obtener_cache_resultados().obtener_o_calcular(
+            "productividad",
+            {"repo_owner": repo_owner, "repo_name": repo_name},
+            lambda: obtener_productividad_por_repositorio(
+                repo_owner, repo_name
+            )
         )
 
-        # Devolvemos la respuesta
-        return await resultado
-
     except Exception as e:
         # En caso de error, retornamos un mensaje de error
-        raise HTTPException(
-            status_code=500, detail=str(e)
-        ) from e
+        raise excepcion_http(e) from e
+
+
+@router.get("/v1/repositorio/{repo_owner}/{repo_name}/productividad/indexada")
+async def obtener_productividad_indexada(
+    repo_owner: str,
+    repo_name: str,
+    status: Optional[Literal["productivo", "improductivo"]] = Query(None),
+    tamano: int = Query(
+        100, ge=1, le=ELASTIC_LECTURA_TAMANO_MAX,
+        description="Documentos por página"
+    ),
+    despues: Optional[str] = Query(
+        None, description="Valor 'siguiente' de la página anterior"
+    )
+):
+    """
+    Endpoint que lee la productividad de los usuarios del repositorio
+    desde Elasticsearch, con filtro por estado, totales y paginación por
+    usuario. Si el índice no tiene datos recientes se calcula en vivo.
+    """
+    try:
+        return await leer_con_respaldo(
+            "github_productividad_usuarios", "usuario",
+            {"repo_owner": repo_owner, "repo": repo_name, "status": status},
+            lambda: documentos_productividad(repo_owner, repo_name),
+            tamano, despues, agregaciones=("status",),
+            max_edad=max_edad_lectura(
+                Config.PROGRAMADOR_INTERVALO_PRODUCTIVIDAD
+            )
+        )
+    except Exception as e:
+        raise excepcion_http(e) from e
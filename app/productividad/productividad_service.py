@@ -1,104 +1,161 @@
 """Este es el servicio del modulo productividad"""
+import asyncio
 from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
 import sys
 
 sys.path.append('.')
-from app.utils.github_utils import get_commits, get_pull_requests
-from app.elasticsearch.conexion_elasticsearch import indexar_documento_elasticsearch
+from app.utils.github_utils import (
+    iterar_commits,
+    iterar_pull_requests_recientes,
+    parsear_fecha
+)
+from app.elasticsearch.indexador_bulk import encolar_documento
 
 # Definimos los umbrales para clasificar la productividad
 COMMIT_THRESHOLD = 1  # Al menos 1 commit en las últimas dos semanas
 PR_THRESHOLD = 1  # Al menos 1 PR abierto en las últimas dos semanas
 
 
-async def obtener_productividad_repositorio(repo_owner: str, repo_name: str):
-    """Obtiene y clasifica la productividad de
-    los usuarios de un repositorio específico."""
-
-    # Obtener los commits y pull requests de este repositorio
-    commits = await get_commits(repo_owner, repo_name)
-    prs = await get_pull_requests(repo_owner, repo_name)
-
-    # Definimos el rango de fechas para las últimas dos semanas
-    fecha_limite_2_semanas = datetime.now() - timedelta(weeks=2)
-
-    # Identificamos a los usuarios que han contribuido (por commit o PR)
-    usuarios = set()
-
-    # Agregar usuarios de los commits
+class AgregadorProductividad:
+    """
+    Acumula en una sola pasada los contadores de cada usuario a partir de
+    los commits y pull requests, parseando cada fecha una única vez.
+    """
+
+    def __init__(self, ahora: Optional[datetime] = None):
+        ahora = ahora or datetime.now()
+        # Definimos el rango de fechas para los últimos 30 días y 2 semanas
+        self.fecha_limite_30_dias = ahora - timedelta(days=30)
+        self.fecha_limite_2_semanas = ahora - timedelta(weeks=2)
+        self.contadores: Dict[str, Dict[str, int]] = {}
+
+    def _contador(self, usuario: str) -> Dict[str, int]:
+        """Devuelve (creándolo si hace falta) el contador del usuario."""
+        contador = self.contadores.get(usuario)
+        if contador is None:
+            contador = self.contadores[usuario] = {
+                "commits_recientes": 0,
+                "commits_en_ultimas_2_semanas": 0,
+                "pr_abiertos": 0,
+                "pr_no_fusionados_cerrados": 0,
+            }
+        return contador
+
+    def agregar_commit(self, commit: Dict):
+        """Suma un commit al contador de su autor."""
+        autor = commit.get('author')
+        if not autor:
+            return
+        contador = self._contador(autor['login'])
+        fecha = parsear_fecha(commit['commit']['author']['date'])
+        if fecha > self.fecha_limite_30_dias:
+            contador["commits_recientes"] += 1
+            if fecha > self.fecha_limite_2_semanas:
+                contador["commits_en_ultimas_2_semanas"] += 1
+
+    def agregar_pull_request(self, pr: Dict):
+        """Suma un pull request al contador de su autor."""
+        if not pr['user']:
+            return
+        contador = self._contador(pr['user']['login'])
+        if pr['state'] not in ('open', 'closed'):
+            return
+        if parsear_fecha(pr['created_at']) <= self.fecha_limite_2_semanas:
+            return
+        if pr['state'] == 'open':
+            contador["pr_abiertos"] += 1
+        elif not pr.get('merged', False):
+            contador["pr_no_fusionados_cerrados"] += 1
+
+    def resultado(self):
+        """Clasifica a cada usuario y devuelve la lista y los totales."""
+        productividad = []  # Lista para almacenar los resultados
+        total_productivos = 0
+        total_improductivos = 0
+
+        for usuario, contador in self.contadores.items():
+            # Definimos el estado del usuario para este repositorio
+            if (contador["commits_recientes"] >= COMMIT_THRESHOLD and
+                    contador["pr_abiertos"] >= PR_THRESHOLD):
+                status = "productivo"
+                total_productivos += 1
+            else:
+                status = "improductivo"
+                total_improductivos += 1
+
+            # Agregamos los datos del usuario a la lista de productividad
+            productividad.append({
+                "usuario": usuario,
+                "status": status,
+                "commits": contador["commits_en_ultimas_2_semanas"],
+                "pull_requests_abiertos": contador["pr_abiertos"],
+                "pull_requests_no_fusionados":
+                    contador["pr_no_fusionados_cerrados"]
+            })
+
+        return productividad, total_productivos, total_improductivos
+
+
+def agregar_productividad(
+    commits: Iterable[Dict],
+    prs: Iterable[Dict],
+    ahora: Optional[datetime] = None
+):
+    """Calcula la productividad a partir de listas ya descargadas."""
+    agregador = AgregadorProductividad(ahora)
     for commit in commits:
-        usuario = commit['author']['login']
-        usuarios.add(usuario)
-
-    # Agregar usuarios de los pull requests
+        agregador.agregar_commit(commit)
     for pr in prs:
-        if pr['user']:
-            usuario = pr['user']['login']
-            usuarios.add(usuario)
-
-    # Clasificamos la productividad de cada usuario
-    productividad = []  # Lista para almacenar los resultados
-
-    total_productivos = 0
-    total_improductivos = 0
-
-    for usuario in usuarios:
-
-        # Filtramos todos los commits de los últimos 30 días
-        commits_recientes = [
-            commit for commit in commits
-            if commit['author']['login'] == usuario
-            and datetime.strptime(
-                commit['commit']['author']['date'], '%Y-%m-%dT%H:%M:%SZ'
-            ) > datetime.now() - timedelta(days=30)
-        ]
-
-        # Filtramos los commits recientes solo de las últimas dos semanas
-        commits_en_ultimas_2_semanas = [
-            commit for commit in commits_recientes
-            if datetime.strptime(
-                commit['commit']['author']['date'], '%Y-%m-%dT%H:%M:%SZ'
-            ) > fecha_limite_2_semanas
-        ]
-
-        # Filtrar los pull requests abiertos del
-        # usuario en las últimas dos semanas
-        pr_abiertos = [
-            pr for pr in prs
-            if pr['user']['login'] == usuario and pr['state'] == 'open' and
-            datetime.strptime(pr['created_at'],
-                              '%Y-%m-%dT%H:%M:%SZ') > fecha_limite_2_semanas
-        ]
-
-        # Filtrar los pull requests cerrados no fusionados del
-        # usuario en las últimas dos semanas
-        pr_no_fusionados_cerrados = [
-            pr for pr in prs
-            if pr['user']['login'] == usuario and pr['state'] == 'closed' and
-            not pr.get('merged', False) and datetime.strptime(
-                pr['created_at'], '%Y-%m-%dT%H:%M:%SZ'
-            ) > fecha_limite_2_semanas
-        ]
-
-        # Definimos el estado del usuario para este repositorio
-        if (len(commits_recientes) >= COMMIT_THRESHOLD and
-                len(pr_abiertos) >= PR_THRESHOLD):
-            status = "productivo"
-            total_productivos += 1
-        else:
-            status = "improductivo"
-            total_improductivos += 1
-
-        # Agregamos los datos del usuario a la lista de productividad
-        productividad.append({
-            "usuario": usuario,
-            "status": status,
-            "commits": len(commits_en_ultimas_2_semanas),
-            "pull_requests_abiertos": len(pr_abiertos),
-            "pull_requests_no_fusionados": len(pr_no_fusionados_cerrados)
-        })
-
-    return productividad, total_productivos, total_improductivos
+        agregador.agregar_pull_request(pr)
+    return agregador.resultado()
+
+
+async def obtener_productividad_repositorio(repo_owner: str, repo_name: str):
+    """Obtiene y clasifica la productividad de
+    los usuarios de un repositorio específico.
+
+    Los commits y pull requests se agregan página a página según llegan,
+    sin guardar los listados completos en memoria. Solo se descargan los
+    pull requests creados dentro de la ventana de dos semanas.
+    """
+    agregador = AgregadorProductividad()
+
+    async def consumir_commits():
+        async for commit in iterar_commits(repo_owner, repo_name):
+            agregador.agregar_commit(commit)
+
+    async def consumir_pull_requests():
+        async for pr in iterar_pull_requests_recientes(
+            repo_owner, repo_name, agregador.fecha_limite_2_semanas
+        ):
+            agregador.agregar_pull_request(pr)
+
+    # Ambos listados se recorren a la vez
+    await asyncio.gather(consumir_commits(), consumir_pull_requests())
+
+    return agregador.resultado()
+
+
+def _documento_productividad(
+    repo_owner: str,
+    repo_name: str,
+    usuario_data: Dict,
+    total_productivos: int,
+    total_improductivos: int
+) -> Dict:
+    """Documento de Elasticsearch con la productividad de un usuario."""
+    return {
+        "repo_owner": repo_owner,
+        "repo": repo_name,
+        "usuario": usuario_data["usuario"],
+        "status": usuario_data["status"],
+        "commits": usuario_data["commits"],
+        "pull_requests_abiertos": usuario_data["pull_requests_abiertos"],
+        "pull_requests_no_fusionados": usuario_data["pull_requests_no_fusionados"],
+        "usuarios_productivos": total_productivos,
+        "usuarios_improductivos": total_improductivos,
+    }
 
 
 async def obtener_productividad_por_repositorio(repo_owner: str, repo_name: str):
@@ -109,25 +166,13 @@ async def obtener_productividad_por_repositorio(repo_owner: str, repo_name: str)
 
     #Indexación de los documentos en Elasticsearch
     for usuario_data in productividad:
-        documento = {
-            "repo": repo_name,
-            "usuario": usuario_data["usuario"],
-            "status": usuario_data["status"],
-            "commits": usuario_data["commits"],
-            "pull_requests_abiertos": usuario_data["pull_requests_abiertos"],
-            "pull_requests_no_fusionados": usuario_data["pull_requests_no_fusionados"],
-            "usuarios_productivos": total_productivos,
-            "usuarios_improductivos": total_improductivos,
-        }
-
-        # Indexar el documento en Elasticsearch
-        response = await indexar_documento_elasticsearch("github_productividad_usuarios", documento)
-
-        # Verificar y mostrar el resultado en consola
-        if "result" in response and response["result"] == "created":
-            print(f"Documento para el usuario {usuario_data['usuario']} indexado correctamente.")
-        else:
-            print(f"Error al indexar el documento para el usuario {usuario_data['usuario']}: {response}")
+        documento = _documento_productividad(
+            repo_owner, repo_name, usuario_data,
+            total_productivos, total_improductivos
+        )
+
+        # Encolar el documento para indexarlo en lote en Elasticsearch
+        await encolar_documento("github_productividad_usuarios", documento)
 
     # Devolvemos la estructura organizada para el frontend
     return {
@@ -136,3 +181,23 @@ async def obtener_productividad_por_repositorio(repo_owner: str, repo_name: str)
         "usuarios_productivos": total_productivos,
         "usuarios_improductivos": total_improductivos
     }
+
+
+async def documentos_productividad(
+    repo_owner: str, repo_name: str
+) -> List[Dict]:
+    """
+    Calcula en vivo la productividad del repositorio y la devuelve con el
+    formato de los documentos del índice ``github_productividad_usuarios``.
+    """
+    resultado = await obtener_productividad_por_repositorio(
+        repo_owner, repo_name
+    )
+    return [
+        _documento_productividad(
+            repo_owner, repo_name, usuario_data,
+            resultado["usuarios_productivos"],
+            resultado["usuarios_improductivos"]
+        )
+        for usuario_data in resultado["usuarios_productivos_improductivos"]
+    ]
@@ -0,0 +1,65 @@
+"""
+Worker del programador como proceso independiente de la API:
+
+    python -m app.programador              # bucle continuo
+    python -m app.programador --una-vez    # una pasada (cron)
+
+Los usuarios y repositorios salen de PROGRAMADOR_USUARIOS y
+PROGRAMADOR_REPOS o de los argumentos.
+"""
+import argparse
+import asyncio
+import logging
+from app.utils.github_utils import iniciar_cliente, cerrar_cliente
+from app.elasticsearch.conexion_elasticsearch import (
+    iniciar_elasticsearch,
+    cerrar_elasticsearch
+)
+from app.elasticsearch.indexador_bulk import (
+    iniciar_indexador,
+    detener_indexador
+)
+from app.programador.programador_service import Programador, crear_tareas
+
+
+async def main(args: argparse.Namespace):
+    """Abre los recursos compartidos y ejecuta el programador."""
+    tareas = crear_tareas(args.usuario or None, args.repo or None)
+    if not tareas:
+        raise SystemExit("No hay usuarios ni repositorios que refrescar")
+
+    await iniciar_cliente()
+    await iniciar_elasticsearch()
+    await iniciar_indexador()
+    try:
+        programador = Programador(tareas)
+        if args.una_vez:
+            await programador.ejecutar_todas()
+        else:
+            await programador.ejecutar_siempre()
+    finally:
+        # Vacía la cola del indexador antes de salir
+        await detener_indexador()
+        await cerrar_elasticsearch()
+        await cerrar_cliente()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--usuario", action="append", default=[],
+        help="Usuario u organización cuyos repositorios se clasifican"
+    )
+    parser.add_argument(
+        "--repo", action="append", default=[],
+        help="Repositorio owner/repo para productividad y Dependabot"
+    )
+    parser.add_argument(
+        "--una-vez", action="store_true",
+        help="Ejecutar todas las tareas una vez y salir"
+    )
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,243 @@
+"""Programador que refresca periódicamente los datos fuera de las peticiones."""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import sys
+sys.path.append('.')
+from config import Config
+from app.utils.cache_resultados import (
+    CacheResultados,
+    obtener_cache_resultados
+)
+from app.repositorios.activity_service import clasificar_repositorios
+from app.productividad.productividad_service import (
+    obtener_productividad_por_repositorio
+)
+from app.dependabots.dependabots_service import (
+    obtener_dependabots_solucionados_y_no_solucionados
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TareaProgramada:
+    """
+    Cálculo que se repite cada ``intervalo`` segundos. ``espacio`` y
+    ``parametros`` coinciden con los del endpoint, de modo que el
+    resultado queda en la caché de resultados listo para servirse.
+    """
+
+    def __init__(
+        self,
+        espacio: str,
+        parametros: Dict,
+        calcular: Callable[[], Awaitable[Any]],
+        intervalo: float
+    ):
+        self.espacio = espacio
+        self.parametros = parametros
+        self.calcular = calcular
+        self.intervalo = intervalo
+        self.proxima = 0.0
+        self.ejecuciones = 0
+        self.errores = 0
+        self.ultima_ejecucion: Optional[float] = None
+        self.ultimo_error: Optional[str] = None
+
+    @property
+    def nombre(self) -> str:
+        """Nombre legible de la tarea."""
+        valores = "/".join(
+            str(valor) for valor in self.parametros.values()
+            if valor is not None
+        )
+        return f"{self.espacio}:{valores}"
+
+    def estadisticas(self) -> Dict:
+        """Estado de la tarea para las métricas."""
+        return {
+            "intervalo": self.intervalo,
+            "ejecuciones": self.ejecuciones,
+            "errores": self.errores,
+            "ultima_ejecucion": self.ultima_ejecucion,
+            "ultimo_error": self.ultimo_error,
+        }
+
+
+class Programador:
+    """
+    Ejecuta las tareas cuando les toca, de una en una, para no competir
+    con las peticiones de los usuarios por el presupuesto de GitHub. Las
+    primeras ejecuciones se reparten a lo largo del intervalo de cada
+    tarea en lugar de lanzarse todas a la vez. Los documentos se indexan
+    en lote a través del indexador de Elasticsearch.
+    """
+
+    def __init__(
+        self,
+        tareas: List[TareaProgramada],
+        cache: Optional[CacheResultados] = None,
+        reloj: Callable[[], float] = time.monotonic,
+        muro: Callable[[], float] = time.time,
+        dormir: Callable = asyncio.sleep
+    ):
+        self.tareas = tareas
+        self._cache = cache
+        self._reloj = reloj
+        self._muro = muro
+        self._dormir = dormir
+        self._tarea: Optional[asyncio.Task] = None
+        self._repartir()
+
+    def _repartir(self):
+        """Escalona la primera ejecución de las tareas de cada intervalo."""
+        ahora = self._reloj()
+        por_intervalo: Dict[float, List[TareaProgramada]] = {}
+        for tarea in self.tareas:
+            por_intervalo.setdefault(tarea.intervalo, []).append(tarea)
+        for intervalo, tareas in por_intervalo.items():
+            hueco = intervalo / len(tareas)
+            for posicion, tarea in enumerate(tareas):
+                tarea.proxima = ahora + posicion * hueco
+
+    def _obtener_cache(self) -> CacheResultados:
+        """Caché en la que se dejan los resultados."""
+        return self._cache or obtener_cache_resultados()
+
+    async def _ejecutar(self, tarea: TareaProgramada):
+        """Ejecuta una tarea y guarda el resultado en la caché."""
+        tarea.proxima = self._reloj() + tarea.intervalo
+        try:
+            await self._obtener_cache().actualizar(
+                tarea.espacio, tarea.parametros, tarea.calcular
+            )
+            tarea.ultimo_error = None
+        except Exception as e:
+            logger.error(f"Error al refrescar {tarea.nombre}: {e}")
+            tarea.errores += 1
+            tarea.ultimo_error = str(e)
+        tarea.ejecuciones += 1
+        tarea.ultima_ejecucion = self._muro()
+
+    async def ejecutar_pendientes(self) -> int:
+        """Ejecuta las tareas a las que ya les toca y devuelve cuántas."""
+        pendientes = sorted(
+            (t for t in self.tareas if t.proxima <= self._reloj()),
+            key=lambda t: t.proxima
+        )
+        for tarea in pendientes:
+            await self._ejecutar(tarea)
+        return len(pendientes)
+
+    async def ejecutar_todas(self):
+        """Ejecuta todas las tareas una vez, sin esperar a su turno."""
+        for tarea in self.tareas:
+            await self._ejecutar(tarea)
+
+    async def ejecutar_siempre(self):
+        """Bucle principal: ejecuta lo pendiente y duerme hasta la próxima."""
+        while True:
+            await self.ejecutar_pendientes()
+            if not self.tareas:
+                return
+            proxima = min(tarea.proxima for tarea in self.tareas)
+            await self._dormir(max(0.0, proxima - self._reloj()))
+
+    def iniciar(self):
+        """Arranca el bucle en segundo plano."""
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self.ejecutar_siempre())
+
+    async def detener(self):
+        """Detiene el bucle en segundo plano."""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            await asyncio.gather(self._tarea, return_exceptions=True)
+            self._tarea = None
+
+    def estadisticas(self) -> Dict:
+        """Estado de cada tarea, por nombre."""
+        return {tarea.nombre: tarea.estadisticas() for tarea in self.tareas}
+
+
+def _lista(valor: str) -> List[str]:
+    """Separa una variable de entorno con valores separados por comas."""
+    return [elemento.strip() for elemento in valor.split(",") if elemento.strip()]
+
+
+def crear_tareas(
+    usuarios: Optional[List[str]] = None,
+    repos: Optional[List[str]] = None
+) -> List[TareaProgramada]:
+    """
+    Tareas para los usuarios (clasificación de repositorios) y los
+    repositorios ``owner/repo`` (productividad y Dependabot) indicados,
+    por defecto los de ``Config.PROGRAMADOR_USUARIOS`` y
+    ``Config.PROGRAMADOR_REPOS``.
+    """
+    if usuarios is None:
+        usuarios = _lista(Config.PROGRAMADOR_USUARIOS)
+    if repos is None:
+        repos = _lista(Config.PROGRAMADOR_REPOS)
+
+    tareas = []
+    for usuario in usuarios:
+        tareas.append(TareaProgramada(
+            "repositorios",
+            {"usuario": usuario, "fuente": "rest", "modo": "completo"},
+            # Incremental: los repos sin pushes no gastan peticiones
+            lambda usuario=usuario: clasificar_repositorios(
+                usuario, incremental=True
+            ),
+            Config.PROGRAMADOR_INTERVALO_REPOSITORIOS
+        ))
+    for repo in repos:
+        repo_owner, _, repo_name = repo.partition("/")
+        if not repo_name:
+            raise ValueError(f"Repositorio no válido (owner/repo): {repo}")
+        tareas.append(TareaProgramada(
+            "productividad",
+            {"repo_owner": repo_owner, "repo_name": repo_name},
+            lambda o=repo_owner, n=repo_name: (
+                obtener_productividad_por_repositorio(o, n)
+            ),
+            Config.PROGRAMADOR_INTERVALO_PRODUCTIVIDAD
+        ))
+        tareas.append(TareaProgramada(
+            "dependabots",
+            {"repo_owner": repo_owner, "repo_name": repo_name,
+             "start_date": None, "end_date": None},
+            lambda o=repo_owner, n=repo_name: (
+                obtener_dependabots_solucionados_y_no_solucionados(o, n)
+            ),
+            Config.PROGRAMADOR_INTERVALO_DEPENDABOTS
+        ))
+    return tareas
+
+
+_programador: Optional[Programador] = None
+
+
+def obtener_programador() -> Optional[Programador]:
+    """Devuelve el programador en marcha, si lo hay."""
+    return _programador
+
+
+async def iniciar_programador():
+    """
+    Arranca el programador dentro del proceso de la API si
+    ``Config.PROGRAMADOR_ACTIVO`` está activado.
+    """
+    global _programador
+    if Config.PROGRAMADOR_ACTIVO and _programador is None:
+        _programador = Programador(crear_tareas())
+        _programador.iniciar()
+
+
+async def detener_programador():
+    """Detiene el programador de la API."""
+    global _programador
+    if _programador is not None:
+        await _programador.detener()
+        _programador = None
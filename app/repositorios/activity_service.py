@@ -1,45 +1,192 @@
 """Servicio para clasificar repositorios en activos e inactivos."""
+import asyncio
 import sys
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional
 sys.path.append('.')
-from app.elasticsearch.conexion_elasticsearch import indexar_documento_elasticsearch
+from config import Config
+from app.elasticsearch.indexador_bulk import encolar_documento
 sys.path.append('.')
 from app.utils.github_utils import (
     get_repos,
+    iterar_repos,
     get_commits,
     get_pull_requests,
-    GithubAPIException
+    iterar_commits,
+    iterar_pull_requests_recientes,
+    parsear_fecha,
+    GithubAPIException,
+    GithubLimiteUsoException
 )
+from app.repositorios.graphql_service import iterar_actividad_repositorios
+from app.repositorios.marcas_agua import (
+    llamar_almacen,
+    obtener_almacen_marcas
+)
+
+# Fuentes de datos disponibles para la clasificación
+FUENTE_REST = "rest"
+FUENTE_GRAPHQL = "graphql"
+
+# Modos de clasificación: con estadísticas de PRs o solo con el listado
+MODO_COMPLETO = "completo"
+MODO_RAPIDO = "rapido"
+
+# Días sin commits a partir de los que un repositorio es inactivo
+DIAS_ACTIVIDAD = 30
+
+
+def _nuevo_repo_data(nombre: str, url: str) -> Dict:
+    """Estructura inicial de los datos de un repositorio."""
+    return {
+        "repo": nombre,
+        "url": url,
+        "status": "",  # Aquí vamos a poner el estado
+        "pull_requests": {
+            "abiertos": 0,
+            "cerrados": 0,
+            "resueltos": 0,
+            "estado_repo": ""
+        }
+    }
+
+
+def _estado_pull_request(pr: Dict) -> Optional[str]:
+    """Estado de un PR a efectos de la clasificación."""
+    if pr['state'] == 'open':
+        return "abierto"
+    if pr['state'] == 'closed':
+        # Si el PR fue mergeado
+        return "resuelto" if pr.get('merged', True) else "cerrado"
+    return None
+
+
+def _contar_pull_requests(estados: Iterable[Optional[str]]):
+    """Cuenta abiertos, cerrados y resueltos (que también son cerrados)."""
+    abiertos = 0
+    cerrados = 0
+    resueltos = 0
+    for estado in estados:
+        if estado == "abierto":
+            abiertos += 1
+        elif estado is not None:
+            cerrados += 1
+            if estado == "resuelto":
+                resueltos += 1
+    return abiertos, cerrados, resueltos
 
 
-async def clasificar_repositorios(usuario: str):
+def _asignar_pull_requests(
+    repo_data: Dict, abiertos: int, cerrados: int, resueltos: int
+):
+    """Guarda los totales de PRs y calcula el estado del repositorio."""
+    repo_data["pull_requests"]["abiertos"] = abiertos
+    repo_data["pull_requests"]["cerrados"] = cerrados
+    repo_data["pull_requests"]["resueltos"] = resueltos
+
+    # Calcular el porcentaje de PRs cerrados
+    total_prs = abiertos + cerrados
+    if total_prs > 0:
+        porcentaje_cerrados = cerrados / total_prs * 100
+        if porcentaje_cerrados > 80:
+            repo_data["pull_requests"]["estado_repo"] = "Repo Estable"
+        elif 60 <= porcentaje_cerrados <= 80:
+            repo_data["pull_requests"]["estado_repo"] = "Repo Dinámico"
+        else:
+            repo_data["pull_requests"]["estado_repo"] = "Repo Ineficiente"
+    else:
+        repo_data["pull_requests"]["estado_repo"] = "Repo Ineficiente"
+
+
+def _activo_por_metadatos(repo: Dict, limite: datetime) -> Optional[bool]:
     """
-    Clasifica los repositorios del usuario en activos e inactivos.
-    Un repositorio es activo si tiene commits en los últimos 30 días.
-    Además, evalúa el estado del repositorio basado en pull requests.
+    Decide la actividad con los datos del listado de repositorios: los
+    archivados y los vacíos son inactivos y el resto depende de
+    ``pushed_at``. Devuelve None si el listado no trae esos datos.
     """
-    repos = await get_repos(usuario)
-    repos_con_estado = []
-
-    for repo in repos:
-        nombre = repo["name"]
-        url = repo.get("html_url", "")
-
-        # Iniciamos los datos del repositorio
-        repo_data = {
-            "repo": nombre,
-            "url": url,
-            "status": "",  # Aquí vamos a poner el estado
-            "pull_requests": {
-                "abiertos": 0,
-                "cerrados": 0,
-                "resueltos": 0,
-                "estado_repo": ""
-            }
-        }
+    if repo.get("archived") or repo.get("size") == 0:
+        return False
+    if repo.get("pushed_at") is None:
+        return None
+    return parsear_fecha(repo["pushed_at"]) >= limite
+
+
+def _limite_actividad() -> datetime:
+    """Fecha a partir de la cual un commit cuenta como reciente."""
+    return datetime.now() - timedelta(days=DIAS_ACTIVIDAD)
+
+
+def _documento_repositorio(usuario: str, repo_data: Dict) -> Dict:
+    """Documento de Elasticsearch de un repositorio clasificado."""
+    documento = {
+        "usuario": usuario,
+        "repo": repo_data["repo"],
+        "url": repo_data["url"],
+        "status": repo_data["status"],
+        "modo": MODO_COMPLETO
+    }
+    # En modo rápido no hay estadísticas de pull requests
+    if repo_data["pull_requests"] is None:
+        documento["modo"] = MODO_RAPIDO
+    else:
+        documento.update({
+            "estado_repo": repo_data["pull_requests"]["estado_repo"],
+            "pull_requests_abiertos": repo_data["pull_requests"]["abiertos"],
+            "pull_requests_cerrados": repo_data["pull_requests"]["cerrados"],
+            "pull_requests_resueltos": repo_data["pull_requests"]["resueltos"]
+        })
+    return documento
+
+
+async def _indexar_repositorio(usuario: str, repo_data: Dict):
+    """Encola el documento del repositorio para Elasticsearch."""
+    #Crear documento para Elasticsearch
+    documento = _documento_repositorio(usuario, repo_data)
+
+    # Encolar el documento para indexarlo en lote en Elasticsearch
+    await encolar_documento("github_repositorios", documento)
+
+
+async def _sin_commits() -> list:
+    """Sustituye a get_commits cuando el listado ya prueba la inactividad."""
+    return []
+
+
+async def _obtener_commits_y_prs(
+    usuario: str, nombre: str, pedir_commits: bool = True
+):
+    """
+    Pide los commits y los pull requests de un repositorio a la vez.
+    Si alguna de las dos peticiones falla se propaga su excepción.
+    """
+    commits, prs = await asyncio.gather(
+        get_commits(usuario, nombre) if pedir_commits else _sin_commits(),
+        get_pull_requests(usuario, nombre),
+        return_exceptions=True
+    )
+    for resultado in (commits, prs):
+        if isinstance(resultado, BaseException):
+            raise resultado
+    return commits, prs
 
+
+async def _clasificar_repositorio(
+    usuario: str, repo: Dict, semaforo: asyncio.Semaphore
+) -> Dict:
+    """Clasifica un único repositorio respetando el límite de concurrencia."""
+    repo_data = _nuevo_repo_data(repo["name"], repo.get("html_url", ""))
+    # Si el último push es anterior a la ventana no hace falta pedir commits
+    pedir_commits = (
+        _activo_por_metadatos(repo, _limite_actividad()) is not False
+    )
+
+    async with semaforo:
         try:
-            # Obtenemos los commits del repositorio
-            commits = await get_commits(usuario, nombre)
+            # Obtenemos los commits y pull requests del repositorio
+            commits, prs = await _obtener_commits_y_prs(
+                usuario, repo["name"], pedir_commits
+            )
 
             if commits:
                 # Si tiene commits recientes, lo marcamos como activo
@@ -48,62 +195,322 @@ async def clasificar_repositorios(usuario: str):
                 # Si no tiene commits, lo marcamos como inactivo
                 repo_data["status"] = "inactivo"
 
-            # Obtener los pull requests del repositorio
-            prs = await get_pull_requests(usuario, nombre)
-            abiertos = 0
-            cerrados = 0
-            resueltos = 0
-
-            for pr in prs:
-                if pr['state'] == 'open':
-                    abiertos += 1
-                elif pr['state'] == 'closed':
-                    cerrados += 1
-                    if pr.get('merged', True):  # Si el PR fue mergeado
-                        resueltos += 1
-
-            repo_data["pull_requests"]["abiertos"] = abiertos
-            repo_data["pull_requests"]["cerrados"] = cerrados
-            repo_data["pull_requests"]["resueltos"] = resueltos
-
-            # Calcular el porcentaje de PRs cerrados
-            total_prs = abiertos + cerrados
-            if total_prs > 0:
-                porcentaje_cerrados = cerrados / total_prs * 100
-                if porcentaje_cerrados > 80:
-                    repo_data["pull_requests"]["estado_repo"] = "Repo Estable"
-                elif 60 <= porcentaje_cerrados <= 80:
-                    repo_data["pull_requests"]["estado_repo"] = "Repo Dinámico"
-                else:
-                    repo_data["pull_requests"][
-                        "estado_repo"
-                    ] = "Repo Ineficiente"
-            else:
-                repo_data["pull_requests"]["estado_repo"] = "Repo Ineficiente"
+            _asignar_pull_requests(repo_data, *_contar_pull_requests(
+                _estado_pull_request(pr) for pr in prs
+            ))
 
-        except GithubAPIException:
+        except GithubLimiteUsoException:
+            # Sin presupuesto no se clasifica nada más: responde 429
+            raise
+        except GithubAPIException as e:
+            # Se marca para que el resultado no se tome como completo
             repo_data["status"] = "inactivo"
+            repo_data["error"] = str(e)
 
-        #Crear documento para Elasticsearch
-        documento = {
-            "usuario": usuario,
-            "repo": nombre,
-            "url": url,
-            "estado_repo": repo_data["pull_requests"]["estado_repo"],
-            "status": repo_data["status"],
-            "pull_requests_abiertos": repo_data["pull_requests"]["abiertos"],
-            "pull_requests_cerrados": repo_data["pull_requests"]["cerrados"],
-            "pull_requests_resueltos": repo_data["pull_requests"]["resueltos"]
-        }   
+    await _indexar_repositorio(usuario, repo_data)
+    return repo_data
 
-        # Indexar el documento en Elasticsearch
-        await indexar_documento_elasticsearch("github_repositorios", documento)
 
-        # Añadimos el repositorio con su estado a la lista
-        repos_con_estado.append(repo_data)
+def _fecha_commit(commit: Dict) -> str:
+    """Fecha de un commit en formato ISO (ahora si no viene)."""
+    fecha = commit.get("commit", {}).get("committer", {}).get("date")
+    return fecha or datetime.now().isoformat()
 
 
+async def _ultimo_commit(usuario: str, nombre: str) -> Optional[Dict]:
+    """Commit más reciente de los últimos 30 días (solo la primera página)."""
+    commits = iterar_commits(usuario, nombre)
+    try:
+        async for commit in commits:
+            return commit
+    finally:
+        await commits.aclose()
+    return None
+
+
+async def _pull_requests_actualizados(
+    usuario: str, nombre: str, desde: Optional[str]
+):
+    """Pull requests actualizados desde la marca de agua (todos si no hay)."""
+    return [
+        pr async for pr in iterar_pull_requests_recientes(
+            usuario, nombre,
+            parsear_fecha(desde) if desde else datetime.min,
+            campo="updated"
+        )
+    ]
+
+
+def _marca_vigente(marca: Optional[Dict], repo: Dict, ahora: float) -> bool:
+    """
+    La marca sirve sin preguntar a GitHub si el repositorio no ha recibido
+    pushes desde entonces y no supera ``Config.REPOS_MARCAS_MAX_EDAD``.
+    """
+    return (
+        marca is not None
+        and repo.get("pushed_at") is not None
+        and marca["pushed_at"] == repo["pushed_at"]
+        and ahora - marca["revisado_en"] < Config.REPOS_MARCAS_MAX_EDAD
+    )
+
+
+async def _actualizar_marca(
+    usuario: str, repo: Dict, marca: Optional[Dict]
+) -> Dict:
+    """
+    Sin marca previa pide los commits y todos los PRs; con marca, solo el
+    último commit y los PRs actualizados desde la marca, y los mezcla con
+    los estados guardados.
+    """
+    nombre = repo["name"]
+    if marca is None:
+        commits, prs = await _obtener_commits_y_prs(usuario, nombre)
+        ultimo = commits[0] if commits else None
+        marca = {"ultimo_commit": None, "prs_updated_at": None,
+                 "pull_requests": {}}
+    else:
+        ultimo, prs = await asyncio.gather(
+            _ultimo_commit(usuario, nombre),
+            _pull_requests_actualizados(
+                usuario, nombre, marca["prs_updated_at"]
+            )
+        )
+
+    if ultimo is not None:
+        marca["ultimo_commit"] = _fecha_commit(ultimo)
+    for pr in prs:
+        marca["pull_requests"][str(pr["number"])] = _estado_pull_request(pr)
+        if pr.get("updated_at") and (
+            marca["prs_updated_at"] is None
+            or pr["updated_at"] > marca["prs_updated_at"]
+        ):
+            marca["prs_updated_at"] = pr["updated_at"]
+    marca["pushed_at"] = repo.get("pushed_at")
+    marca["revisado_en"] = time.time()
+    return marca
+
+
+async def _clasificar_incremental(
+    usuario: str, repo: Dict, semaforo: asyncio.Semaphore
+) -> Dict:
+    """
+    Clasifica un repositorio a partir de su marca de agua: si no ha
+    cambiado no se hace ninguna petición y, si ha cambiado, solo se piden
+    los datos nuevos.
+    """
+    repo_data = _nuevo_repo_data(repo["name"], repo.get("html_url", ""))
+    marcas = obtener_almacen_marcas()
+    marca = await llamar_almacen(marcas, "obtener", usuario, repo["name"])
+
+    if not _marca_vigente(marca, repo, time.time()):
+        async with semaforo:
+            try:
+                marca = await _actualizar_marca(usuario, repo, marca)
+                await llamar_almacen(
+                    marcas, "guardar", usuario, repo["name"], marca
+                )
+            except GithubLimiteUsoException:
+                raise
+            except GithubAPIException as e:
+                marca = None
+                repo_data["error"] = str(e)
+
+    if marca is None:
+        repo_data["status"] = "inactivo"
+    else:
+        # El estado depende de la fecha, no solo de los datos guardados
+        limite = _limite_actividad()
+        ultimo = marca["ultimo_commit"]
+        repo_data["status"] = (
+            "activo" if ultimo and parsear_fecha(ultimo) >= limite
+            else "inactivo"
+        )
+        _asignar_pull_requests(repo_data, *_contar_pull_requests(
+            marca["pull_requests"].values()
+        ))
+
+    await _indexar_repositorio(usuario, repo_data)
+    return repo_data
+
+
+async def _clasificar_por_metadatos(
+    usuario: str, repo: Dict, _semaforo: asyncio.Semaphore
+) -> Dict:
+    """
+    Clasificación rápida: la actividad sale de ``pushed_at`` del listado,
+    sin ninguna petición por repositorio ni estadísticas de PRs.
+    """
+    repo_data = _nuevo_repo_data(repo["name"], repo.get("html_url", ""))
+    repo_data["pull_requests"] = None
+    activo = _activo_por_metadatos(repo, _limite_actividad())
+    repo_data["status"] = "activo" if activo else "inactivo"
+    await _indexar_repositorio(usuario, repo_data)
+    return repo_data
+
+
+def _clasificador(modo: str, incremental: bool):
+    """Función que clasifica un repositorio en el modo indicado."""
+    if modo == MODO_RAPIDO:
+        return _clasificar_por_metadatos
+    return _clasificar_incremental if incremental else _clasificar_repositorio
+
+
+async def _clasificar_con_rest(
+    usuario: str,
+    concurrencia: Optional[int],
+    progreso: Optional[Callable[[int, Optional[int]], None]] = None,
+    incremental: bool = False,
+    modo: str = MODO_COMPLETO
+):
+    """Clasifica con la API REST: dos peticiones por repositorio."""
+    repos = await get_repos(usuario)
+    semaforo = asyncio.Semaphore(concurrencia or Config.GITHUB_CONCURRENCIA)
+    clasificar_repo = _clasificador(modo, incremental)
+    hechos = 0
+
+    async def clasificar(repo: Dict) -> Dict:
+        nonlocal hechos
+        repo_data = await clasificar_repo(usuario, repo, semaforo)
+        hechos += 1
+        if progreso is not None:
+            progreso(hechos, len(repos))
+        return repo_data
+
+    # Todos los repos con su estado, en el mismo orden que el listado
+    return list(await asyncio.gather(*(clasificar(repo) for repo in repos)))
+
+
+async def _iterar_con_rest(
+    usuario: str,
+    concurrencia: Optional[int],
+    incremental: bool = False,
+    modo: str = MODO_COMPLETO
+) -> AsyncIterator[Dict]:
+    """
+    Clasifica con la API REST y entrega cada repositorio en cuanto termina,
+    empezando a procesar mientras todavía llegan páginas del listado.
+    """
+    semaforo = asyncio.Semaphore(concurrencia or Config.GITHUB_CONCURRENCIA)
+    clasificar_repo = _clasificador(modo, incremental)
+    pendientes = set()
+    try:
+        async for repo in iterar_repos(usuario):
+            pendientes.add(asyncio.ensure_future(
+                clasificar_repo(usuario, repo, semaforo)
+            ))
+            terminadas = {tarea for tarea in pendientes if tarea.done()}
+            pendientes -= terminadas
+            for tarea in terminadas:
+                yield tarea.result()
+
+        while pendientes:
+            terminadas, pendientes = await asyncio.wait(
+                pendientes, return_when=asyncio.FIRST_COMPLETED
+            )
+            for tarea in terminadas:
+                yield tarea.result()
+    finally:
+        # Si el cliente se desconecta no se sigue trabajando
+        for tarea in pendientes:
+            tarea.cancel()
+
+
+async def _iterar_con_graphql(usuario: str) -> AsyncIterator[Dict]:
+    """Clasifica con la API GraphQL: una consulta por lote de repositorios."""
+    async for repo in iterar_actividad_repositorios(usuario):
+        repo_data = _nuevo_repo_data(repo["name"], repo["html_url"])
+        repo_data["status"] = (
+            "activo" if repo["commits_recientes"] else "inactivo"
+        )
+        _asignar_pull_requests(
+            repo_data, repo["abiertos"], repo["cerrados"], repo["resueltos"]
+        )
+        await _indexar_repositorio(usuario, repo_data)
+        yield repo_data
+
+
+async def iterar_clasificacion_repositorios(
+    usuario: str,
+    concurrencia: Optional[int] = None,
+    fuente: str = FUENTE_REST,
+    incremental: bool = False,
+    modo: str = MODO_COMPLETO
+) -> AsyncIterator[Dict]:
+    """
+    Versión en streaming de ``clasificar_repositorios``: produce un
+    registro ``{"tipo": "repo", ...}`` por repositorio en cuanto se
+    clasifica (sin orden garantizado) y un último registro
+    ``{"tipo": "resumen", "total": N}``.
+    """
+    if fuente == FUENTE_GRAPHQL and modo != MODO_RAPIDO:
+        repos = _iterar_con_graphql(usuario)
+    else:
+        repos = _iterar_con_rest(usuario, concurrencia, incremental, modo)
+
+    total = 0
+    async for repo_data in repos:
+        total += 1
+        yield {"tipo": "repo", **repo_data}
+    yield {"tipo": "resumen", "total": total}
+
+
+async def clasificar_repositorios(
+    usuario: str,
+    concurrencia: Optional[int] = None,
+    fuente: str = FUENTE_REST,
+    progreso: Optional[Callable[[int, Optional[int]], None]] = None,
+    incremental: bool = False,
+    modo: str = MODO_COMPLETO
+):
+    """
+    Clasifica los repositorios del usuario en activos e inactivos.
+    Un repositorio es activo si tiene commits en los últimos 30 días.
+    Además, evalúa el estado del repositorio basado en pull requests.
+
+    Con ``fuente="rest"`` los repositorios se procesan en paralelo, como
+    máximo ``concurrencia`` a la vez (por defecto
+    ``Config.GITHUB_CONCURRENCIA``), y el resultado conserva el orden de
+    ``get_repos``. Con ``fuente="graphql"`` los datos de muchos
+    repositorios llegan en una sola consulta.
+
+    Con ``incremental=True`` (solo REST) se guardan marcas de agua por
+    repositorio (``pushed_at``, último ``updated_at`` de los PRs y estado
+    de cada PR): los repositorios cuyo ``pushed_at`` no ha cambiado no
+    generan ninguna petición y del resto solo se piden el último commit y
+    los PRs actualizados desde la marca.
+
+    Con ``modo="rapido"`` la actividad se decide solo con ``pushed_at``
+    del listado (archivados y vacíos son inactivos), sin peticiones por
+    repositorio y con ``pull_requests`` a None. En modo completo tampoco
+    se piden los commits de los repositorios sin pushes en la ventana.
+
+    Si se indica, ``progreso(hechos, total)`` se llama al terminar cada
+    repositorio (``total`` es None si aún no se conoce).
+    """
+    if fuente == FUENTE_GRAPHQL and modo != MODO_RAPIDO:
+        repos_con_estado = []
+        async for repo_data in _iterar_con_graphql(usuario):
+            repos_con_estado.append(repo_data)
+            if progreso is not None:
+                progreso(len(repos_con_estado), None)
+    else:
+        repos_con_estado = await _clasificar_con_rest(
+            usuario, concurrencia, progreso, incremental, modo
+        )
+
     return {
-        "total": len(repos),  # Número total de repos
+        "total": len(repos_con_estado),  # Número total de repos
         "repos_con_estado": repos_con_estado  # Todos los repos con su estado
     }
+
+
+async def documentos_repositorios(usuario: str) -> List[Dict]:
+    """
+    Clasifica en vivo los repositorios del usuario y los devuelve con el
+    formato de los documentos del índice ``github_repositorios``.
+    """
+    resultado = await clasificar_repositorios(usuario)
+    return [
+        _documento_repositorio(usuario, repo_data)
+        for repo_data in resultado["repos_con_estado"]
+    ]
@@ -0,0 +1,90 @@
+"""Fuente de datos GraphQL para la actividad de los repositorios."""
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict
+import sys
+sys.path.append('.')
+from config import Config
+from app.utils.github_utils import consulta_graphql, GithubAPIException
+
+# Una sola consulta devuelve, para un lote de repositorios, los commits de
+# la rama por defecto desde una fecha y el número de PRs por estado.
+CONSULTA_ACTIVIDAD = """
+query($owner: String!, $cursor: String, $since: GitTimestamp!, $porPagina: Int!) {
+  repositoryOwner(login: $owner) {
+    repositories(
+      first: $porPagina
+      after: $cursor
+      ownerAffiliations: OWNER
+      orderBy: {field: NAME, direction: ASC}
+    ) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        url
+        abiertos: pullRequests(states: OPEN) { totalCount }
+        cerrados: pullRequests(states: CLOSED) { totalCount }
+        fusionados: pullRequests(states: MERGED) { totalCount }
+        defaultBranchRef {
+          target {
+            ... on Commit { history(since: $since) { totalCount } }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def _commits_recientes(nodo: Dict) -> int:
+    """Número de commits recientes de la rama por defecto (0 si está vacío)."""
+    rama = nodo.get("defaultBranchRef") or {}
+    historial = (rama.get("target") or {}).get("history") or {}
+    return historial.get("totalCount", 0)
+
+
+async def iterar_actividad_repositorios(
+    usuario: str, dias: int = 30
+) -> AsyncIterator[Dict]:
+    """
+    Recorre los repositorios del usuario con su actividad reciente,
+    pidiendo ``Config.GITHUB_GRAPHQL_POR_PAGINA`` repositorios por consulta
+    y avanzando con el cursor de paginación.
+
+    Cada elemento tiene ``name``, ``html_url``, ``commits_recientes`` y los
+    PRs ``abiertos``, ``cerrados`` (incluye fusionados) y ``resueltos``.
+    """
+    desde = (datetime.now(timezone.utc) - timedelta(days=dias)).strftime(
+        '%Y-%m-%dT%H:%M:%SZ'
+    )
+    cursor = None
+
+    while True:
+        datos = await consulta_graphql(CONSULTA_ACTIVIDAD, {
+            "owner": usuario,
+            "cursor": cursor,
+            "since": desde,
+            "porPagina": Config.GITHUB_GRAPHQL_POR_PAGINA,
+        })
+        propietario = datos.get("repositoryOwner")
+        if propietario is None:
+            raise GithubAPIException(
+                f"El usuario u organización {usuario} no existe"
+            )
+
+        repositorios = propietario["repositories"]
+        for nodo in repositorios["nodes"]:
+            fusionados = nodo["fusionados"]["totalCount"]
+            yield {
+                "name": nodo["name"],
+                "html_url": nodo["url"],
+                "commits_recientes": _commits_recientes(nodo),
+                "abiertos": nodo["abiertos"]["totalCount"],
+                "cerrados": nodo["cerrados"]["totalCount"] + fusionados,
+                "resueltos": fusionados,
+            }
+
+        pagina = repositorios["pageInfo"]
+        if not pagina["hasNextPage"]:
+            return
+        cursor = pagina["endCursor"]
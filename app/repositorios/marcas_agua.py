@@ -0,0 +1,115 @@
+"""Almacenes de marcas de agua para la clasificación incremental."""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+from config import Config
+
+
+class AlmacenMarcasMemoria:
+    """Marcas de agua en memoria (se pierden al reiniciar)."""
+
+    # Sus operaciones no hacen E/S y pueden ejecutarse en el bucle
+    bloqueante = False
+
+    def __init__(self):
+        self._marcas: Dict[tuple, Dict] = {}
+
+    def obtener(self, usuario: str, repo: str) -> Optional[Dict]:
+        """Devuelve una copia de la marca del repositorio, si existe."""
+        marca = self._marcas.get((usuario, repo))
+        return json.loads(json.dumps(marca)) if marca is not None else None
+
+    def guardar(self, usuario: str, repo: str, marca: Dict):
+        """Crea o reemplaza la marca del repositorio."""
+        self._marcas[(usuario, repo)] = json.loads(json.dumps(marca))
+
+    def borrar(self, usuario: str) -> int:
+        """Elimina las marcas de un usuario para forzar un recálculo."""
+        claves = [clave for clave in self._marcas if clave[0] == usuario]
+        for clave in claves:
+            del self._marcas[clave]
+        return len(claves)
+
+
+class AlmacenMarcasSQLite:
+    """Marcas de agua en un fichero SQLite, persistentes entre reinicios."""
+
+    # Sus operaciones hacen E/S de disco y conviene sacarlas del bucle
+    bloqueante = True
+
+    def __init__(self, ruta: str):
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS marcas_agua ("
+            "usuario TEXT NOT NULL, repo TEXT NOT NULL, datos TEXT NOT NULL, "
+            "PRIMARY KEY (usuario, repo))"
+        )
+        self._conexion.commit()
+
+    def obtener(self, usuario: str, repo: str) -> Optional[Dict]:
+        """Devuelve la marca del repositorio, si existe."""
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT datos FROM marcas_agua WHERE usuario = ? AND repo = ?",
+                (usuario, repo)
+            ).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def guardar(self, usuario: str, repo: str, marca: Dict):
+        """Crea o reemplaza la marca del repositorio."""
+        with self._lock:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO marcas_agua (usuario, repo, datos) "
+                "VALUES (?, ?, ?)",
+                (usuario, repo, json.dumps(marca))
+            )
+            self._conexion.commit()
+
+    def borrar(self, usuario: str) -> int:
+        """Elimina las marcas de un usuario para forzar un recálculo."""
+        with self._lock:
+            cursor = self._conexion.execute(
+                "DELETE FROM marcas_agua WHERE usuario = ?", (usuario,)
+            )
+            self._conexion.commit()
+        return cursor.rowcount
+
+    def cerrar(self):
+        """Cierra la conexión con el fichero."""
+        self._conexion.close()
+
+
+async def llamar_almacen(almacen, metodo: str, *args):
+    """
+    Llama a un método del almacén de marcas; si hace E/S bloqueante se
+    ejecuta en un hilo para no parar el bucle de eventos.
+    """
+    funcion = getattr(almacen, metodo)
+    if getattr(almacen, "bloqueante", False):
+        return await asyncio.to_thread(funcion, *args)
+    return funcion(*args)
+
+
+def crear_almacen_marcas():
+    """Crea el almacén según ``Config.REPOS_MARCAS_ALMACEN``."""
+    if Config.REPOS_MARCAS_ALMACEN == "sqlite":
+        return AlmacenMarcasSQLite(Config.REPOS_MARCAS_RUTA)
+    return AlmacenMarcasMemoria()
+
+
+_almacen_marcas = None
+
+
+def obtener_almacen_marcas():
+    """Devuelve el almacén de marcas de agua de la aplicación."""
+    global _almacen_marcas
+    if _almacen_marcas is None:
+        _almacen_marcas = crear_almacen_marcas()
+    return _almacen_marcas
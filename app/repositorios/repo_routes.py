@@ -1,20 +1,71 @@
 """Este es el router"""
 # app/routes/repo_routes.py
 
-from fastapi import APIRouter, HTTPException
-from app.repositorios.activity_service import clasificar_repositorios
+from typing import Literal, Optional
+from fastapi import APIRouter, Query
+from config import Config
+from app.repositorios.activity_service import (
+    MODO_COMPLETO,
+    clasificar_repositorios,
+    documentos_repositorios,
+    iterar_clasificacion_repositorios
+)
+from app.elasticsearch.consultas_elasticsearch import (
+    ELASTIC_LECTURA_TAMANO_MAX,
+    leer_con_respaldo,
+    max_edad_lectura
+)
+from app.utils.cache_resultados import obtener_cache_resultados
+from app.utils.errores_http import excepcion_http
+from app.utils.streaming import respuesta_ndjson
 
 # Creamos un router de FastAPI
 router = APIRouter()
 
 
 @router.get("/v1/repositorios/{usuario}")
-async def obtener_repositorios(usuario: str):
+async def obtener_repositorios(
+    usuario: str,
+    fuente: Literal["rest", "graphql"] = Query(
+        "rest", description="API de GitHub usada para obtener los datos"
+    ),
+    stream: bool = Query(
+        False, description="Enviar cada repositorio en streaming (NDJSON)"
+    ),
+    incremental: bool = Query(
+        False, description="Pedir solo los cambios desde la última consulta"
+    ),
+    modo: Literal["completo", "rapido"] = Query(
+        "completo",
+        description="rapido: solo con los metadatos del listado, sin PRs"
+    )
+):
     """
     Endpoint que devuelve los repositorios activos e inactivos de un usuario.
+    Con ``stream=true`` devuelve NDJSON: una línea por repositorio en cuanto
+    se clasifica y una última línea con el total (o con el error, si falla
+    cuando ya se ha empezado a enviar). Con ``modo=rapido`` la
+    actividad sale solo de los metadatos del listado, sin estadísticas
+    de pull requests.
     """
     try:
-        resultado = await clasificar_repositorios(usuario)
+        if stream:
+            return await respuesta_ndjson(
+                iterar_clasificacion_repositorios(
+                    usuario, fuente=fuente, incremental=incremental,
+                    modo=modo
+                )
+            )
+
+        resultado = await obtener_cache_resultados().obtener_o_calcular(
+            "repositorios",
+            # El modo incremental solo cambia cómo se obtienen los datos,
+            # no el resultado, así que comparte entrada con el completo
+            {"usuario": usuario, "fuente": fuente, "modo": modo},
+            lambda: clasificar_repositorios(
+                usuario, fuente=fuente, incremental=incremental, modo=modo
+            )
+        )
 
         # Retornamos el resultado como un JSON
         return {
@@ -22,6 +73,41 @@ async def obtener_repositorios(usuario: str):
             "repo": resultado["repos_con_estado"]
         }
     except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=str(e)
-        ) from e
+        raise excepcion_http(e) from e
+
+
+@router.get("/v1/repositorios/{usuario}/indexados")
+async def obtener_repositorios_indexados(
+    usuario: str,
+    status: Optional[Literal["activo", "inactivo"]] = Query(None),
+    estado_repo: Optional[str] = Query(
+        None, description="Repo Estable, Repo Dinámico o Repo Ineficiente"
+    ),
+    tamano: int = Query(
+        100, ge=1, le=ELASTIC_LECTURA_TAMANO_MAX,
+        description="Documentos por página"
+    ),
+    despues: Optional[str] = Query(
+        None, description="Valor 'siguiente' de la página anterior"
+    )
+):
+    """
+    Endpoint que lee la clasificación de los repositorios desde
+    Elasticsearch (la más reciente de cada uno), con filtros, totales por
+    estado y paginación por nombre. Solo se usan las clasificaciones
+    completas, que son las que tienen estadísticas de pull requests. Si
+    el índice no tiene datos recientes se clasifica en vivo contra GitHub.
+    """
+    try:
+        return await leer_con_respaldo(
+            "github_repositorios", "repo",
+            {"usuario": usuario, "modo": MODO_COMPLETO, "status": status,
+             "estado_repo": estado_repo},
+            lambda: documentos_repositorios(usuario),
+            tamano, despues, agregaciones=("status", "estado_repo"),
+            max_edad=max_edad_lectura(
+                Config.PROGRAMADOR_INTERVALO_REPOSITORIOS
+            )
+        )
+    except Exception as e:
+        raise excepcion_http(e) from e
@@ -0,0 +1,254 @@
+"""Caché de resultados calculados por los endpoints."""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from config import Config
+from app.utils.single_flight import AgrupadorPeticiones
+
+logger = logging.getLogger(__name__)
+
+
+def clave_resultado(espacio: str, parametros: Dict) -> Tuple[str, str]:
+    """Clave estable a partir del endpoint y sus parámetros."""
+    return espacio, json.dumps(parametros, sort_keys=True, default=str)
+
+
+def repositorios_parcial(resultado: Dict) -> bool:
+    """Algún repositorio no se pudo clasificar por un error de GitHub."""
+    return any(
+        "error" in repo_data for repo_data in resultado["repos_con_estado"]
+    )
+
+
+def dependabots_parcial(resultado: Dict) -> bool:
+    """Faltan las alertas de algún estado."""
+    return bool(resultado.get("estados_fallidos"))
+
+
+class CacheResultados:
+    """
+    Guarda el resultado de cada endpoint por parámetros, con un TTL por
+    espacio (endpoint) y un máximo de entradas que se desalojan por LRU.
+
+    Pasado el TTL, y durante ``ventana_obsoleta`` segundos más, el
+    resultado se sirve igualmente y se recalcula en segundo plano
+    (stale-while-revalidate). Después se recalcula antes de responder.
+    Los cálculos concurrentes de una misma clave se hacen una sola vez.
+
+    ``parciales`` indica, por espacio, cómo reconocer un resultado al que
+    le faltan datos por un fallo; esos se guardan solo ``ttl_parcial``
+    segundos y sin ventana obsoleta. Invalidar cambia de generación: los
+    cálculos en vuelo no se guardan y las consultas siguientes no se
+    suman a ellos.
+    """
+
+    def __init__(
+        self,
+        ttls: Dict[str, float],
+        max_entradas: int = None,
+        ventana_obsoleta: float = None,
+        reloj: Callable[[], float] = time.monotonic,
+        parciales: Dict[str, Callable[[Any], bool]] = None,
+        ttl_parcial: float = None
+    ):
+        self.ttls = ttls
+        self.parciales = parciales or {}
+        self.ttl_parcial = (
+            Config.RESULTADOS_TTL_PARCIAL if ttl_parcial is None
+            else ttl_parcial
+        )
+        self.max_entradas = (
+            max_entradas or Config.RESULTADOS_CACHE_MAX_ENTRADAS
+        )
+        self.ventana_obsoleta = (
+            Config.RESULTADOS_VENTANA_OBSOLETA if ventana_obsoleta is None
+            else ventana_obsoleta
+        )
+        self._reloj = reloj
+        self._entradas: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._agrupador = AgrupadorPeticiones()
+        self._refrescos: Dict[Tuple, asyncio.Task] = {}
+        # Generación global (``invalidar()``) y por espacio
+        # (``invalidar(espacio)``); un cálculo iniciado antes de invalidar
+        # su espacio no se guarda
+        self._generacion_global = 0
+        self._generaciones: Dict[str, int] = {}
+        self.aciertos = 0
+        self.obsoletos = 0
+        self.fallos = 0
+        self.parciales_guardados = 0
+
+    async def obtener_o_calcular(
+        self,
+        espacio: str,
+        parametros: Dict,
+        calcular: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Devuelve el resultado guardado o lo calcula con ``calcular``."""
+        ttl = self.ttls.get(espacio, 0)
+        if ttl <= 0:
+            return await calcular()
+
+        clave = clave_resultado(espacio, parametros)
+        entrada = self._entradas.get(clave)
+        if entrada is not None:
+            edad = self._reloj() - entrada["guardado_en"]
+            if edad < entrada["ttl"]:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada["valor"]
+            if edad < entrada["ttl"] + entrada["ventana_obsoleta"]:
+                self._entradas.move_to_end(clave)
+                self.obsoletos += 1
+                self._refrescar(clave, calcular)
+                return entrada["valor"]
+
+        self.fallos += 1
+        return await self._calcular_agrupado(clave, calcular)
+
+    async def actualizar(
+        self,
+        espacio: str,
+        parametros: Dict,
+        calcular: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Recalcula y guarda el resultado aunque siga vigente."""
+        clave = clave_resultado(espacio, parametros)
+        return await self._calcular_agrupado(clave, calcular)
+
+    def _generacion(self, espacio: str) -> Tuple[int, int]:
+        """Generación vigente de un espacio."""
+        return self._generacion_global, self._generaciones.get(espacio, 0)
+
+    async def _calcular_agrupado(
+        self, clave: Tuple, calcular: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Calcula el resultado una sola vez para las consultas concurrentes
+        de la misma clave y generación.
+        """
+        generacion = self._generacion(clave[0])
+        return await self._agrupador.ejecutar(
+            (clave, generacion),
+            lambda: self._calcular_y_guardar(clave, calcular, generacion)
+        )
+
+    async def _calcular_y_guardar(
+        self,
+        clave: Tuple,
+        calcular: Callable[[], Awaitable[Any]],
+        generacion: Tuple[int, int]
+    ) -> Any:
+        """Calcula el resultado y lo guarda si nadie ha invalidado antes."""
+        valor = await calcular()
+        if generacion == self._generacion(clave[0]):
+            self._guardar(clave, valor)
+        return valor
+
+    def _refrescar(self, clave: Tuple, calcular: Callable[[], Awaitable[Any]]):
+        """Lanza el recálculo en segundo plano si no hay uno en marcha."""
+        vuelo = (clave, self._generacion(clave[0]))
+        if vuelo in self._refrescos:
+            return
+
+        async def refrescar():
+            try:
+                await self._calcular_agrupado(clave, calcular)
+            except Exception as e:
+                logger.warning(f"No se pudo refrescar {clave[0]}: {e}")
+            finally:
+                self._refrescos.pop(vuelo, None)
+
+        self._refrescos[vuelo] = asyncio.create_task(refrescar())
+
+    def _guardar(self, clave: Tuple, valor: Any):
+        """Guarda una entrada y desaloja las menos usadas."""
+        espacio = clave[0]
+        ttl = self.ttls.get(espacio, 0)
+        ventana_obsoleta = self.ventana_obsoleta
+        parcial = self.parciales.get(espacio)
+        if parcial is not None and parcial(valor):
+            ttl, ventana_obsoleta = min(ttl, self.ttl_parcial), 0
+            self.parciales_guardados += 1
+            if ttl <= 0:
+                self._entradas.pop(clave, None)
+                return
+
+        self._entradas[clave] = {
+            "valor": valor,
+            "guardado_en": self._reloj(),
+            "ttl": ttl,
+            "ventana_obsoleta": ventana_obsoleta,
+        }
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+
+    def invalidar(self, espacio: Optional[str] = None) -> int:
+        """Elimina las entradas de un espacio (o todas) y devuelve cuántas."""
+        if espacio is None:
+            self._generacion_global += 1
+        else:
+            self._generaciones[espacio] = (
+                self._generaciones.get(espacio, 0) + 1
+            )
+        claves = [
+            clave for clave in self._entradas
+            if espacio is None or clave[0] == espacio
+        ]
+        for clave in claves:
+            del self._entradas[clave]
+        return len(claves)
+
+    async def detener(self):
+        """Cancela los recálculos en segundo plano pendientes."""
+        tareas = list(self._refrescos.values())
+        for tarea in tareas:
+            tarea.cancel()
+        await asyncio.gather(*tareas, return_exceptions=True)
+
+    def estadisticas(self) -> Dict:
+        """Contadores de aciertos, resultados obsoletos servidos y fallos."""
+        consultas = self.aciertos + self.obsoletos + self.fallos
+        return {
+            "entradas": len(self._entradas),
+            "max_entradas": self.max_entradas,
+            "aciertos": self.aciertos,
+            "obsoletos": self.obsoletos,
+            "fallos": self.fallos,
+            "parciales": self.parciales_guardados,
+            "refrescando": len(self._refrescos),
+            "ratio_aciertos": (
+                round((self.aciertos + self.obsoletos) / consultas, 4)
+                if consultas else 0.0
+            ),
+        }
+
+
+_cache_resultados: Optional[CacheResultados] = None
+
+
+def obtener_cache_resultados() -> CacheResultados:
+    """Devuelve la caché de resultados de la aplicación."""
+    global _cache_resultados
+    if _cache_resultados is None:
+        _cache_resultados = CacheResultados(ttls={
+            "repositorios": Config.RESULTADOS_TTL_REPOSITORIOS,
+            "productividad": Config.RESULTADOS_TTL_PRODUCTIVIDAD,
+            "dependabots": Config.RESULTADOS_TTL_DEPENDABOTS,
+            "dependabots_organizacion": Config.RESULTADOS_TTL_DEPENDABOTS,
+        }, parciales={
+            "repositorios": repositorios_parcial,
+            "dependabots": dependabots_parcial,
+        })
+    return _cache_resultados
+
+
+async def cerrar_cache_resultados():
+    """Cancela los recálculos pendientes (se llama desde el lifespan)."""
+    if _cache_resultados is not None:
+        await _cache_resultados.detener()
@@ -0,0 +1,246 @@
+"""Pool de credenciales de GitHub repartidas según su presupuesto."""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import httpx
+from config import Config
+from app.utils.rate_limit import PlanificadorGithub, identificar_token
+
+try:
+    import jwt
+except ImportError:  # PyJWT solo hace falta para las GitHub Apps
+    jwt = None
+
+# Margen con el que se renueva un token de instalación antes de caducar
+MARGEN_RENOVACION = 300
+
+
+class ErrorCredencial(Exception):
+    """No se pudo obtener el valor de una credencial."""
+
+
+class TokenEstatico:
+    """Token personal o de acceso fijo, válido para cualquier propietario."""
+
+    tipo = "token"
+    propietario = None
+
+    def __init__(self, token: str):
+        self._authorization = f"Bearer {token}"
+        self.etiqueta = identificar_token(self._authorization)
+        self.peticiones = 0
+
+    def puede_ver(self, propietario: Optional[str]) -> bool:
+        """Indica si la credencial sirve para el propietario."""
+        return True
+
+    async def authorization(self) -> str:
+        """Valor de la cabecera Authorization."""
+        return self._authorization
+
+
+def _firmar_jwt(app_id: str, clave_privada: str, ahora: float) -> str:
+    """JWT RS256 con el que la App se autentica ante GitHub."""
+    if jwt is None:
+        raise RuntimeError(
+            "Las credenciales de GitHub App requieren el paquete PyJWT "
+            "con soporte de criptografía (pip install 'pyjwt[crypto]')"
+        )
+    datos = {"iat": int(ahora) - 60, "exp": int(ahora) + 540, "iss": app_id}
+    return jwt.encode(datos, clave_privada, algorithm="RS256")
+
+
+class TokenInstalacionApp:
+    """
+    Token de una instalación de GitHub App. Se pide con un JWT firmado por
+    la App y se renueva solo cuando le quedan menos de
+    ``MARGEN_RENOVACION`` segundos. La etiqueta es la de la instalación,
+    ya que el límite de uso es suyo y no de cada token emitido.
+
+    Una instalación solo ve los recursos de la cuenta en la que está
+    instalada (``propietario``), así que solo se usa para ella.
+    """
+
+    tipo = "app"
+
+    def __init__(
+        self,
+        app_id: str,
+        clave_privada: str,
+        instalacion: str,
+        cliente: Callable[[], httpx.AsyncClient],
+        propietario: str,
+        firmar: Callable[[str, str, float], str] = _firmar_jwt,
+        reloj: Callable[[], float] = time.time
+    ):
+        self.app_id = app_id
+        self.instalacion = instalacion
+        self.propietario = propietario
+        self.etiqueta = f"app-{instalacion}"
+        self.peticiones = 0
+        self.renovaciones = 0
+        self._clave_privada = clave_privada
+        self._cliente = cliente
+        self._firmar = firmar
+        self._reloj = reloj
+        self._token: Optional[str] = None
+        self._caducidad = 0.0
+        self._lock = asyncio.Lock()
+
+    def puede_ver(self, propietario: Optional[str]) -> bool:
+        """Indica si la credencial sirve para el propietario."""
+        return (propietario is not None
+                and propietario.lower() == self.propietario.lower())
+
+    async def authorization(self) -> str:
+        """Valor de la cabecera Authorization, renovando si hace falta."""
+        if self._reloj() >= self._caducidad - MARGEN_RENOVACION:
+            async with self._lock:
+                # Otra corrutina puede haberlo renovado mientras se esperaba
+                if self._reloj() >= self._caducidad - MARGEN_RENOVACION:
+                    await self._renovar()
+        return f"Bearer {self._token}"
+
+    async def _renovar(self):
+        """Pide un token de instalación nuevo (ErrorCredencial si falla)."""
+        url = (
+            f"{Config.GITHUB_API_URL}/app/installations/"
+            f"{self.instalacion}/access_tokens"
+        )
+        try:
+            firma = self._firmar(
+                self.app_id, self._clave_privada, self._reloj()
+            )
+            response = await self._cliente().post(url, headers={
+                "Authorization": f"Bearer {firma}",
+                "Accept": "application/vnd.github+json",
+            })
+            response.raise_for_status()
+            datos = response.json()
+            caducidad = datos["expires_at"]
+            token = datos["token"]
+            caducidad = datetime.fromisoformat(
+                caducidad[:-1] + "+00:00" if caducidad.endswith("Z")
+                else caducidad
+            ).timestamp()
+        except (httpx.HTTPError, KeyError, TypeError, ValueError,
+                RuntimeError) as e:
+            raise ErrorCredencial(
+                f"No se pudo obtener el token de la instalación "
+                f"{self.instalacion}: {e}"
+            ) from e
+        self._token = token
+        self._caducidad = caducidad
+        self.renovaciones += 1
+
+
+class PoolCredenciales:
+    """
+    Reparte las peticiones entre varias credenciales eligiendo, entre las
+    que pueden ver al propietario del recurso, la que tiene más
+    presupuesto restante según el planificador. Las agotadas quedan fuera
+    hasta su reinicio; si lo están todas se usa la que antes se reinicia y
+    el planificador espera. Los empates se rotan, de modo que las
+    credenciales aún sin presupuesto conocido se turnan.
+    """
+
+    def __init__(self, credenciales: List, planificador: PlanificadorGithub):
+        self.credenciales = list(credenciales)
+        self._planificador = planificador
+        self._turno = 0
+
+    def _candidatas(self, propietario: Optional[str]) -> List:
+        """Credenciales que pueden ver los recursos del propietario."""
+        return [
+            credencial for credencial in self.credenciales
+            if credencial.puede_ver(propietario)
+        ]
+
+    def elegir(self, propietario: Optional[str] = None):
+        """
+        Credencial para la siguiente petición a un recurso de
+        ``propietario`` (None si ninguna puede verlo).
+        """
+        candidatas = self._candidatas(propietario)
+        if not candidatas:
+            return None
+        total = len(candidatas)
+        inicio = self._turno % total
+        self._turno += 1
+
+        elegida, mejor = None, 0
+        for desplazamiento in range(total):
+            credencial = candidatas[(inicio + desplazamiento) % total]
+            restante = self._planificador.disponible(credencial.etiqueta)
+            if restante > mejor:
+                elegida, mejor = credencial, restante
+
+        if elegida is None:
+            elegida = min(
+                candidatas,
+                key=lambda c: self._planificador.reinicio(c.etiqueta)
+            )
+        elegida.peticiones += 1
+        return elegida
+
+    def hay_disponible(self, propietario: Optional[str] = None) -> bool:
+        """Indica si alguna credencial del propietario conserva presupuesto."""
+        return any(
+            self._planificador.disponible(credencial.etiqueta) > 0
+            for credencial in self._candidatas(propietario)
+        )
+
+    def estadisticas(self) -> Dict[str, Dict]:
+        """Peticiones y estado de cada credencial, para las métricas."""
+        return {
+            credencial.etiqueta: {
+                "tipo": credencial.tipo,
+                "propietario": credencial.propietario,
+                "peticiones": credencial.peticiones,
+                "agotada": (
+                    self._planificador.disponible(credencial.etiqueta) <= 0
+                ),
+            }
+            for credencial in self.credenciales
+        }
+
+
+def _leer_clave_privada(valor: str) -> str:
+    """La clave privada puede venir en la variable o en un fichero."""
+    if os.path.isfile(valor):
+        with open(valor, encoding="utf-8") as fichero:
+            return fichero.read()
+    return valor.replace("\\n", "\n")
+
+
+def crear_pool(
+    planificador: PlanificadorGithub,
+    cliente: Callable[[], httpx.AsyncClient]
+) -> PoolCredenciales:
+    """Crea el pool con los tokens y las instalaciones de la configuración."""
+    tokens = [Config.GITHUB_TOKEN] if Config.GITHUB_TOKEN else []
+    for token in Config.GITHUB_TOKENS.split(","):
+        token = token.strip()
+        if token and token not in tokens:
+            tokens.append(token)
+    credenciales = [TokenEstatico(token) for token in tokens]
+
+    if Config.GITHUB_APP_ID and Config.GITHUB_APP_CLAVE_PRIVADA:
+        clave_privada = _leer_clave_privada(Config.GITHUB_APP_CLAVE_PRIVADA)
+        for entrada in Config.GITHUB_APP_INSTALACIONES.split(","):
+            if not entrada.strip():
+                continue
+            propietario, _, instalacion = entrada.strip().partition(":")
+            if not propietario or not instalacion:
+                raise ValueError(
+                    f"GITHUB_APP_INSTALACIONES: '{entrada.strip()}' debe "
+                    "tener el formato propietario:id"
+                )
+            credenciales.append(TokenInstalacionApp(
+                Config.GITHUB_APP_ID, clave_privada,
+                instalacion, cliente, propietario
+            ))
+    return PoolCredenciales(credenciales, planificador)
@@ -0,0 +1,19 @@
+"""Traducción de los errores de los servicios a respuestas HTTP."""
+import math
+import time
+from fastapi import HTTPException
+from app.utils.github_utils import GithubLimiteUsoException
+
+
+def excepcion_http(error: Exception) -> HTTPException:
+    """
+    Sin presupuesto en GitHub se responde 429 con ``Retry-After`` hasta el
+    reinicio de la ventana; cualquier otro error es un 500.
+    """
+    if isinstance(error, GithubLimiteUsoException):
+        espera = max(0, math.ceil(error.reinicio - time.time()))
+        return HTTPException(
+            status_code=429, detail=str(error),
+            headers={"Retry-After": str(espera)}
+        )
+    return HTTPException(status_code=500, detail=str(error))
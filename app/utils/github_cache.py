@@ -0,0 +1,225 @@
+"""Caché de respuestas de GitHub basada en peticiones condicionales."""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+from urllib.parse import urlencode
+import httpx
+from config import Config
+
+
+def clave_cache(url: str, params: Optional[Dict] = None) -> str:
+    """Construye la clave de caché a partir de la URL y sus parámetros."""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+class CacheMemoria:
+    """Backend en memoria con política LRU y tamaño máximo."""
+
+    # Las operaciones no bloquean y se llaman desde el bucle de eventos
+    bloqueante = False
+
+    def __init__(self, max_entradas: int = 1024):
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def obtener(self, clave: str) -> Optional[Dict]:
+        """Devuelve la entrada guardada y la marca como usada."""
+        entrada = self._entradas.get(clave)
+        if entrada is not None:
+            self._entradas.move_to_end(clave)
+        return entrada
+
+    def guardar(self, clave: str, entrada: Dict):
+        """Guarda una entrada y descarta la menos usada si hay exceso."""
+        self._entradas[clave] = entrada
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+class CacheDisco:
+    """
+    Backend en un fichero SQLite que sobrevive a los reinicios, con
+    política LRU y tamaño máximo como el de memoria. Las operaciones
+    bloquean, así que ``CacheRespuestas`` las ejecuta con to_thread.
+    """
+
+    bloqueante = True
+
+    def __init__(
+        self,
+        ruta: str,
+        max_entradas: int = 10000,
+        reloj: Callable[[], float] = time.time
+    ):
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self.max_entradas = max_entradas
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        # Autocommit y WAL: cada escritura es una transacción corta
+        self._conexion = sqlite3.connect(
+            ruta, check_same_thread=False, isolation_level=None
+        )
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS respuestas "
+            "(clave TEXT PRIMARY KEY, entrada TEXT NOT NULL)"
+        )
+        columnas = {
+            fila[1] for fila in
+            self._conexion.execute("PRAGMA table_info(respuestas)")
+        }
+        if "usado" not in columnas:
+            # Ficheros creados antes de que hubiera expulsión
+            self._conexion.execute(
+                "ALTER TABLE respuestas ADD COLUMN usado REAL NOT NULL "
+                "DEFAULT 0"
+            )
+        self._conexion.execute(
+            "CREATE INDEX IF NOT EXISTS respuestas_usado "
+            "ON respuestas (usado)"
+        )
+        self._total = self._conexion.execute(
+            "SELECT COUNT(*) FROM respuestas"
+        ).fetchone()[0]
+
+    def obtener(self, clave: str) -> Optional[Dict]:
+        """Devuelve la entrada guardada y la marca como usada."""
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT entrada FROM respuestas WHERE clave = ?", (clave,)
+            ).fetchone()
+            if fila:
+                self._conexion.execute(
+                    "UPDATE respuestas SET usado = ? WHERE clave = ?",
+                    (self._reloj(), clave)
+                )
+        return json.loads(fila[0]) if fila else None
+
+    def guardar(self, clave: str, entrada: Dict):
+        """Guarda o reemplaza la entrada y descarta las menos usadas."""
+        with self._lock:
+            existe = self._conexion.execute(
+                "SELECT 1 FROM respuestas WHERE clave = ?", (clave,)
+            ).fetchone()
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO respuestas (clave, entrada, usado) "
+                "VALUES (?, ?, ?)",
+                (clave, json.dumps(entrada), self._reloj())
+            )
+            if not existe:
+                self._total += 1
+            exceso = self._total - self.max_entradas
+            if exceso > 0:
+                self._conexion.execute(
+                    "DELETE FROM respuestas WHERE clave IN ("
+                    "SELECT clave FROM respuestas ORDER BY usado LIMIT ?)",
+                    (exceso,)
+                )
+                self._total -= exceso
+
+    def cerrar(self):
+        """Cierra la conexión con el fichero."""
+        self._conexion.close()
+
+    def __len__(self):
+        return self._total
+
+
+def cabeceras_condicionales(entrada: Dict) -> Dict:
+    """Cabeceras If-None-Match / If-Modified-Since de una entrada."""
+    cabeceras = {}
+    if entrada.get("etag"):
+        cabeceras["If-None-Match"] = entrada["etag"]
+    if entrada.get("last_modified"):
+        cabeceras["If-Modified-Since"] = entrada["last_modified"]
+    return cabeceras
+
+
+def respuesta_desde_cache(
+    request: httpx.Request, entrada: Dict
+) -> httpx.Response:
+    """Reconstruye una respuesta 200 a partir de una entrada guardada."""
+    headers = {"content-type": "application/json"}
+    if entrada.get("link"):
+        headers["link"] = entrada["link"]
+    return httpx.Response(
+        200, content=entrada["cuerpo"].encode(), headers=headers,
+        request=request
+    )
+
+
+class CacheRespuestas:
+    """
+    Guarda el cuerpo, el ETag y el Last-Modified de cada respuesta para
+    repetir la petición de forma condicional. Un 304 de GitHub no consume
+    límite de uso y se responde con el cuerpo guardado.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.aciertos = 0
+        self.fallos = 0
+
+    async def _ejecutar(self, funcion, *args):
+        """Llama al backend fuera del bucle de eventos si bloquea."""
+        if getattr(self.backend, "bloqueante", False):
+            return await asyncio.to_thread(funcion, *args)
+        return funcion(*args)
+
+    async def buscar(self, clave: str) -> Optional[Dict]:
+        """Devuelve la entrada guardada para la clave, si existe."""
+        return await self._ejecutar(self.backend.obtener, clave)
+
+    def registrar_acierto(self):
+        """Cuenta una respuesta servida desde la caché tras un 304."""
+        self.aciertos += 1
+
+    async def guardar(self, clave: str, cuerpo: str, headers) -> bool:
+        """Guarda una respuesta 200 si trae validadores; cuenta el fallo."""
+        self.fallos += 1
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if not etag and not last_modified:
+            return False
+        await self._ejecutar(self.backend.guardar, clave, {
+            "etag": etag,
+            "last_modified": last_modified,
+            "link": headers.get("link"),
+            "cuerpo": cuerpo,
+        })
+        return True
+
+    def estadisticas(self) -> Dict:
+        """Contadores de aciertos y fallos de la caché."""
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "entradas": len(self.backend),
+        }
+
+
+def crear_cache() -> Optional[CacheRespuestas]:
+    """Crea la caché según ``Config.GITHUB_CACHE`` (memoria/disco/ninguna)."""
+    tipo = Config.GITHUB_CACHE
+    if tipo == "memoria":
+        return CacheRespuestas(CacheMemoria(Config.GITHUB_CACHE_MAX_ENTRADAS))
+    if tipo == "disco":
+        return CacheRespuestas(CacheDisco(
+            Config.GITHUB_CACHE_RUTA, Config.GITHUB_CACHE_DISCO_MAX_ENTRADAS
+        ))
+    return None
@@ -1,71 +1,735 @@
 """Este es el util que hace las peticiones a la api de GitHub."""
 
-from datetime import datetime, timedelta
-import requests
+import asyncio
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from importlib.util import find_spec
+from typing import (
+    AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+)
+import httpx
 from config import Config  # Importamos la clase Config de config.py
+from app.utils.github_cache import (
+    CacheRespuestas,
+    cabeceras_condicionales,
+    clave_cache,
+    crear_cache,
+    respuesta_desde_cache
+)
+from app.utils.credenciales_github import (
+    ErrorCredencial,
+    PoolCredenciales,
+    crear_pool
+)
+from app.utils.rate_limit import (
+    LimiteUsoAgotado,
+    PlanificadorGithub,
+    identificar_token
+)
+from app.utils.single_flight import AgrupadorPeticiones
 
-TIMEOUT = 20
+# Tiempo máximo de lectura de una respuesta (segundos)
+TIMEOUT = Config.GITHUB_TIMEOUT_LECTURA
+
+# Tamaño de página máximo que admite la API REST de GitHub
+PER_PAGE = 100
+
+# Rutas de la API REST; se completan con str.format
+RUTA_REPOS_USUARIO = "/users/{usuario}/repos"
+RUTA_COMMITS = "/repos/{owner}/{repo}/commits"
+RUTA_PULL_REQUESTS = "/repos/{owner}/{repo}/pulls"
+RUTA_DEPENDABOT = "/repos/{owner}/{repo}/dependabot/alerts"
+RUTA_DEPENDABOT_ORGANIZACION = "/orgs/{org}/dependabot/alerts"
+
+# Propietario (usuario u organización) del recurso al que apunta una URL
+PATRON_PROPIETARIO = re.compile(r"/(?:repos|users|orgs)/([^/?#]+)")
+
+# Cabeceras que exige la API de alertas de Dependabot
+CABECERAS_DEPENDABOT = {
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28"
+}
+
+# Cliente HTTP compartido durante toda la vida de la aplicación
+_cliente: Optional[httpx.AsyncClient] = None
+
+# Caché de respuestas condicionales (se crea la primera vez que se usa)
+_cache: Optional[CacheRespuestas] = None
+_cache_iniciada = False
+
+# Planificador por el que pasan todas las peticiones a GitHub
+_planificador: Optional[PlanificadorGithub] = None
+
+# Pool de tokens con el que se autentican las peticiones
+_pool: Optional[PoolCredenciales] = None
+
+# Agrupador de GET idénticos que están en vuelo a la vez
+_agrupador = AgrupadorPeticiones()
+
+
+def _propietario(url: str) -> Optional[str]:
+    """Usuario u organización dueño del recurso de ``url`` (si se sabe)."""
+    coincidencia = PATRON_PROPIETARIO.search(url)
+    return coincidencia.group(1) if coincidencia else None
 
 
 class GithubAPIException(Exception):
     """Excepción personalizada para errores de la API de GitHub."""
 
 
+class GithubLimiteUsoException(GithubAPIException):
+    """
+    El límite de uso de GitHub obligaría a esperar más de lo permitido.
+    ``reinicio`` es el momento (epoch) en que se podrá volver a intentar.
+    """
+
+    def __init__(self, mensaje: str, reinicio: float):
+        super().__init__(mensaje)
+        self.reinicio = reinicio
+
+
+def crear_timeout() -> httpx.Timeout:
+    """Tiempos de espera de conexión y de lectura por separado."""
+    return httpx.Timeout(
+        Config.GITHUB_TIMEOUT_LECTURA, connect=Config.GITHUB_TIMEOUT_CONEXION
+    )
+
+
+def crear_cliente(**kwargs) -> httpx.AsyncClient:
+    """
+    Crea un cliente HTTP asíncrono con pool de conexiones keep-alive.
+
+    HTTP/2 solo se activa si el paquete opcional ``h2`` está instalado.
+    """
+    limites = httpx.Limits(
+        max_connections=Config.GITHUB_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.GITHUB_MAX_KEEPALIVE,
+        keepalive_expiry=Config.GITHUB_KEEPALIVE_EXPIRY,
+    )
+    http2 = Config.GITHUB_HTTP2 and find_spec("h2") is not None
+    return httpx.AsyncClient(
+        limits=limites, http2=http2, timeout=crear_timeout(), **kwargs
+    )
+
+
+async def iniciar_cliente() -> httpx.AsyncClient:
+    """Abre el cliente compartido (se llama desde el lifespan de FastAPI)."""
+    global _cliente
+    if _cliente is None:
+        _cliente = crear_cliente()
+    return _cliente
+
+
+async def cerrar_cliente():
+    """Cierra el cliente compartido y libera las conexiones del pool."""
+    global _cliente
+    if _cliente is not None:
+        await _cliente.aclose()
+        _cliente = None
+
+
+def obtener_cliente() -> httpx.AsyncClient:
+    """Devuelve el cliente compartido, creándolo si aún no existe."""
+    global _cliente
+    if _cliente is None:
+        _cliente = crear_cliente()
+    return _cliente
+
+
+def obtener_cache() -> Optional[CacheRespuestas]:
+    """Devuelve la caché de respuestas configurada, o None si está apagada."""
+    global _cache, _cache_iniciada
+    if not _cache_iniciada:
+        _cache = crear_cache()
+        _cache_iniciada = True
+    return _cache
+
+
+def configurar_cache(cache: Optional[CacheRespuestas]):
+    """Sustituye la caché de respuestas (None la desactiva)."""
+    global _cache, _cache_iniciada
+    _cache = cache
+    _cache_iniciada = True
+
+
+def obtener_planificador() -> PlanificadorGithub:
+    """Devuelve el planificador de límites de uso compartido."""
+    global _planificador
+    if _planificador is None:
+        _planificador = PlanificadorGithub()
+    return _planificador
+
+
+def obtener_pool() -> PoolCredenciales:
+    """Devuelve el pool de credenciales, creándolo desde la configuración."""
+    global _pool
+    if _pool is None:
+        _pool = crear_pool(obtener_planificador(), obtener_cliente)
+    return _pool
+
+
+def configurar_pool(pool: Optional[PoolCredenciales]):
+    """Sustituye el pool de credenciales (None lo vuelve a crear)."""
+    global _pool
+    _pool = pool
+
+
+def obtener_agrupador() -> AgrupadorPeticiones:
+    """Devuelve el agrupador de peticiones idénticas concurrentes."""
+    return _agrupador
+
+
+class ClienteGithub:
+    """
+    Punto único de acceso a la API de GitHub: URL base, cabeceras por
+    defecto, tiempos de espera, reintentos, credenciales, caché
+    condicional, agrupación de peticiones idénticas y traducción de
+    errores a GithubAPIException.
+
+    Lo que no se indica al crearlo se toma de lo compartido por la
+    aplicación (sesión HTTP, planificador, pool de credenciales, caché y
+    agrupador), de modo que varias instancias reparten conexiones y
+    presupuesto.
+    """
+
+    def __init__(
+        self,
+        url_base: Optional[str] = None,
+        cabeceras: Optional[Dict] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        max_reintentos: Optional[int] = None,
+        sesion: Optional[httpx.AsyncClient] = None,
+        planificador: Optional[PlanificadorGithub] = None,
+        pool: Optional[PoolCredenciales] = None,
+        agrupador: Optional[AgrupadorPeticiones] = None
+    ):
+        self._url_base = url_base
+        self.cabeceras = dict(cabeceras or {})
+        self.cabeceras_dependabot = {
+            **self.cabeceras, **CABECERAS_DEPENDABOT
+        }
+        self.timeout = timeout or crear_timeout()
+        self._max_reintentos = max_reintentos
+        self._sesion = sesion
+        self._planificador = planificador
+        self._pool = pool
+        self._agrupador = agrupador
+
+    # Colaboradores; los no indicados se buscan en cada uso para que
+    # sigan a los compartidos aunque se sustituyan.
+
+    @property
+    def url_base(self) -> str:
+        """URL base de la API REST."""
+        return self._url_base or Config.GITHUB_API_URL
+
+    @property
+    def max_reintentos(self) -> int:
+        """Reintentos ante límites de uso y errores temporales."""
+        if self._max_reintentos is None:
+            return Config.GITHUB_MAX_REINTENTOS
+        return self._max_reintentos
+
+    @property
+    def sesion(self) -> httpx.AsyncClient:
+        """Cliente HTTP con el que se hacen las peticiones."""
+        return self._sesion if self._sesion is not None else obtener_cliente()
+
+    @property
+    def planificador(self) -> PlanificadorGithub:
+        """Planificador de límites de uso."""
+        return (
+            self._planificador if self._planificador is not None
+            else obtener_planificador()
+        )
+
+    @property
+    def pool(self) -> PoolCredenciales:
+        """Pool de credenciales."""
+        return self._pool if self._pool is not None else obtener_pool()
+
+    @property
+    def agrupador(self) -> AgrupadorPeticiones:
+        """Agrupador de GET idénticos concurrentes."""
+        return (
+            self._agrupador if self._agrupador is not None
+            else obtener_agrupador()
+        )
+
+    def url(self, ruta: str, **partes) -> str:
+        """URL absoluta de una de las rutas ``RUTA_*``."""
+        return f"{self.url_base}{ruta.format(**partes)}"
+
+    async def _autorizar(
+        self, headers: Dict, propietario: Optional[str] = None
+    ) -> Tuple[Dict, str, bool]:
+        """
+        Añade la cabecera Authorization con la credencial del pool que
+        puede ver a ``propietario`` y tiene más presupuesto. Devuelve las
+        cabeceras, el identificador con el que el planificador lleva su
+        presupuesto y si vino del pool. Si el llamador ya trae su propia
+        autorización se respeta.
+        """
+        if "Authorization" in headers:
+            return headers, identificar_token(headers["Authorization"]), False
+        credencial = self.pool.elegir(propietario)
+        if credencial is None:
+            return headers, identificar_token(None), False
+        cabeceras = {
+            **headers, "Authorization": await credencial.authorization()
+        }
+        return cabeceras, credencial.etiqueta, True
+
+    async def enviar(
+        self,
+        url: str,
+        headers: Dict,
+        enviar: Callable[[Dict], Awaitable[httpx.Response]],
+        propietario: Optional[str] = None
+    ) -> httpx.Response:
+        """
+        Envía una petición a GitHub a través del planificador de límites
+        de uso, reintentando con espera los 403/429 por límite y los
+        errores 5xx, y traduce los errores a GithubAPIException.
+        ``enviar`` recibe las cabeceras y hace la llamada a la sesión.
+
+        Cada intento se autentica con la credencial del pool con más
+        presupuesto entre las que pueden ver a ``propietario`` (por
+        defecto, el que aparece en la URL); si un token se agota y queda
+        otro, se reintenta con él sin esperar al reinicio.
+        """
+        planificador = self.planificador
+        max_reintentos = self.max_reintentos
+        if propietario is None:
+            propietario = _propietario(url)
+
+        try:
+            for intento in range(max_reintentos + 1):
+                cabeceras, token, del_pool = await self._autorizar(
+                    headers, propietario
+                )
+                await planificador.esperar_turno(token)
+                response = await enviar(cabeceras)
+                planificador.actualizar(token, response.headers)
+                if (intento < max_reintentos
+                        and planificador.es_reintentable(response)):
+                    if (del_pool and planificador.disponible(token) <= 0
+                            and self.pool.hay_disponible(propietario)):
+                        continue
+                    await planificador.esperar_reintento(intento, response)
+                    continue
+                break
+
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+        except LimiteUsoAgotado as e:
+            raise GithubLimiteUsoException(
+                f"Límite de uso de GitHub agotado para {url}; se reinicia "
+                f"en {max(0, e.reinicio - time.time()):.0f} segundos.",
+                e.reinicio
+            ) from e
+        except ErrorCredencial as e:
+            raise GithubAPIException(
+                f"No se pudo autenticar la solicitud a {url}: {e}"
+            ) from e
+        except httpx.TimeoutException as e:
+            raise GithubAPIException(
+                f"La solicitud a {url} ha superado el tiempo de espera "
+                f"de {self.timeout.read} segundos."
+            ) from e
+        except httpx.HTTPError as e:
+            raise GithubAPIException(
+                f"Error en la solicitud a {url}: {e}"
+            ) from e
+
+    async def pedir(
+        self, url: str, headers: Optional[Dict] = None,
+        params: Optional[Dict] = None, propietario: Optional[str] = None
+    ) -> httpx.Response:
+        """
+        Hace un GET a GitHub y traduce los errores a GithubAPIException.
+
+        Las llamadas concurrentes con la misma URL, parámetros y token
+        comparten una única petición y su respuesta. Las que se autentican
+        con el pool de credenciales cuentan como un mismo token.
+        """
+        headers = self.cabeceras if headers is None else headers
+        if not Config.GITHUB_AGRUPAR_PETICIONES:
+            return await self._pedir_sin_agrupar(
+                url, headers, params, propietario
+            )
+        clave = (
+            clave_cache(url, params),
+            identificar_token(headers.get("Authorization")),
+            headers.get("Accept"),
+        )
+        return await self.agrupador.ejecutar(
+            clave,
+            lambda: self._pedir_sin_agrupar(url, headers, params, propietario)
+        )
+
+    async def _pedir_sin_agrupar(
+        self, url: str, headers: Dict, params: Optional[Dict] = None,
+        propietario: Optional[str] = None
+    ) -> httpx.Response:
+        """
+        GET a GitHub sin agrupar que traduce los errores a
+        GithubAPIException.
+
+        Si hay una respuesta guardada para la misma URL y parámetros se
+        envía una petición condicional y un 304 se sirve desde la caché.
+        """
+        cache = obtener_cache()
+        clave = clave_cache(url, params)
+        entrada = await cache.buscar(clave) if cache is not None else None
+        if entrada is not None:
+            headers = {**headers, **cabeceras_condicionales(entrada)}
+
+        response = await self.enviar(
+            url, headers,
+            lambda cabeceras: self.sesion.get(
+                url, headers=cabeceras, params=params, timeout=self.timeout
+            ),
+            propietario
+        )
+
+        if response.status_code == 304:
+            if entrada is None:
+                raise GithubAPIException(
+                    f"Respuesta 304 inesperada de {url} sin entrada en caché"
+                )
+            cache.registrar_acierto()
+            return respuesta_desde_cache(response.request, entrada)
+        if cache is not None:
+            await cache.guardar(clave, response.text, response.headers)
+        return response
+
+    async def graphql(self, consulta: str, variables: Dict) -> Dict:
+        """
+        Ejecuta una consulta contra la API GraphQL de GitHub y devuelve
+        ``data``. Los errores de GraphQL se traducen a GithubAPIException.
+        La variable ``owner``, si existe, decide qué credenciales sirven.
+        """
+        url = Config.GITHUB_GRAPHQL_URL or f"{self.url_base}/graphql"
+        cuerpo = {"query": consulta, "variables": variables}
+        response = await self.enviar(
+            url, self.cabeceras,
+            lambda cabeceras: self.sesion.post(
+                url, headers=cabeceras, json=cuerpo, timeout=self.timeout
+            ),
+            variables.get("owner")
+        )
+        datos = response.json()
+        if datos.get("errors"):
+            mensajes = "; ".join(
+                error.get("message", "") for error in datos["errors"]
+            )
+            raise GithubAPIException(
+                f"Error en la consulta GraphQL: {mensajes}"
+            )
+        return datos["data"]
+
+    async def paginar(
+        self,
+        url: str,
+        headers: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        prefetch: bool = True
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Recorre un listado de GitHub página a página siguiendo la cabecera
+        ``Link: rel="next"`` y devuelve cada página en cuanto llega.
+
+        Con ``prefetch`` la petición de la página siguiente se lanza antes
+        de entregar la actual, de modo que la red trabaja mientras el
+        llamador procesa. Si el llamador deja de iterar, la petición
+        pendiente se cancela.
+
+        Las URLs de las páginas siguientes pueden no incluir al
+        propietario, así que se conserva el de la primera.
+        """
+        params = {"per_page": PER_PAGE, **(params or {})}
+        propietario = _propietario(url)
+        siguiente: Optional[asyncio.Future] = asyncio.ensure_future(
+            self.pedir(url, headers, params, propietario)
+        )
+        try:
+            while siguiente is not None:
+                response = await siguiente
+                siguiente = None
+
+                # La URL de la página siguiente ya incluye los parámetros
+                url_siguiente = response.links.get("next", {}).get("url")
+                if url_siguiente:
+                    peticion = self.pedir(
+                        url_siguiente, headers, propietario=propietario
+                    )
+                    siguiente = (
+                        asyncio.ensure_future(peticion) if prefetch
+                        else peticion
+                    )
+
+                yield response.json()
+        finally:
+            if isinstance(siguiente, asyncio.Future):
+                siguiente.cancel()
+            elif siguiente is not None:
+                siguiente.close()
+
+    async def iterar(
+        self, url: str, headers: Optional[Dict] = None,
+        params: Optional[Dict] = None
+    ) -> AsyncIterator[Dict]:
+        """Recorre todos los elementos de un listado paginado de GitHub."""
+        async for pagina in self.paginar(url, headers, params):
+            for elemento in pagina:
+                yield elemento
+
+    def iterar_repos(self, usuario: str) -> AsyncIterator[Dict]:
+        """Recorre los repositorios de un usuario u organización."""
+        return self.iterar(self.url(RUTA_REPOS_USUARIO, usuario=usuario))
+
+    def iterar_commits(
+        self, repo_owner: str, repo_name: str
+    ) -> AsyncIterator[Dict]:
+        """Recorre los commits de los últimos 30 días de un repositorio."""
+        url = self.url(RUTA_COMMITS, owner=repo_owner, repo=repo_name)
+        params = {"since": (datetime.now() - timedelta(days=30)).isoformat()}
+        return self.iterar(url, params=params)
+
+    def iterar_pull_requests(
+        self, repo_owner: str, repo_name: str
+    ) -> AsyncIterator[Dict]:
+        """Recorre todos los pull requests de un repositorio."""
+        url = self.url(RUTA_PULL_REQUESTS, owner=repo_owner, repo=repo_name)
+        return self.iterar(url, params={"state": "all"})
+
+    async def iterar_pull_requests_recientes(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        desde: datetime,
+        campo: str = "created"
+    ) -> AsyncIterator[Dict]:
+        """
+        Recorre los pull requests creados (o actualizados, con
+        ``campo="updated"``) desde ``desde``. GitHub los devuelve ordenados
+        de más reciente a más antiguo y la paginación se corta en cuanto
+        aparece uno fuera de la ventana, así que el volumen descargado
+        depende de la actividad reciente y no de la antigüedad del
+        repositorio.
+        """
+        url = self.url(RUTA_PULL_REQUESTS, owner=repo_owner, repo=repo_name)
+        params = {"state": "all", "sort": campo, "direction": "desc"}
+        paginas = self.paginar(url, params=params)
+        try:
+            async for pagina in paginas:
+                for pr in pagina:
+                    if parsear_fecha(pr[f"{campo}_at"]) < desde:
+                        return
+                    yield pr
+        finally:
+            await paginas.aclose()
+
+    async def _iterar_alertas(
+        self, url: str, state=None, start_date=None, end_date=None
+    ) -> AsyncIterator[Dict]:
+        """
+        Recorre un listado de alertas de Dependabot filtrando por fecha de
+        creación. La API no admite ese filtro, así que se piden ordenadas
+        de más reciente a más antigua, se descartan las posteriores a
+        ``end_date`` y la paginación se corta en la primera anterior a
+        ``start_date``.
+        """
+        desde, hasta = _limites_fechas(start_date, end_date)
+        params = _params_dependabot(state)
+        paginas = self.paginar(url, self.cabeceras_dependabot, params)
+        try:
+            async for pagina in paginas:
+                for alerta in pagina:
+                    if desde is None and hasta is None:
+                        yield alerta
+                        continue
+                    creada = _fecha_utc(alerta["created_at"])
+                    if desde is not None and creada < desde:
+                        return
+                    if hasta is None or creada <= hasta:
+                        yield alerta
+        finally:
+            await paginas.aclose()
+
+    def iterar_dependabot_alerts(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        state="open",
+        start_date=None,
+        end_date=None
+    ) -> AsyncIterator[Dict]:
+        """Recorre las alertas de Dependabot de un repositorio."""
+        url = self.url(RUTA_DEPENDABOT, owner=repo_owner, repo=repo_name)
+        return self._iterar_alertas(url, state, start_date, end_date)
+
+    def iterar_dependabot_alerts_organizacion(
+        self,
+        org: str,
+        state=None,
+        start_date=None,
+        end_date=None
+    ) -> AsyncIterator[Dict]:
+        """
+        Recorre las alertas de Dependabot de todos los repositorios de una
+        organización con un único listado paginado. Sin ``state`` se
+        devuelven las alertas en cualquier estado.
+        """
+        url = self.url(RUTA_DEPENDABOT_ORGANIZACION, org=org)
+        return self._iterar_alertas(url, state, start_date, end_date)
+
+
+# Cliente por defecto que usan las funciones del módulo
+_cliente_github = ClienteGithub()
+
+
+def obtener_cliente_github() -> ClienteGithub:
+    """Devuelve el cliente de GitHub por defecto de la aplicación."""
+    return _cliente_github
+
+
+def parsear_fecha(fecha: str) -> datetime:
+    """Convierte una fecha de GitHub ('2025-04-01T00:00:00Z') a datetime."""
+    return datetime.fromisoformat(fecha[:-1] if fecha.endswith("Z") else fecha)
+
+
+def _fecha_utc(fecha: str) -> datetime:
+    """Fecha ISO 8601 (con o sin zona) como datetime UTC sin zona."""
+    valor = datetime.fromisoformat(
+        fecha[:-1] + "+00:00" if fecha.endswith("Z") else fecha
+    )
+    if valor.tzinfo is not None:
+        valor = valor.astimezone(timezone.utc).replace(tzinfo=None)
+    return valor
+
+
+def _limites_fechas(
+    start_date=None, end_date=None
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Límites inclusivos del rango de fechas de creación. Las fechas pueden
+    ser YYYY-MM-DD o ISO 8601; una fecha de fin sin hora incluye el día
+    entero.
+    """
+    desde = _fecha_utc(start_date) if start_date else None
+    hasta = None
+    if end_date:
+        hasta = _fecha_utc(end_date)
+        if len(end_date) == 10:
+            hasta += timedelta(days=1, microseconds=-1)
+    return desde, hasta
+
+
+def _params_dependabot(state="open") -> Dict:
+    """Parámetros del listado de alertas de Dependabot."""
+    # Ordenadas por creación para poder cortar en la fecha de inicio
+    params = {"sort": "created", "direction": "desc"}
+    if state:
+        params["state"] = state
+    return params
+
+
+# Funciones del módulo: envoltorios del cliente por defecto
+
+
+async def consulta_graphql(consulta: str, variables: Dict) -> Dict:
+    """Ejecuta una consulta GraphQL con el cliente por defecto."""
+    return await _cliente_github.graphql(consulta, variables)
+
+
+def paginar(
+    url: str,
+    headers: Optional[Dict] = None,
+    params: Optional[Dict] = None,
+    prefetch: bool = True
+) -> AsyncIterator[List[Dict]]:
+    """Recorre un listado página a página con el cliente por defecto."""
+    return _cliente_github.paginar(url, headers, params, prefetch)
+
+
+def iterar(
+    url: str, headers: Optional[Dict] = None, params: Optional[Dict] = None
+) -> AsyncIterator[Dict]:
+    """Recorre todos los elementos de un listado paginado de GitHub."""
+    return _cliente_github.iterar(url, headers, params)
+
+
+def iterar_repos(usuario: str) -> AsyncIterator[Dict]:
+    """Recorre los repositorios de un usuario u organización de GitHub."""
+    return _cliente_github.iterar_repos(usuario)
+
+
+def iterar_commits(repo_owner: str, repo_name: str) -> AsyncIterator[Dict]:
+    """Recorre los commits de los últimos 30 días de un repositorio."""
+    return _cliente_github.iterar_commits(repo_owner, repo_name)
+
+
+def iterar_pull_requests(
+    repo_owner: str, repo_name: str
+) -> AsyncIterator[Dict]:
+    """Recorre todos los pull requests de un repositorio de GitHub."""
+    return _cliente_github.iterar_pull_requests(repo_owner, repo_name)
+
+
+def iterar_pull_requests_recientes(
+    repo_owner: str,
+    repo_name: str,
+    desde: datetime,
+    campo: str = "created"
+) -> AsyncIterator[Dict]:
+    """Recorre los pull requests creados o actualizados desde ``desde``."""
+    return _cliente_github.iterar_pull_requests_recientes(
+        repo_owner, repo_name, desde, campo
+    )
+
+
+def iterar_dependabot_alerts(
+        repo_owner: str,
+        repo_name: str,
+        state="open",
+        start_date=None,
+        end_date=None) -> AsyncIterator[Dict]:
+    """Recorre las alertas de Dependabot de un repositorio."""
+    return _cliente_github.iterar_dependabot_alerts(
+        repo_owner, repo_name, state, start_date, end_date
+    )
+
+
+def iterar_dependabot_alerts_organizacion(
+        org: str,
+        state=None,
+        start_date=None,
+        end_date=None) -> AsyncIterator[Dict]:
+    """Recorre las alertas de Dependabot de una organización."""
+    return _cliente_github.iterar_dependabot_alerts_organizacion(
+        org, state, start_date, end_date
+    )
+
+
 async def get_repos(usuario: str):
     """Obtiene los repositorios de un usuario u organización de GitHub."""
-    url = f"{Config.GITHUB_API_URL}/users/{usuario}/repos"
-    headers = {"Authorization": f"Bearer {Config.GITHUB_TOKEN}"}
-    try:
-        response = requests.get(url, headers=headers, timeout=TIMEOUT)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.Timeout as e:
-        raise GithubAPIException(
-            f"La solicitud a {url}"
-            + f"ha superado el tiempo de espera de {TIMEOUT} segundos."
-        ) from e
-    except requests.exceptions.RequestException as e:
-        raise GithubAPIException(f"Error en la solicitud a {url}: {e}") from e
+    return [repo async for repo in iterar_repos(usuario)]
 
 
 async def get_commits(repo_owner: str, repo_name: str):
     """Obtiene los commits recientes de un repositorio."""
-    url = f"{Config.GITHUB_API_URL}/repos/{repo_owner}/{repo_name}/commits"
-    headers = {"Authorization": f"Bearer {Config.GITHUB_TOKEN}"}
-    params = {"since": (datetime.now() - timedelta(days=30)).isoformat()}
-    try:
-        response = requests.get(
-            url,
-            headers=headers,
-            params=params,
-            timeout=TIMEOUT
-        )
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.Timeout as e:
-        raise GithubAPIException(
-            f"La solicitud a {url}"
-            + f"ha superado el tiempo de espera de {TIMEOUT} segundos."
-        ) from e
-    except requests.exceptions.RequestException as e:
-        raise GithubAPIException(f"Error en la solicitud a {url}: {e}") from e
+    return [
+        commit async for commit in iterar_commits(repo_owner, repo_name)
+    ]
 
 
 async def get_pull_requests(repo_owner: str, repo_name: str):
     """Obtiene los pull requests de un repositorio de GitHub."""
-    url = f"{Config.GITHUB_API_URL}/repos/{repo_owner}/{repo_name}/pulls?state=all"
-    headers = {"Authorization": f"Bearer {Config.GITHUB_TOKEN}"}
-    try:
-        response = requests.get(url, headers=headers, timeout=TIMEOUT)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.Timeout as e:
-        raise GithubAPIException(
-            f"La solicitud a {url}"
-            + f"ha superado el tiempo de espera de {TIMEOUT} segundos."
-        ) from e
-    except requests.exceptions.RequestException as e:
-        raise GithubAPIException(f"Error en la solicitud a {url}: {e}") from e
+    return [pr async for pr in iterar_pull_requests(repo_owner, repo_name)]
 
 
 async def get_dependabot_alerts(
@@ -78,34 +742,8 @@ async def get_dependabot_alerts(
     Obtiene las alertas de seguridad de Dependabot para un repositorio,
     con un filtro opcional por rango de fechas de creación.
     """
-    url = (
-        f"{Config.GITHUB_API_URL}/repos/"
-        f"{repo_owner}/{repo_name}/dependabot/alerts"
-    )
-    headers = {
-        "Authorization": f"Bearer {Config.GITHUB_TOKEN}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
-
-    # Parámetros adicionales para filtrar por fechas si se proporcionan
-    params = {"state": state}
-    if start_date:
-        params["created"] = f">={start_date}"
-    if end_date:
-        params["created"] = f"<={end_date}"
-
-    try:
-        response = requests.get(
-            url, headers=headers, params=params, timeout=TIMEOUT
+    return [
+        alerta async for alerta in iterar_dependabot_alerts(
+            repo_owner, repo_name, state, start_date, end_date
         )
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.Timeout as e:
-        raise GithubAPIException(
-            f"La solicitud a {url} superó los {TIMEOUT} segundos."
-        ) from e
-    except requests.exceptions.RequestException as e:
-        raise GithubAPIException(
-            f"Error en la solicitud a {url}: {e}"
-        ) from e
+    ]
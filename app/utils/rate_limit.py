@@ -0,0 +1,179 @@
+"""Planificador de peticiones a GitHub que respeta los límites de uso."""
+
+import asyncio
+import hashlib
+import random
+import time
+from typing import Callable, Dict, Optional
+import httpx
+from config import Config
+
+# Códigos de estado que se reintentan con espera
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+
+
+def identificar_token(authorization: Optional[str]) -> str:
+    """Identificador corto y no reversible de un token."""
+    if not authorization:
+        return "anonimo"
+    return hashlib.sha256(authorization.encode()).hexdigest()[:8]
+
+
+class LimiteUsoAgotado(Exception):
+    """La espera por límite de uso supera el máximo permitido."""
+
+    def __init__(self, reinicio: float):
+        super().__init__(f"Límite de uso agotado hasta {reinicio:.0f}")
+        self.reinicio = reinicio
+
+
+class PlanificadorGithub:
+    """
+    Lleva la cuenta del presupuesto de cada token a partir de las cabeceras
+    ``X-RateLimit-*`` y reparte las peticiones a lo largo de la ventana de
+    reinicio cuando el presupuesto restante baja del umbral configurado.
+    Mientras sobra presupuesto las peticiones salen sin espera. Si un
+    token agotado (o un ``Retry-After``) obligara a esperar más de
+    ``espera_max`` segundos se lanza LimiteUsoAgotado en lugar de dormir;
+    el reparto del presupuesto que queda nunca falla.
+    """
+
+    def __init__(
+        self,
+        umbral_ritmo: float = None,
+        backoff_base: float = None,
+        backoff_max: float = None,
+        espera_max: float = None,
+        reloj: Callable[[], float] = time.time,
+        dormir: Callable = asyncio.sleep
+    ):
+        self.umbral_ritmo = (
+            Config.GITHUB_UMBRAL_RITMO if umbral_ritmo is None
+            else umbral_ritmo
+        )
+        self.backoff_base = (
+            Config.GITHUB_BACKOFF_BASE if backoff_base is None
+            else backoff_base
+        )
+        self.backoff_max = (
+            Config.GITHUB_BACKOFF_MAX if backoff_max is None
+            else backoff_max
+        )
+        self.espera_max = (
+            Config.GITHUB_ESPERA_MAX if espera_max is None else espera_max
+        )
+        self._reloj = reloj
+        self._dormir = dormir
+        self._presupuestos: Dict[str, Dict] = {}
+        self._proximo_turno: Dict[str, float] = {}
+
+    def _espera_turno(self, token: str) -> float:
+        """Calcula cuánto debe esperar la siguiente petición del token."""
+        presupuesto = self._presupuestos.get(token)
+        ahora = self._reloj()
+        if presupuesto is None or presupuesto["reinicio"] <= ahora:
+            return 0.0
+
+        restante = presupuesto["restante"]
+        if restante <= 0:
+            # Agotado: se espera al reinicio de la ventana (acotado)
+            return self._acotar(
+                presupuesto["reinicio"] - ahora, presupuesto["reinicio"]
+            )
+
+        # Se descuenta de forma optimista para las peticiones concurrentes,
+        # una vez decidido que la petición saldrá
+        presupuesto["restante"] -= 1
+        if restante >= presupuesto["limite"] * self.umbral_ritmo:
+            return 0.0
+
+        # Presupuesto escaso: se reparte lo que queda hasta el reinicio.
+        # Queda presupuesto, así que la espera no se acota: nunca pasa del
+        # reinicio de la ventana
+        intervalo = (presupuesto["reinicio"] - ahora) / restante
+        turno = max(ahora, self._proximo_turno.get(token, ahora))
+        self._proximo_turno[token] = turno + intervalo
+        return turno - ahora
+
+    def _acotar(self, espera: float, reinicio: float = None) -> float:
+        """Devuelve la espera o lanza LimiteUsoAgotado si supera el máximo."""
+        if espera > self.espera_max:
+            raise LimiteUsoAgotado(
+                self._reloj() + espera if reinicio is None else reinicio
+            )
+        return espera
+
+    def disponible(self, token: str) -> float:
+        """
+        Presupuesto restante conocido del token; infinito si aún no se
+        conoce o si la ventana ya se ha reiniciado.
+        """
+        presupuesto = self._presupuestos.get(token)
+        if presupuesto is None or presupuesto["reinicio"] <= self._reloj():
+            return float("inf")
+        return presupuesto["restante"]
+
+    def reinicio(self, token: str) -> float:
+        """Momento en que se reinicia la ventana del token (0 si se desconoce)."""
+        presupuesto = self._presupuestos.get(token)
+        return presupuesto["reinicio"] if presupuesto is not None else 0.0
+
+    async def esperar_turno(self, token: str):
+        """Espera hasta que el token pueda hacer la siguiente petición."""
+        espera = self._espera_turno(token)
+        if espera > 0:
+            await self._dormir(espera)
+
+    def actualizar(self, token: str, headers: httpx.Headers):
+        """Actualiza el presupuesto del token con las cabeceras recibidas."""
+        restante = headers.get("x-ratelimit-remaining")
+        reinicio = headers.get("x-ratelimit-reset")
+        if restante is None or reinicio is None:
+            return
+        self._presupuestos[token] = {
+            "restante": int(restante),
+            "limite": int(headers.get("x-ratelimit-limit", restante) or 1),
+            "reinicio": float(reinicio),
+        }
+
+    @staticmethod
+    def es_reintentable(response: httpx.Response) -> bool:
+        """Indica si la respuesta es un límite de uso o un error temporal."""
+        if response.status_code in ESTADOS_REINTENTABLES:
+            return True
+        # Un 403 solo se reintenta si es por límite de uso, no por permisos
+        return response.status_code == 403 and (
+            response.headers.get("x-ratelimit-remaining") == "0"
+            or "retry-after" in response.headers
+        )
+
+    def espera_reintento(self, intento: int, response: httpx.Response) -> float:
+        """
+        Segundos a esperar antes de reintentar: ``Retry-After`` si viene,
+        el reinicio de la ventana si el token está agotado y, si no,
+        backoff exponencial con jitter completo. Las dos primeras se
+        acotan a ``espera_max`` (LimiteUsoAgotado si lo superan).
+        """
+        retry_after = response.headers.get("retry-after")
+        if retry_after is not None and retry_after.isdigit():
+            return self._acotar(float(retry_after))
+
+        reinicio = response.headers.get("x-ratelimit-reset")
+        if response.headers.get("x-ratelimit-remaining") == "0" and reinicio:
+            return self._acotar(
+                max(0.0, float(reinicio) - self._reloj()), float(reinicio)
+            )
+
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2 ** intento)
+        )
+
+    async def esperar_reintento(self, intento: int, response: httpx.Response):
+        """Duerme el tiempo indicado por ``espera_reintento``."""
+        await self._dormir(self.espera_reintento(intento, response))
+
+    def presupuesto(self) -> Dict[str, Dict]:
+        """Presupuesto conocido de cada token, para exponerlo como métrica."""
+        return {
+            token: dict(datos) for token, datos in self._presupuestos.items()
+        }
@@ -0,0 +1,51 @@
+"""Agrupación de peticiones idénticas concurrentes (single-flight)."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class AgrupadorPeticiones:
+    """
+    Comparte una única petición en vuelo entre todas las llamadas
+    concurrentes con la misma clave. La primera llamada lanza la petición
+    y las demás esperan su resultado (o su excepción). Si una de las
+    llamadas se cancela, la petición sigue adelante para el resto.
+    """
+
+    def __init__(self):
+        self._en_vuelo: Dict[Hashable, asyncio.Future] = {}
+        self.llamadas = 0
+        self.agrupadas = 0
+
+    async def ejecutar(
+        self, clave: Hashable, funcion: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Ejecuta ``funcion`` o se une a la ejecución en vuelo de ``clave``."""
+        self.llamadas += 1
+        tarea = self._en_vuelo.get(clave)
+        if tarea is not None:
+            self.agrupadas += 1
+        else:
+            tarea = asyncio.ensure_future(funcion())
+            self._en_vuelo[clave] = tarea
+            tarea.add_done_callback(lambda t: self._terminar(clave, t))
+        return await asyncio.shield(tarea)
+
+    def _terminar(self, clave: Hashable, tarea: asyncio.Future):
+        """Libera la clave y recoge la excepción si nadie la esperaba."""
+        if self._en_vuelo.get(clave) is tarea:
+            del self._en_vuelo[clave]
+        if not tarea.cancelled():
+            tarea.exception()
+
+    def estadisticas(self) -> Dict:
+        """Contadores de llamadas y de llamadas agrupadas."""
+        return {
+            "llamadas": self.llamadas,
+            "agrupadas": self.agrupadas,
+            "en_vuelo": len(self._en_vuelo),
+            "ratio_agrupadas": (
+                round(self.agrupadas / self.llamadas, 4)
+                if self.llamadas else 0.0
+            ),
+        }
@@ -0,0 +1,58 @@
+"""Utilidades para devolver respuestas en streaming."""
+import json
+import logging
+from typing import AsyncIterator, Dict, List
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPE_NDJSON = "application/x-ndjson"
+
+
+def _linea(registro: Dict) -> bytes:
+    """Serializa un registro como una línea JSON."""
+    return (json.dumps(registro, ensure_ascii=False) + "\n").encode()
+
+
+async def _lineas_ndjson(
+    primeros: List[Dict], registros: AsyncIterator[Dict]
+) -> AsyncIterator[bytes]:
+    """
+    Serializa cada registro como una línea JSON. Si el iterador falla
+    cuando ya se ha enviado el estado HTTP, se añade una última línea
+    ``{"tipo": "error", "detalle": ...}`` para que el cliente distinga un
+    resultado parcial de uno completo.
+    """
+    try:
+        for registro in primeros:
+            yield _linea(registro)
+        async for registro in registros:
+            yield _linea(registro)
+    except Exception as e:
+        logger.error(f"Error durante el streaming NDJSON: {e}", exc_info=True)
+        yield _linea({"tipo": "error", "detalle": str(e)})
+    finally:
+        await registros.aclose()
+
+
+async def respuesta_ndjson(
+    registros: AsyncIterator[Dict]
+) -> StreamingResponse:
+    """
+    Devuelve un StreamingResponse NDJSON que envía cada registro en cuanto
+    el iterador lo produce.
+
+    El primer registro se obtiene antes de crear la respuesta, así que un
+    error inicial (por ejemplo, un usuario que no existe) se propaga al
+    llamador y puede devolverse con el código HTTP habitual.
+    """
+    try:
+        primeros = [await registros.__anext__()]
+    except StopAsyncIteration:
+        primeros = []
+    except BaseException:
+        await registros.aclose()
+        raise
+    return StreamingResponse(
+        _lineas_ndjson(primeros, registros), media_type=MEDIA_TYPE_NDJSON
+    )
@@ -0,0 +1,134 @@
+"""
+Benchmark de la agregación de productividad: algoritmo original
+(una pasada por usuario y strptime repetido) frente a la pasada única.
+
+Uso: python -m benchmarks.bench_productividad [--usuarios 200]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append('.')
+from app.productividad.productividad_service import (
+    COMMIT_THRESHOLD,
+    PR_THRESHOLD,
+    agregar_productividad
+)
+
+FORMATO = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def productividad_original(commits, prs, ahora):
+    """Copia del algoritmo anterior: O(usuarios × (commits + PRs))."""
+    fecha_limite_2_semanas = ahora - timedelta(weeks=2)
+    usuarios = set()
+    for commit in commits:
+        usuarios.add(commit['author']['login'])
+    for pr in prs:
+        if pr['user']:
+            usuarios.add(pr['user']['login'])
+
+    productividad = []
+    for usuario in usuarios:
+        commits_recientes = [
+            commit for commit in commits
+            if commit['author']['login'] == usuario
+            and datetime.strptime(
+                commit['commit']['author']['date'], FORMATO
+            ) > ahora - timedelta(days=30)
+        ]
+        commits_en_ultimas_2_semanas = [
+            commit for commit in commits_recientes
+            if datetime.strptime(
+                commit['commit']['author']['date'], FORMATO
+            ) > fecha_limite_2_semanas
+        ]
+        pr_abiertos = [
+            pr for pr in prs
+            if pr['user']['login'] == usuario and pr['state'] == 'open' and
+            datetime.strptime(pr['created_at'], FORMATO)
+            > fecha_limite_2_semanas
+        ]
+        pr_no_fusionados_cerrados = [
+            pr for pr in prs
+            if pr['user']['login'] == usuario and pr['state'] == 'closed' and
+            not pr.get('merged', False) and datetime.strptime(
+                pr['created_at'], FORMATO
+            ) > fecha_limite_2_semanas
+        ]
+        productivo = (len(commits_recientes) >= COMMIT_THRESHOLD and
+                      len(pr_abiertos) >= PR_THRESHOLD)
+        productividad.append({
+            "usuario": usuario,
+            "status": "productivo" if productivo else "improductivo",
+            "commits": len(commits_en_ultimas_2_semanas),
+            "pull_requests_abiertos": len(pr_abiertos),
+            "pull_requests_no_fusionados": len(pr_no_fusionados_cerrados)
+        })
+    return productividad
+
+
+def generar_eventos(total, usuarios, ahora, semilla=42):
+    """Genera la mitad de commits y la mitad de PRs de los últimos 60 días."""
+    aleatorio = random.Random(semilla)
+    logins = [f"usuario{i}" for i in range(usuarios)]
+
+    def fecha():
+        segundos = aleatorio.randint(0, 60 * 24 * 3600)
+        return (ahora - timedelta(seconds=segundos)).strftime(FORMATO)
+
+    commits = [
+        {"author": {"login": aleatorio.choice(logins)},
+         "commit": {"author": {"date": fecha()}}}
+        for _ in range(total // 2)
+    ]
+    prs = [
+        {"user": {"login": aleatorio.choice(logins)},
+         "state": aleatorio.choice(["open", "closed"]),
+         "merged": aleatorio.random() < 0.5,
+         "created_at": fecha()}
+        for _ in range(total - total // 2)
+    ]
+    return commits, prs
+
+
+def medir(funcion, *args):
+    """Ejecuta la función y devuelve (resultado, segundos)."""
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    """Compara ambos algoritmos con 10k y 100k eventos."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--usuarios", type=int, default=200)
+    args = parser.parse_args()
+
+    ahora = datetime.now()
+    for total in (10_000, 100_000):
+        commits, prs = generar_eventos(total, args.usuarios, ahora)
+
+        original, t_original = medir(
+            productividad_original, commits, prs, ahora
+        )
+        (nueva, _, _), t_nueva = medir(
+            agregar_productividad, commits, prs, ahora
+        )
+
+        def ordenar(filas):
+            return sorted(filas, key=lambda fila: fila["usuario"])
+        assert ordenar(original) == ordenar(nueva)
+
+        print(
+            f"{total:>7} eventos, {args.usuarios} usuarios: "
+            f"original {t_original:8.3f} s | "
+            f"una pasada {t_nueva:8.3f} s | "
+            f"x{t_original / t_nueva:,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,3 +10,118 @@ class Config:
     """Clase de configuración que carga las variables de entorno."""
     GITHUB_API_URL = os.getenv("GITHUB_API_URL")
     GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
+    # Pool de credenciales: tokens separados por comas (se suman a
+    # GITHUB_TOKEN) y, opcionalmente, instalaciones de una GitHub App
+    # como "propietario:id" separadas por comas (cada instalación solo se
+    # usa para su propietario). La clave privada puede ser el PEM o la
+    # ruta al fichero.
+    GITHUB_TOKENS = os.getenv("GITHUB_TOKENS", "")
+    GITHUB_APP_ID = os.getenv("GITHUB_APP_ID")
+    GITHUB_APP_CLAVE_PRIVADA = os.getenv("GITHUB_APP_CLAVE_PRIVADA")
+    GITHUB_APP_INSTALACIONES = os.getenv("GITHUB_APP_INSTALACIONES", "")
+
+    # Pool de conexiones del cliente HTTP compartido con GitHub
+    GITHUB_HTTP2 = os.getenv("GITHUB_HTTP2", "true").lower() == "true"
+    GITHUB_MAX_CONNECTIONS = int(os.getenv("GITHUB_MAX_CONNECTIONS", "100"))
+    GITHUB_MAX_KEEPALIVE = int(os.getenv("GITHUB_MAX_KEEPALIVE", "20"))
+    GITHUB_KEEPALIVE_EXPIRY = float(
+        os.getenv("GITHUB_KEEPALIVE_EXPIRY", "30")
+    )
+    # Tiempos de espera en segundos: establecer la conexión y leer
+    GITHUB_TIMEOUT_CONEXION = float(os.getenv("GITHUB_TIMEOUT_CONEXION", "5"))
+    GITHUB_TIMEOUT_LECTURA = float(os.getenv("GITHUB_TIMEOUT_LECTURA", "20"))
+
+    # Número máximo de repositorios procesados en paralelo
+    GITHUB_CONCURRENCIA = int(os.getenv("GITHUB_CONCURRENCIA", "10"))
+
+    # Caché de respuestas condicionales: "memoria", "disco" o "ninguna"
+    GITHUB_CACHE = os.getenv("GITHUB_CACHE", "memoria").lower()
+    GITHUB_CACHE_MAX_ENTRADAS = int(
+        os.getenv("GITHUB_CACHE_MAX_ENTRADAS", "1024")
+    )
+    GITHUB_CACHE_RUTA = os.getenv(
+        "GITHUB_CACHE_RUTA", ".cache/github_respuestas.sqlite3"
+    )
+    GITHUB_CACHE_DISCO_MAX_ENTRADAS = int(
+        os.getenv("GITHUB_CACHE_DISCO_MAX_ENTRADAS", "10000")
+    )
+
+    # Agrupar en una sola petición los GET idénticos concurrentes
+    GITHUB_AGRUPAR_PETICIONES = (
+        os.getenv("GITHUB_AGRUPAR_PETICIONES", "true").lower() == "true"
+    )
+
+    # Planificador de peticiones y reintentos ante límites de uso
+    GITHUB_MAX_REINTENTOS = int(os.getenv("GITHUB_MAX_REINTENTOS", "3"))
+    GITHUB_BACKOFF_BASE = float(os.getenv("GITHUB_BACKOFF_BASE", "1"))
+    GITHUB_BACKOFF_MAX = float(os.getenv("GITHUB_BACKOFF_MAX", "60"))
+    GITHUB_UMBRAL_RITMO = float(os.getenv("GITHUB_UMBRAL_RITMO", "0.2"))
+    # Espera máxima por límite de uso; si hay que esperar más se falla
+    GITHUB_ESPERA_MAX = float(os.getenv("GITHUB_ESPERA_MAX", "60"))
+
+    # API GraphQL (por defecto, GITHUB_API_URL + "/graphql")
+    GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL")
+    GITHUB_GRAPHQL_POR_PAGINA = int(
+        os.getenv("GITHUB_GRAPHQL_POR_PAGINA", "50")
+    )
+
+    # Caché de resultados de los endpoints (TTL en segundos, 0 la desactiva)
+    RESULTADOS_CACHE_MAX_ENTRADAS = int(
+        os.getenv("RESULTADOS_CACHE_MAX_ENTRADAS", "256")
+    )
+    RESULTADOS_VENTANA_OBSOLETA = float(
+        os.getenv("RESULTADOS_VENTANA_OBSOLETA", "3600")
+    )
+    RESULTADOS_TTL_REPOSITORIOS = float(
+        os.getenv("RESULTADOS_TTL_REPOSITORIOS", "300")
+    )
+    RESULTADOS_TTL_PRODUCTIVIDAD = float(
+        os.getenv("RESULTADOS_TTL_PRODUCTIVIDAD", "600")
+    )
+    RESULTADOS_TTL_DEPENDABOTS = float(
+        os.getenv("RESULTADOS_TTL_DEPENDABOTS", "900")
+    )
+    # Resultados parciales (algún repositorio o estado falló): TTL corto
+    # y sin ventana obsoleta; 0 para no guardarlos
+    RESULTADOS_TTL_PARCIAL = float(
+        os.getenv("RESULTADOS_TTL_PARCIAL", "30")
+    )
+
+    # Clasificación incremental: marcas de agua en "memoria" o "sqlite".
+    # Pasado REPOS_MARCAS_MAX_EDAD (segundos) se revisan los PRs aunque
+    # el repositorio no haya recibido pushes.
+    REPOS_MARCAS_ALMACEN = os.getenv("REPOS_MARCAS_ALMACEN", "memoria").lower()
+    REPOS_MARCAS_RUTA = os.getenv(
+        "REPOS_MARCAS_RUTA", ".cache/marcas_agua.sqlite3"
+    )
+    REPOS_MARCAS_MAX_EDAD = float(os.getenv("REPOS_MARCAS_MAX_EDAD", "86400"))
+
+    # Programador de refrescos periódicos (intervalos en segundos).
+    # Usuarios separados por comas y repositorios como "owner/repo".
+    PROGRAMADOR_ACTIVO = (
+        os.getenv("PROGRAMADOR_ACTIVO", "false").lower() == "true"
+    )
+    PROGRAMADOR_USUARIOS = os.getenv("PROGRAMADOR_USUARIOS", "")
+    PROGRAMADOR_REPOS = os.getenv("PROGRAMADOR_REPOS", "")
+    PROGRAMADOR_INTERVALO_REPOSITORIOS = float(
+        os.getenv("PROGRAMADOR_INTERVALO_REPOSITORIOS", "900")
+    )
+    PROGRAMADOR_INTERVALO_PRODUCTIVIDAD = float(
+        os.getenv("PROGRAMADOR_INTERVALO_PRODUCTIVIDAD", "1800")
+    )
+    PROGRAMADOR_INTERVALO_DEPENDABOTS = float(
+        os.getenv("PROGRAMADOR_INTERVALO_DEPENDABOTS", "3600")
+    )
+
+    # Trabajos en segundo plano: almacén "memoria" o "sqlite"
+    JOBS_ALMACEN = os.getenv("JOBS_ALMACEN", "memoria").lower()
+    JOBS_SQLITE_RUTA = os.getenv("JOBS_SQLITE_RUTA", ".cache/jobs.sqlite3")
+    JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "2"))
+    JOBS_TTL = float(os.getenv("JOBS_TTL", "3600"))
+    # Concurrencia máxima que puede pedir un trabajo de repositorios
+    JOBS_CONCURRENCIA_MAX = int(os.getenv("JOBS_CONCURRENCIA_MAX", "20"))
+    # Segundos mínimos entre dos guardados del progreso de un trabajo
+    JOBS_PROGRESO_INTERVALO = float(
+        os.getenv("JOBS_PROGRESO_INTERVALO", "1")
+    )
@@ -1,6 +1,16 @@
 """Este es el main del proyecto."""
 # main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from app.utils.github_utils import iniciar_cliente, cerrar_cliente
+from app.elasticsearch.conexion_elasticsearch import (
+    iniciar_elasticsearch,
+    cerrar_elasticsearch
+)
+from app.elasticsearch.indexador_bulk import (
+    iniciar_indexador,
+    detener_indexador
+)
 from app.repositorios.repo_routes import router as repo_router
 from app.productividad.productividad_router import (
     router as productividad_router
@@ -8,12 +18,46 @@ from app.productividad.productividad_router import (
 from app.dependabots.dependabots_router import (
     router as dependabots_router
 )
+from app.metricas.metricas_router import router as metricas_router
+from app.jobs.jobs_service import iniciar_trabajos, detener_trabajos
+from app.jobs.jobs_router import router as jobs_router
+from app.utils.cache_resultados import cerrar_cache_resultados
+from app.cache.cache_router import router as cache_router
+from app.programador.programador_service import (
+    iniciar_programador,
+    detener_programador
+)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Abre y cierra los recursos compartidos de la aplicación."""
+    # Cliente HTTP con pool de conexiones hacia GitHub
+    await iniciar_cliente()
+    # Cliente de Elasticsearch e indexación en lote en segundo plano
+    await iniciar_elasticsearch()
+    await iniciar_indexador()
+    # Workers de los trabajos en segundo plano
+    await iniciar_trabajos()
+    # Refrescos periódicos dentro del proceso (PROGRAMADOR_ACTIVO)
+    await iniciar_programador()
+    yield
+    await detener_programador()
+    await detener_trabajos()
+    await cerrar_cache_resultados()
+    await detener_indexador()
+    await cerrar_elasticsearch()
+    await cerrar_cliente()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(repo_router, tags=["repositorios"])
 app.include_router(productividad_router, tags=["producitividad"])
 app.include_router(dependabots_router, tags=["dependabots"])
+app.include_router(metricas_router, tags=["metricas"])
+app.include_router(jobs_router, tags=["jobs"])
+app.include_router(cache_router, tags=["cache"])
 
 
 @app.get("/")
@@ -0,0 +1,59 @@
+"""Estos son los tests del router de cache"""
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from app.repositorios.marcas_agua import AlmacenMarcasMemoria
+from main import app
+
+client = TestClient(app)
+
+RUTA = "/v1/dependabots/organizacion/mi-org"
+
+
+@patch(
+    "app.dependabots.dependabots_router."
+    "obtener_resumen_dependabots_organizacion",
+    new_callable=AsyncMock
+)
+def test_invalidar_cache_resultados(mock_resumen):
+    """Los resultados se reutilizan hasta que se invalida la caché."""
+    mock_resumen.return_value = {"total": 1}
+
+    assert client.get(RUTA).json() == {"total": 1}
+    assert client.get(RUTA).json() == {"total": 1}
+    assert mock_resumen.call_count == 1
+
+    response = client.delete(
+        "/v1/cache/resultados?espacio=dependabots_organizacion"
+    )
+    assert response.json() == {"invalidadas": 1}
+
+    client.get(RUTA)
+    assert mock_resumen.call_count == 2
+
+
+def test_invalidar_borra_las_marcas_del_usuario():
+    """Con ``usuario`` también se borran sus marcas de agua."""
+    almacen = AlmacenMarcasMemoria()
+    almacen.guardar("u", "repo1", {"pushed_at": None})
+    almacen.guardar("otro", "repo1", {"pushed_at": None})
+
+    with patch("app.cache.cache_router.obtener_almacen_marcas",
+               return_value=almacen):
+        response = client.delete(
+            "/v1/cache/resultados?espacio=repositorios&usuario=u"
+        )
+        sin_marcas = client.delete(
+            "/v1/cache/resultados?espacio=productividad&usuario=otro"
+        )
+
+    assert response.json() == {"invalidadas": 0, "marcas_borradas": 1}
+    assert sin_marcas.json() == {"invalidadas": 0}
+    assert almacen.obtener("u", "repo1") is None
+    assert almacen.obtener("otro", "repo1") is not None
+
+
+def test_invalidar_espacio_desconocido():
+    """Un espacio que no existe es un error de validación."""
+    response = client.delete("/v1/cache/resultados?espacio=otro")
+
+    assert response.status_code == 422
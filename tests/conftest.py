@@ -0,0 +1,22 @@
+"""Configuración común de las pruebas."""
+import pytest
+from app.utils.cache_resultados import obtener_cache_resultados
+from app.elasticsearch import conexion_elasticsearch, spool_elasticsearch
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache_resultados():
+    """Cada prueba empieza con la caché de resultados vacía."""
+    obtener_cache_resultados().invalidar()
+    yield
+    obtener_cache_resultados().invalidar()
+
+
+@pytest.fixture(autouse=True)
+def aislar_elasticsearch(tmp_path, monkeypatch):
+    """Spool en un directorio temporal e interruptor cerrado en cada prueba."""
+    spool = spool_elasticsearch.SpoolDisco(str(tmp_path / "spool"))
+    monkeypatch.setattr(spool_elasticsearch, "_spool", spool)
+    conexion_elasticsearch.interruptor.registrar_exito()
+    yield
+    spool.cerrar()
@@ -1,7 +1,9 @@
 """Estos son los tests"""
+import json
 from unittest.mock import patch
 from fastapi.testclient import TestClient
 from main import app
+from app.utils.github_utils import GithubAPIException
 
 # Datos de ejemplo para los tests
 example_alertas = [
@@ -129,3 +131,80 @@ def test_obtener_dependabots_sin_alertas(mock_get_dependabot_alerts):
     assert data["total_solucionadas"] == 0
     assert data["no_solucionadas"] == []
     assert data["solucionadas"] == []
+
+
+@patch(
+    "app.dependabots.dependabots_service."
+    "iterar_dependabot_alerts_organizacion"
+)
+def test_dependabots_organizacion_detalle_ndjson(mock_iterar):
+    """Con detalle=true se recibe una línea por alerta y el resumen."""
+    async def iterar(*_args, **_kwargs):
+        for alerta in example_alertas:
+            yield {**alerta, "repository": {"name": "repo1"}}
+
+    mock_iterar.side_effect = iterar
+
+    response = client.get("/v1/dependabots/organizacion/mi-org?detalle=true")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lineas = [json.loads(linea) for linea in response.text.splitlines()]
+    assert [linea["tipo"] for linea in lineas] == [
+        "alerta", "alerta", "alerta", "resumen"
+    ]
+    assert lineas[0]["paquete"] == "paquete1"
+    assert lineas[-1]["total_alertas"] == 3
+    assert lineas[-1]["por_repositorio"] == {"repo1": 3}
+
+
+@patch(
+    "app.dependabots.dependabots_service."
+    "iterar_dependabot_alerts_organizacion"
+)
+def test_dependabots_organizacion_detalle_error_inicial(mock_iterar):
+    """Si el listado falla antes de enviar nada se devuelve 500."""
+    async def iterar(*_args, **_kwargs):
+        raise GithubAPIException("Organización no encontrada")
+        yield  # pylint: disable=unreachable
+
+    mock_iterar.side_effect = iterar
+
+    response = client.get("/v1/dependabots/organizacion/nadie?detalle=true")
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Organización no encontrada"}
+
+
+@patch(
+    "app.dependabots.dependabots_service."
+    "iterar_dependabot_alerts_organizacion"
+)
+def test_dependabots_organizacion_detalle_error_a_mitad(mock_iterar):
+    """Si falla una página posterior, la última línea es el error."""
+    async def iterar(*_args, **_kwargs):
+        yield {**example_alertas[0], "repository": {"name": "repo1"}}
+        raise GithubAPIException("Error de GitHub")
+
+    mock_iterar.side_effect = iterar
+
+    response = client.get("/v1/dependabots/organizacion/mi-org?detalle=true")
+
+    assert response.status_code == 200
+    lineas = [json.loads(linea) for linea in response.text.splitlines()]
+    assert [linea["tipo"] for linea in lineas] == ["alerta", "error"]
+    assert lineas[-1]["detalle"] == "Error de GitHub"
+
+
+@patch(
+    "app.dependabots.dependabots_router."
+    "obtener_resumen_dependabots_organizacion"
+)
+def test_dependabots_organizacion_error(mock_resumen):
+    """Un error en el servicio devuelve 500."""
+    mock_resumen.side_effect = Exception("Error de GitHub")
+
+    response = client.get("/v1/dependabots/organizacion/mi-org")
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Error de GitHub"}
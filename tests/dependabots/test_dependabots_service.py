@@ -1,16 +1,32 @@
 """Esto es un test"""
 import unittest
 from unittest.mock import patch
+from app.utils.github_utils import (
+    GithubAPIException,
+    GithubLimiteUsoException
+)
 from app.dependabots.dependabots_service import (
-    obtener_dependabots_solucionados_y_no_solucionados
+    obtener_dependabots_solucionados_y_no_solucionados,
+    obtener_resumen_dependabots_organizacion
 )
 
 
-class TestDependabotService(unittest.TestCase):
+def alerta_org(repo, estado, severidad, paquete):
+    """Alerta tal y como la devuelve el listado de organización."""
+    return {
+        "state": estado,
+        "repository": {"name": repo},
+        "dependency": {"package": {"name": paquete}},
+        "security_advisory": {"severity": severidad},
+        "created_at": "2024-01-01T00:00:00Z"
+    }
+
+
+class TestDependabotService(unittest.IsolatedAsyncioTestCase):
     """Pruebas unitarias para el servicio de dependabot."""
 
     @patch("app.dependabots.dependabots_service.get_dependabot_alerts")
-    def test_dependabots_solucionados_y_no_solucionados(self, mock_get_alerts):
+    async def test_dependabots_solucionados_y_no_solucionados(self, mock_get_alerts):
         """
         Verifica que las alertas se clasifican correctamente entre solucionadas
         y no solucionadas, según su estado.
@@ -51,7 +67,7 @@ class TestDependabotService(unittest.TestCase):
         ]
 
         # Llamar a la función bajo prueba
-        result = obtener_dependabots_solucionados_y_no_solucionados(
+        result = await obtener_dependabots_solucionados_y_no_solucionados(
             repo_owner="mi-org",
             repo_name="mi-repo",
             start_date="2024-01-01",
@@ -79,11 +95,11 @@ class TestDependabotService(unittest.TestCase):
         self.assertIn("paquete", result["no_solucionadas"][0])
 
     @patch("app.dependabots.dependabots_service.get_dependabot_alerts")
-    def test_dependabots_sin_alertas(self, mock_get_alerts):
+    async def test_dependabots_sin_alertas(self, mock_get_alerts):
         """Debe manejar correctamente el caso sin alertas."""
         mock_get_alerts.side_effect = [[], [], []]  # No hay alertas
 
-        result = obtener_dependabots_solucionados_y_no_solucionados(
+        result = await obtener_dependabots_solucionados_y_no_solucionados(
             "mi-org", "mi-repo"
         )
 
@@ -92,3 +108,123 @@ class TestDependabotService(unittest.TestCase):
         self.assertEqual(result["total_no_solucionadas"], 0)
         self.assertEqual(result["solucionadas"], [])
         self.assertEqual(result["no_solucionadas"], [])
+
+
+class TestEstadosFallidos(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de los fallos parciales al consultar los estados."""
+
+    @patch("app.dependabots.dependabots_service.encolar_documento")
+    @patch("app.dependabots.dependabots_service.get_dependabot_alerts")
+    async def test_un_estado_fallido_no_pierde_los_demas(
+        self, mock_get_alerts, _mock_encolar
+    ):
+        """Si falla un estado se devuelven los demás y se indica cuál."""
+        async def alertas(_owner, _repo, state, **_kwargs):
+            if state == "dismissed":
+                raise GithubAPIException("Error de GitHub")
+            return [alerta_org("mi-repo", state, "high", f"paquete-{state}")]
+
+        mock_get_alerts.side_effect = alertas
+
+        result = await obtener_dependabots_solucionados_y_no_solucionados(
+            "mi-org", "mi-repo"
+        )
+
+        self.assertEqual(result["estados_fallidos"], ["dismissed"])
+        self.assertEqual(result["total_alertas"], 2)
+        self.assertEqual(
+            [alerta["paquete"] for alerta in result["no_solucionadas"]],
+            ["paquete-open"]
+        )
+        self.assertEqual(
+            [alerta["paquete"] for alerta in result["solucionadas"]],
+            ["paquete-fixed"]
+        )
+
+    @patch("app.dependabots.dependabots_service.encolar_documento")
+    @patch("app.dependabots.dependabots_service.get_dependabot_alerts")
+    async def test_sin_presupuesto_no_es_un_fallo_parcial(
+        self, mock_get_alerts, mock_encolar
+    ):
+        """Un límite de uso agotado se propaga aunque fallen otros no."""
+        async def alertas(_owner, _repo, state, **_kwargs):
+            if state == "fixed":
+                raise GithubLimiteUsoException("Sin presupuesto", 1234)
+            return []
+
+        mock_get_alerts.side_effect = alertas
+
+        with self.assertRaises(GithubLimiteUsoException):
+            await obtener_dependabots_solucionados_y_no_solucionados(
+                "mi-org", "mi-repo"
+            )
+        mock_encolar.assert_not_called()
+
+    @patch("app.dependabots.dependabots_service.encolar_documento")
+    @patch("app.dependabots.dependabots_service.get_dependabot_alerts")
+    async def test_sin_fallos_la_lista_queda_vacia(
+        self, mock_get_alerts, _mock_encolar
+    ):
+        """Sin errores ``estados_fallidos`` está vacío."""
+        mock_get_alerts.side_effect = [[], [], []]
+
+        result = await obtener_dependabots_solucionados_y_no_solucionados(
+            "mi-org", "mi-repo"
+        )
+
+        self.assertEqual(result["estados_fallidos"], [])
+
+    @patch("app.dependabots.dependabots_service.encolar_documento")
+    @patch("app.dependabots.dependabots_service.get_dependabot_alerts")
+    async def test_si_fallan_todos_se_propaga_el_error(
+        self, mock_get_alerts, mock_encolar
+    ):
+        """Si fallan todos los estados se lanza el error y no se indexa."""
+        mock_get_alerts.side_effect = GithubAPIException("Error de GitHub")
+
+        with self.assertRaises(GithubAPIException):
+            await obtener_dependabots_solucionados_y_no_solucionados(
+                "mi-org", "mi-repo"
+            )
+
+        mock_encolar.assert_not_called()
+
+class TestResumenDependabotsOrganizacion(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del resumen de alertas de una organización."""
+
+    @patch("app.dependabots.dependabots_service.encolar_documento")
+    @patch(
+        "app.dependabots.dependabots_service."
+        "iterar_dependabot_alerts_organizacion"
+    )
+    async def test_agrega_por_repositorio_severidad_paquete_y_estado(
+        self, mock_iterar, mock_encolar
+    ):
+        """El resumen cuenta cada alerta en todos sus agregados."""
+        alertas = [
+            alerta_org("repo1", "open", "high", "paquete1"),
+            alerta_org("repo1", "fixed", "low", "paquete2"),
+            alerta_org("repo2", "open", "high", "paquete1"),
+        ]
+
+        async def iterar(*_args, **_kwargs):
+            for alerta in alertas:
+                yield alerta
+
+        mock_iterar.side_effect = iterar
+
+        resumen = await obtener_resumen_dependabots_organizacion("mi-org")
+
+        self.assertEqual(resumen["total_alertas"], 3)
+        self.assertEqual(resumen["por_repositorio"], {"repo1": 2, "repo2": 1})
+        self.assertEqual(resumen["por_severidad"], {"high": 2, "low": 1})
+        self.assertEqual(
+            resumen["por_paquete"], {"paquete1": 2, "paquete2": 1}
+        )
+        self.assertEqual(resumen["por_estado"], {"open": 2, "fixed": 1})
+        self.assertNotIn("tipo", resumen)
+        # El resumen se indexa una sola vez, al final
+        mock_encolar.assert_called_once()
+        self.assertEqual(
+            mock_encolar.call_args.args[1]["total_alertas"], 3
+        )
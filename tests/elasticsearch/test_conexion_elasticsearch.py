@@ -0,0 +1,83 @@
+"""Pruebas unitarias de la conexión con Elasticsearch."""
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+from elasticsearch import AsyncElasticsearch
+from app.elasticsearch import conexion_elasticsearch
+
+
+class TestConexionElasticsearch(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del cliente perezoso y del modo degradado."""
+
+    def setUp(self):
+        self.cliente = MagicMock()
+        self.cliente.index = AsyncMock(return_value={"result": "created"})
+        parche = patch.object(conexion_elasticsearch, "es", self.cliente)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    async def asyncTearDown(self):
+        conexion_elasticsearch._disponible = None
+        conexion_elasticsearch._plantillas_instaladas = False
+
+    def test_crear_cliente_no_hace_peticiones(self):
+        """Crear el cliente no toca la red."""
+        cliente = conexion_elasticsearch.crear_cliente()
+        self.assertIsInstance(cliente, AsyncElasticsearch)
+
+    async def test_modo_degradado_no_llama_al_cluster(self):
+        """Sin clúster, indexar responde al momento con un error."""
+        self.cliente.ping = AsyncMock(return_value=False)
+
+        self.assertFalse(await conexion_elasticsearch.comprobar_salud())
+        respuesta = await conexion_elasticsearch.indexar_documento_elasticsearch(
+            "indice", {"campo": 1}
+        )
+
+        self.assertIn("error", respuesta)
+        self.cliente.index.assert_not_called()
+
+    async def test_recupera_el_cluster_tras_el_ping(self):
+        """Cuando el ping vuelve a responder se indexa de nuevo."""
+        self.cliente.ping = AsyncMock(side_effect=[False, True])
+        await conexion_elasticsearch.comprobar_salud()
+        await conexion_elasticsearch.comprobar_salud()
+
+        respuesta = await conexion_elasticsearch.indexar_documento_elasticsearch(
+            "indice", {"campo": 1}
+        )
+
+        self.assertEqual(respuesta["result"], "created")
+        self.cliente.index.assert_awaited_once()
+
+    async def test_instala_plantillas_una_vez(self):
+        """Las plantillas se instalan con el primer ping correcto."""
+        self.cliente.ping = AsyncMock(return_value=True)
+        self.cliente.indices.put_index_template = AsyncMock()
+
+        await conexion_elasticsearch.comprobar_salud()
+        llamadas = self.cliente.indices.put_index_template.await_count
+        await conexion_elasticsearch.comprobar_salud()
+
+        self.assertGreater(llamadas, 0)
+        self.assertEqual(
+            self.cliente.indices.put_index_template.await_count, llamadas
+        )
+
+    async def test_indexar_con_id_determinista(self):
+        """Los índices conocidos se indexan con un id por día."""
+        await conexion_elasticsearch.indexar_documento_elasticsearch(
+            "github_repositorios", {"usuario": "u", "repo": "r"}
+        )
+
+        id_doc = self.cliente.index.call_args.kwargs["id"]
+        self.assertTrue(id_doc.startswith("u:r:"))
+
+    async def test_ping_con_excepcion_cuenta_como_caido(self):
+        """Una excepción en el ping activa el modo degradado."""
+        self.cliente.ping = AsyncMock(side_effect=ConnectionError("caído"))
+        self.assertFalse(await conexion_elasticsearch.comprobar_salud())
+        self.assertFalse(conexion_elasticsearch.esta_disponible())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+"""Pruebas unitarias de las lecturas desde Elasticsearch."""
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.elasticsearch import conexion_elasticsearch, consultas_elasticsearch
+from app.elasticsearch.consultas_elasticsearch import (
+    leer_con_respaldo,
+    max_edad_lectura,
+    paginar_documentos
+)
+
+
+def hit(repo, status):
+    """Grupo colapsado con su documento más reciente."""
+    return {
+        "sort": [repo],
+        "inner_hits": {"ultimo": {"hits": {"hits": [
+            {"_source": {"repo": repo, "status": status}}
+        ]}}},
+    }
+
+
+class TestLeerConRespaldo(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de la lectura con respaldo en vivo."""
+
+    def setUp(self):
+        self.cliente = MagicMock()
+        parche = patch.object(conexion_elasticsearch, "es", self.cliente)
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.en_vivo = AsyncMock(return_value=[
+            {"repo": "b", "status": "activo", "usuario": "u"},
+            {"repo": "a", "status": "inactivo", "usuario": "u"},
+            {"repo": "c", "status": "activo", "usuario": "u"},
+        ])
+
+    async def asyncTearDown(self):
+        conexion_elasticsearch._disponible = None
+
+    async def leer(self, **kwargs):
+        """Lee el índice de repositorios con los filtros indicados."""
+        parametros = {"filtros": {"usuario": "u"}, "tamano": 2}
+        parametros.update(kwargs)
+        return await leer_con_respaldo(
+            "github_repositorios", "repo", parametros["filtros"],
+            self.en_vivo, parametros["tamano"], parametros.get("despues"),
+            agregaciones=("status",)
+        )
+
+    async def test_lee_del_indice(self):
+        """Con datos recientes se sirve desde Elasticsearch."""
+        self.cliente.search = AsyncMock(return_value={
+            "hits": {"hits": [hit("a", "activo"), hit("b", "inactivo")]},
+            "aggregations": {
+                "total": {"value": 3},
+                "status": {"buckets": [
+                    {"key": "activo", "grupos": {"value": 2}},
+                    {"key": "inactivo", "grupos": {"value": 1}},
+                ]},
+            },
+        })
+
+        resultado = await self.leer(despues="0")
+
+        self.assertEqual(resultado["fuente"], "elasticsearch")
+        self.assertEqual([d["repo"] for d in resultado["documentos"]],
+                         ["a", "b"])
+        self.assertEqual(resultado["siguiente"], "b")
+        self.assertEqual(resultado["agregaciones"],
+                         {"status": {"activo": 2, "inactivo": 1}})
+        argumentos = self.cliente.search.call_args.kwargs
+        self.assertEqual(argumentos["search_after"], ["0"])
+        self.assertEqual(argumentos["collapse"]["field"], "repo")
+        self.en_vivo.assert_not_called()
+
+    async def test_sin_datos_recientes_consulta_github(self):
+        """Un índice vacío hace que se calcule en vivo."""
+        self.cliente.search = AsyncMock(return_value={
+            "hits": {"hits": []},
+            "aggregations": {"total": {"value": 0},
+                             "status": {"buckets": []}},
+        })
+
+        resultado = await self.leer()
+
+        self.assertEqual(resultado["fuente"], "github")
+        self.assertEqual(resultado["total"], 3)
+        self.assertEqual([d["repo"] for d in resultado["documentos"]],
+                         ["a", "b"])
+        self.assertEqual(resultado["siguiente"], "b")
+
+    async def test_modo_degradado_no_llama_al_cluster(self):
+        """Sin clúster se va directamente a GitHub, aplicando los filtros."""
+        self.cliente.search = AsyncMock()
+        conexion_elasticsearch._disponible = False
+
+        resultado = await self.leer(
+            filtros={"usuario": "u", "status": "activo"}
+        )
+
+        self.cliente.search.assert_not_called()
+        self.assertEqual([d["repo"] for d in resultado["documentos"]],
+                         ["b", "c"])
+        self.assertIsNone(resultado["siguiente"])
+
+
+    async def test_rango_de_fechas(self):
+        """Solo se leen los documentos del rango pedido o sin rango."""
+        self.cliente.search = AsyncMock(return_value={
+            "hits": {"hits": []}, "aggregations": {"total": {"value": 0}},
+        })
+        self.en_vivo.return_value = [
+            {"repo": "a", "rango_fechas": {"desde": None, "hasta": None}},
+            {"repo": "b", "rango_fechas": {"desde": "2025-01-01",
+                                           "hasta": None}},
+        ]
+
+        resultado = await leer_con_respaldo(
+            "github_dependabot_alerts", "repo",
+            {"rango_fechas.desde": None, "rango_fechas.hasta": None},
+            self.en_vivo, 10, max_edad=4500,
+            ausentes=["rango_fechas.desde", "rango_fechas.hasta"]
+        )
+
+        consulta = self.cliente.search.call_args.kwargs["query"]["bool"]
+        self.assertEqual(consulta["must_not"], [
+            {"exists": {"field": "rango_fechas.desde"}},
+            {"exists": {"field": "rango_fechas.hasta"}},
+        ])
+        self.assertIn({"range": {"timestamp": {"gte": "now-4500s"}}},
+                      consulta["filter"])
+        self.assertEqual([d["repo"] for d in resultado["documentos"]],
+                         ["a"])
+
+
+class TestMaxEdadLectura(unittest.TestCase):
+    """Pruebas de la antigüedad máxima de las lecturas."""
+
+    def test_intervalo_mas_margen(self):
+        """Sin configurarla, supera el intervalo del programador."""
+        with patch.object(consultas_elasticsearch,
+                          "ELASTIC_LECTURA_MAX_EDAD", None), \
+                patch.object(consultas_elasticsearch,
+                             "ELASTIC_LECTURA_MARGEN", 900):
+            self.assertEqual(max_edad_lectura(3600), 4500)
+
+    def test_configurada(self):
+        """Un valor explícito tiene prioridad."""
+        with patch.object(consultas_elasticsearch,
+                          "ELASTIC_LECTURA_MAX_EDAD", 60):
+            self.assertEqual(max_edad_lectura(3600), 60)
+
+
+class TestPaginarDocumentos(unittest.TestCase):
+    """Pruebas de la paginación en memoria."""
+
+    def test_search_after_en_memoria(self):
+        """La segunda página empieza después del valor indicado."""
+        documentos = [{"repo": r, "status": "activo"} for r in "dcba"]
+
+        pagina = paginar_documentos(documentos, "repo", 3, despues="a")
+
+        self.assertEqual([d["repo"] for d in pagina["documentos"]],
+                         ["b", "c", "d"])
+        self.assertIsNone(pagina["siguiente"])
+
+
+if __name__ == "__main__":
+    unittest.main()
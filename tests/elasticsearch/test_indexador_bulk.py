@@ -0,0 +1,177 @@
+"""Pruebas unitarias del indexador en lote de Elasticsearch."""
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+from app.elasticsearch.indexador_bulk import IndexadorBulk
+from app.elasticsearch.spool_elasticsearch import SpoolDisco
+
+
+def cliente_bulk(errores=()):
+    """Cliente simulado cuya API bulk falla en las posiciones indicadas."""
+    cliente = MagicMock()
+
+    async def bulk(operations):
+        items = []
+        for posicion in range(len(operations) // 2):
+            if posicion in errores:
+                items.append({"index": {"error": {"type": "mapper_error"}}})
+            else:
+                items.append({"index": {"result": "created"}})
+        return {"errors": bool(errores), "items": items}
+
+    cliente.bulk = AsyncMock(side_effect=bulk)
+    return cliente
+
+
+class TestIndexadorBulk(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del indexador en lote."""
+
+    async def test_envia_al_alcanzar_max_documentos(self):
+        """Se envía un lote por cada max_documentos encolados."""
+        cliente = cliente_bulk()
+        indexador = IndexadorBulk(
+            cliente=lambda: cliente, max_documentos=2, intervalo=60
+        )
+        indexador.iniciar()
+
+        for i in range(4):
+            await indexador.encolar("indice", {"n": i})
+        await indexador.detener()
+
+        self.assertEqual(cliente.bulk.call_count, 2)
+        self.assertEqual(indexador.indexados, 4)
+
+    async def test_envia_al_vencer_el_intervalo(self):
+        """Un lote incompleto se envía al pasar el intervalo."""
+        cliente = cliente_bulk()
+        indexador = IndexadorBulk(
+            cliente=lambda: cliente, max_documentos=100, intervalo=0.01
+        )
+        indexador.iniciar()
+
+        await indexador.encolar("indice", {"n": 1})
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(cliente.bulk.call_count, 1)
+        await indexador.detener()
+
+    async def test_envia_al_superar_max_bytes(self):
+        """Un documento grande dispara el envío por tamaño."""
+        cliente = cliente_bulk()
+        indexador = IndexadorBulk(
+            cliente=lambda: cliente, max_bytes=10, intervalo=60
+        )
+        indexador.iniciar()
+
+        await indexador.encolar("indice", {"texto": "x" * 50})
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(cliente.bulk.call_count, 1)
+        await indexador.detener()
+
+    async def test_reindexar_el_mismo_dia_usa_el_mismo_id(self):
+        """Los documentos repetidos se sobrescriben con el mismo _id."""
+        cliente = cliente_bulk()
+        indexador = IndexadorBulk(
+            cliente=lambda: cliente, max_documentos=2, intervalo=60
+        )
+        indexador.iniciar()
+
+        for _ in range(2):
+            await indexador.encolar(
+                "github_repositorios", {"usuario": "u", "repo": "r"}
+            )
+        await indexador.detener()
+
+        operaciones = cliente.bulk.call_args.kwargs["operations"]
+        self.assertEqual(
+            operaciones[0]["index"]["_id"], operaciones[2]["index"]["_id"]
+        )
+
+    async def test_registra_errores_por_documento(self):
+        """Los errores de cada documento se cuentan por separado."""
+        cliente = cliente_bulk(errores={1})
+        indexador = IndexadorBulk(cliente=lambda: cliente, intervalo=60)
+        indexador.iniciar()
+
+        for i in range(3):
+            await indexador.encolar("indice", {"n": i})
+        await indexador.detener()
+
+        estadisticas = indexador.estadisticas()
+        self.assertEqual(estadisticas["indexados"], 2)
+        self.assertEqual(estadisticas["errores"], 1)
+        self.assertEqual(
+            estadisticas["errores_recientes"][0]["index"], "indice"
+        )
+
+    async def test_contrapresion_con_cola_llena(self):
+        """Con la cola llena, encolar espera a que haya hueco."""
+        indexador = IndexadorBulk(cliente=cliente_bulk, max_cola=1)
+        await indexador.encolar("indice", {"n": 1})
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                indexador.encolar("indice", {"n": 2}), 0.05
+            )
+
+    async def test_sin_elasticsearch_guarda_en_spool(self):
+        """Con el clúster caído los lotes van al spool y no se pierden."""
+        cliente = cliente_bulk()
+        with tempfile.TemporaryDirectory() as directorio:
+            spool = SpoolDisco(directorio)
+            indexador = IndexadorBulk(
+                cliente=lambda: cliente, max_documentos=2, intervalo=60,
+                spool=spool
+            )
+            with patch(
+                "app.elasticsearch.conexion_elasticsearch.esta_disponible",
+                return_value=False
+            ):
+                indexador.iniciar()
+                for i in range(3):
+                    await indexador.encolar("indice", {"n": i})
+                await indexador.detener()
+
+            cliente.bulk.assert_not_called()
+            self.assertEqual(spool.pendientes, 3)
+            self.assertEqual(indexador.en_spool, 3)
+            self.assertEqual(indexador.errores, 0)
+
+    async def test_reenvia_el_spool_en_orden_al_recuperarse(self):
+        """Tras un fallo del envío, los lotes se reenvían en su orden."""
+        cliente = cliente_bulk()
+        enviar = cliente.bulk.side_effect
+        llamadas = []
+
+        async def bulk(operations):
+            llamadas.append([doc["n"] for doc in operations[1::2]])
+            if len(llamadas) == 1:
+                raise ConnectionError("clúster caído")
+            return await enviar(operations)
+
+        cliente.bulk = AsyncMock(side_effect=bulk)
+        with tempfile.TemporaryDirectory() as directorio:
+            spool = SpoolDisco(directorio)
+            indexador = IndexadorBulk(
+                cliente=lambda: cliente, max_documentos=2, intervalo=60,
+                spool=spool
+            )
+            with patch(
+                "app.elasticsearch.conexion_elasticsearch.esta_disponible",
+                return_value=True
+            ):
+                indexador.iniciar()
+                for i in range(4):
+                    await indexador.encolar("indice", {"n": i})
+                await indexador.detener()
+
+            self.assertEqual(llamadas, [[0, 1], [0, 1], [2, 3]])
+            self.assertEqual(indexador.reenviados, 4)
+            self.assertEqual(indexador.indexados, 4)
+            self.assertEqual(spool.pendientes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Pruebas unitarias de los índices por periodo y la retención."""
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.elasticsearch import indices_elasticsearch
+from app.elasticsearch.indices_elasticsearch import (
+    aplicar_retencion,
+    detectar_heredados,
+    indice_escritura,
+    indices_caducados
+)
+
+DOCUMENTO = {"timestamp": "2025-04-07T10:00:00+00:00"}
+
+
+class TestIndiceEscritura(unittest.TestCase):
+    """Pruebas del índice concreto de cada documento."""
+
+    def test_mensual_y_diario(self):
+        """El sufijo depende del periodo configurado."""
+        self.assertEqual(
+            indice_escritura("github_repositorios", DOCUMENTO, "mensual"),
+            "github_repositorios-2025.04"
+        )
+        self.assertEqual(
+            indice_escritura("github_repositorios", DOCUMENTO, "diario"),
+            "github_repositorios-2025.04.07"
+        )
+
+    def test_indices_desconocidos_y_heredados(self):
+        """Los índices sin plantilla o heredados se usan tal cual."""
+        self.assertEqual(indice_escritura("otro", DOCUMENTO), "otro")
+        with patch.object(
+            indices_elasticsearch, "_heredados", {"github_repositorios"}
+        ):
+            self.assertEqual(
+                indice_escritura("github_repositorios", DOCUMENTO),
+                "github_repositorios"
+            )
+
+
+class TestRetencion(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de la retención por índices enteros."""
+
+    def test_indices_caducados(self):
+        """Caduca el periodo que terminó antes del límite de retención."""
+        indices = [
+            "github_repositorios-2025.01",
+            "github_repositorios-2025.02",
+            "github_repositorios-2025.03.01",
+            "github_repositorios-2025.03.31",
+            "github_repositorios",
+            "github_repositorios-otro",
+        ]
+
+        caducados = indices_caducados(
+            "github_repositorios", indices, datetime(2025, 4, 1), 30
+        )
+
+        self.assertEqual(caducados, [
+            "github_repositorios-2025.01",
+            "github_repositorios-2025.02",
+            "github_repositorios-2025.03.01",
+        ])
+
+    def test_retencion_cero_no_borra(self):
+        """Con retención 0 se conserva todo."""
+        self.assertEqual(indices_caducados(
+            "github_repositorios", ["github_repositorios-2000.01"],
+            datetime(2025, 4, 1), 0
+        ), [])
+
+    async def test_aplicar_retencion_borra_de_una_vez(self):
+        """Los índices caducados de cada alias se borran en una llamada."""
+        cliente = MagicMock()
+
+        async def obtener(index, **_kwargs):
+            alias = index[:-2]
+            return {f"{alias}-2024.01": {}, f"{alias}-2025.04": {}}
+
+        cliente.indices.get = AsyncMock(side_effect=obtener)
+        cliente.indices.delete = AsyncMock()
+
+        with patch.object(indices_elasticsearch, "ELASTIC_RETENCION_DIAS", 90):
+            borrados = await aplicar_retencion(cliente, datetime(2025, 4, 10))
+
+        self.assertIn("github_repositorios-2024.01", borrados)
+        self.assertNotIn("github_repositorios-2025.04", borrados)
+        cliente.indices.delete.assert_any_await(
+            index="github_repositorios-2024.01"
+        )
+
+    async def test_detectar_heredados(self):
+        """Un índice concreto con el nombre del alias se marca heredado."""
+        cliente = MagicMock()
+        cliente.indices.exists = AsyncMock(
+            side_effect=lambda index: index == "github_repositorios"
+        )
+        cliente.indices.exists_alias = AsyncMock(return_value=False)
+
+        with patch.object(indices_elasticsearch, "_heredados", set()):
+            await detectar_heredados(cliente)
+            self.assertEqual(
+                indices_elasticsearch._heredados, {"github_repositorios"}
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
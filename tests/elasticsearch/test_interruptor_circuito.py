@@ -0,0 +1,80 @@
+"""Pruebas unitarias del interruptor de circuito."""
+import unittest
+from app.elasticsearch.interruptor_circuito import (
+    ABIERTO,
+    CERRADO,
+    SEMIABIERTO,
+    InterruptorCircuito
+)
+
+
+class Reloj:
+    """Reloj manual para avanzar el tiempo en las pruebas."""
+
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+class TestInterruptorCircuito(unittest.TestCase):
+    """Pruebas de las transiciones del interruptor."""
+
+    def setUp(self):
+        self.reloj = Reloj()
+        self.interruptor = InterruptorCircuito(
+            umbral_fallos=3, tiempo_apertura=10, reloj=self.reloj
+        )
+
+    def test_se_abre_al_alcanzar_el_umbral(self):
+        """Tras umbral_fallos fallos seguidos deja de permitir llamadas."""
+        for _ in range(2):
+            self.interruptor.registrar_fallo()
+        self.assertEqual(self.interruptor.estado, CERRADO)
+
+        self.interruptor.registrar_fallo()
+
+        self.assertEqual(self.interruptor.estado, ABIERTO)
+        self.assertFalse(self.interruptor.permite())
+        self.assertEqual(self.interruptor.aperturas, 1)
+
+    def test_un_exito_reinicia_la_cuenta(self):
+        """Los fallos tienen que ser seguidos para abrirlo."""
+        for _ in range(2):
+            self.interruptor.registrar_fallo()
+        self.interruptor.registrar_exito()
+        for _ in range(2):
+            self.interruptor.registrar_fallo()
+
+        self.assertEqual(self.interruptor.estado, CERRADO)
+
+    def test_semiabierto_se_cierra_con_un_exito(self):
+        """Pasado el tiempo de apertura se prueba y un éxito lo cierra."""
+        for _ in range(3):
+            self.interruptor.registrar_fallo()
+        self.reloj.ahora = 10
+
+        self.assertEqual(self.interruptor.estado, SEMIABIERTO)
+        self.assertTrue(self.interruptor.permite())
+
+        self.interruptor.registrar_exito()
+        self.assertEqual(self.interruptor.estado, CERRADO)
+
+    def test_semiabierto_se_reabre_con_un_fallo(self):
+        """Un fallo en semiabierto vuelve a abrirlo de inmediato."""
+        for _ in range(3):
+            self.interruptor.registrar_fallo()
+        self.reloj.ahora = 10
+
+        self.interruptor.registrar_fallo()
+
+        self.assertEqual(self.interruptor.estado, ABIERTO)
+        self.assertEqual(self.interruptor.aperturas, 2)
+        self.assertEqual(
+            self.interruptor.estadisticas()["estado"], ABIERTO
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Pruebas unitarias de las plantillas de índice y los ids deterministas."""
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from app.elasticsearch.plantillas_elasticsearch import (
+    MAPEOS,
+    id_documento,
+    instalar_plantillas,
+    plantilla
+)
+
+
+class TestIdDocumento(unittest.TestCase):
+    """Pruebas de los ids deterministas."""
+
+    def documento(self, timestamp, repo="repo1", modo="completo"):
+        """Documento de github_repositorios."""
+        return {"usuario": "u", "repo": repo, "status": "activo",
+                "modo": modo, "timestamp": timestamp}
+
+    def test_mismo_dia_mismo_id(self):
+        """Reindexar el mismo día produce el mismo id."""
+        manana = id_documento(
+            "github_repositorios", self.documento("2025-04-01T08:00:00+00:00")
+        )
+        tarde = id_documento(
+            "github_repositorios", self.documento("2025-04-01T20:00:00+00:00")
+        )
+
+        self.assertEqual(manana, tarde)
+        self.assertEqual(manana, "u:repo1:completo:2025-04-01")
+
+    def test_otro_dia_u_otro_repo_cambia_el_id(self):
+        """El día y los campos clave forman parte del id."""
+        base = id_documento(
+            "github_repositorios", self.documento("2025-04-01T08:00:00")
+        )
+        self.assertNotEqual(base, id_documento(
+            "github_repositorios", self.documento("2025-04-02T08:00:00")
+        ))
+        self.assertNotEqual(base, id_documento(
+            "github_repositorios",
+            self.documento("2025-04-01T08:00:00", repo="repo2")
+        ))
+
+    def test_modo_rapido_no_pisa_el_completo(self):
+        """Una clasificación rápida del mismo día tiene otro id."""
+        self.assertNotEqual(
+            id_documento(
+                "github_repositorios", self.documento("2025-04-01T08:00:00")
+            ),
+            id_documento(
+                "github_repositorios",
+                self.documento("2025-04-01T09:00:00", modo="rapido")
+            )
+        )
+
+    def test_campos_anidados(self):
+        """Las rutas con puntos se resuelven y los nulos quedan vacíos."""
+        documento = {"repo_owner": "o", "repo": "r",
+                     "rango_fechas": {"desde": "2025-01-01", "hasta": None},
+                     "timestamp": "2025-04-01T00:00:00"}
+
+        self.assertEqual(
+            id_documento("github_dependabot_alerts", documento),
+            "o:r:2025-01-01::2025-04-01"
+        )
+
+    def test_indice_desconocido(self):
+        """Los índices sin clave usan ids generados por Elasticsearch."""
+        self.assertIsNone(id_documento("otro", {"timestamp": "2025-04-01"}))
+
+
+class TestPlantillas(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de las plantillas de índice."""
+
+    def test_plantilla_con_mapeo_explicito(self):
+        """La plantilla fija mapeos, shards y refresco."""
+        definicion = plantilla("github_repositorios")
+
+        self.assertEqual(
+            definicion["index_patterns"], ["github_repositorios-*"]
+        )
+        self.assertIn("github_repositorios", definicion["template"]["aliases"])
+        mappings = definicion["template"]["mappings"]
+        self.assertFalse(mappings["dynamic"])
+        self.assertEqual(mappings["properties"]["repo"], {"type": "keyword"})
+        self.assertIn("refresh_interval", definicion["template"]["settings"])
+
+    async def test_instalar_todas(self):
+        """Se instala una plantilla por índice."""
+        cliente = MagicMock()
+        cliente.indices.put_index_template = AsyncMock()
+
+        self.assertEqual(await instalar_plantillas(cliente), len(MAPEOS))
+        self.assertEqual(
+            cliente.indices.put_index_template.await_count, len(MAPEOS)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
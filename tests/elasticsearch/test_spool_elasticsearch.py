@@ -0,0 +1,94 @@
+"""Pruebas unitarias del spool en disco de Elasticsearch."""
+import os
+import tempfile
+import unittest
+from app.elasticsearch.spool_elasticsearch import SpoolDisco
+
+
+def lote(*numeros):
+    """Lote de documentos de prueba."""
+    return [("indice", {"n": n}) for n in numeros]
+
+
+class TestSpoolDisco(unittest.TestCase):
+    """Pruebas del spool por segmentos."""
+
+    def setUp(self):
+        self._directorio = tempfile.TemporaryDirectory()
+        self.directorio = self._directorio.name
+
+    def tearDown(self):
+        self._directorio.cleanup()
+
+    def test_escribe_y_lee_en_orden(self):
+        """Los documentos se leen en el orden en que se escribieron."""
+        spool = SpoolDisco(self.directorio)
+        spool.escribir(lote(1, 2))
+        spool.escribir(lote(3))
+
+        segmentos = spool.segmentos()
+
+        self.assertEqual(len(segmentos), 1)
+        self.assertEqual(spool.leer(segmentos[0]), lote(1, 2, 3))
+        self.assertEqual(spool.pendientes, 3)
+
+    def test_rota_segmentos_por_tamano(self):
+        """Al superar el tamaño de segmento se empieza uno nuevo."""
+        spool = SpoolDisco(self.directorio, max_bytes_segmento=1)
+        spool.escribir(lote(1))
+        spool.escribir(lote(2))
+
+        segmentos = spool.segmentos()
+
+        self.assertEqual(len(segmentos), 2)
+        self.assertEqual(spool.leer(segmentos[1]), lote(2))
+
+    def test_recupera_lo_pendiente_al_reabrir(self):
+        """Lo que quedó en disco sigue pendiente tras reiniciar."""
+        spool = SpoolDisco(self.directorio)
+        spool.escribir(lote(1, 2))
+        spool.cerrar()
+
+        reabierto = SpoolDisco(self.directorio)
+        reabierto.escribir(lote(3))
+        segmentos = reabierto.segmentos()
+
+        self.assertEqual(reabierto.pendientes, 3)
+        self.assertEqual(len(segmentos), 2)
+        self.assertEqual(reabierto.leer(segmentos[0]), lote(1, 2))
+
+    def test_ignora_lineas_danadas(self):
+        """Una última línea cortada por una caída no impide leer el resto."""
+        spool = SpoolDisco(self.directorio)
+        spool.escribir(lote(1))
+        ruta = spool.segmentos()[0]
+        with open(ruta, "ab") as fichero:
+            fichero.write(b'{"index": "ind')
+
+        self.assertEqual(spool.leer(ruta), lote(1))
+
+    def test_confirmar_borra_el_segmento(self):
+        """Un segmento confirmado desaparece y descuenta sus documentos."""
+        spool = SpoolDisco(self.directorio)
+        spool.escribir(lote(1, 2))
+        ruta = spool.segmentos()[0]
+
+        spool.confirmar(ruta)
+
+        self.assertFalse(os.path.exists(ruta))
+        self.assertEqual(spool.pendientes, 0)
+        self.assertEqual(spool.bytes, 0)
+
+    def test_descarta_al_superar_el_tope(self):
+        """Con el spool lleno el lote se descarta y se contabiliza."""
+        spool = SpoolDisco(self.directorio, max_bytes=10)
+
+        guardados = spool.escribir(lote(1, 2))
+
+        self.assertEqual(guardados, 0)
+        self.assertEqual(spool.estadisticas()["descartados"], 2)
+        self.assertEqual(spool.pendientes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
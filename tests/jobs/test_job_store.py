@@ -0,0 +1,95 @@
+"""Pruebas unitarias de los almacenes de trabajos."""
+import os
+import tempfile
+import unittest
+from app.jobs.job_store import (
+    COMPLETADO,
+    EN_CURSO,
+    ERROR,
+    AlmacenTrabajosMemoria,
+    AlmacenTrabajosSQLite
+)
+
+
+def trabajo(id_trabajo, clave="c", estado=EN_CURSO, expira_en=None,
+            propietario="muerto"):
+    """Trabajo mínimo para las pruebas."""
+    return {"id": id_trabajo, "clave": clave, "estado": estado,
+            "expira_en": expira_en, "resultado": None,
+            "propietario": propietario}
+
+
+class PruebasAlmacen:
+    """Pruebas comunes a todos los almacenes."""
+
+    def crear(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.almacen = self.crear()
+
+    def test_guardar_y_obtener(self):
+        """Un trabajo guardado se recupera por su id."""
+        self.almacen.guardar(trabajo("1"))
+        self.assertEqual(self.almacen.obtener("1")["estado"], EN_CURSO)
+        self.assertIsNone(self.almacen.obtener("2"))
+
+    def test_buscar_activo_ignora_terminados(self):
+        """Solo los trabajos pendientes o en curso cuentan como duplicados."""
+        self.almacen.guardar(trabajo("1", estado=COMPLETADO, expira_en=10))
+        self.assertIsNone(self.almacen.buscar_activo("c"))
+        self.almacen.guardar(trabajo("2"))
+        self.assertEqual(self.almacen.buscar_activo("c")["id"], "2")
+
+    def test_purgar_caducados(self):
+        """Se eliminan los trabajos cuyo resultado ha caducado."""
+        self.almacen.guardar(trabajo("1", estado=COMPLETADO, expira_en=10))
+        self.almacen.guardar(trabajo("2", estado=COMPLETADO, expira_en=20))
+        self.almacen.guardar(trabajo("3"))
+
+        self.assertEqual(self.almacen.purgar(15), 1)
+        self.assertIsNone(self.almacen.obtener("1"))
+        self.assertIsNotNone(self.almacen.obtener("2"))
+        self.assertIsNotNone(self.almacen.obtener("3"))
+
+
+class TestAlmacenMemoria(PruebasAlmacen, unittest.TestCase):
+    """Almacén en memoria."""
+
+    def crear(self):
+        return AlmacenTrabajosMemoria()
+
+
+class TestAlmacenSQLite(PruebasAlmacen, unittest.TestCase):
+    """Almacén en SQLite."""
+
+    def crear(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, "jobs.sqlite3")
+        return AlmacenTrabajosSQLite(self.ruta)
+
+    def tearDown(self):
+        self.almacen.cerrar()
+        self.directorio.cleanup()
+
+    def test_sobrevive_a_reinicio(self):
+        """
+        Los trabajos persisten y solo se interrumpen los activos cuyo
+        proceso ya no existe.
+        """
+        self.almacen.guardar(trabajo("1"))
+        self.almacen.guardar(trabajo("2", estado=COMPLETADO, expira_en=10))
+        self.almacen.guardar(trabajo("3", propietario="vivo"))
+        self.almacen.cerrar()
+
+        self.almacen = AlmacenTrabajosSQLite(self.ruta)
+        self.assertEqual(
+            self.almacen.interrumpir_huerfanos(lambda p: p == "vivo"), 1
+        )
+        self.assertEqual(self.almacen.obtener("1")["estado"], ERROR)
+        self.assertEqual(self.almacen.obtener("2")["estado"], COMPLETADO)
+        self.assertEqual(self.almacen.obtener("3")["estado"], EN_CURSO)
+
+
+if __name__ == "__main__":
+    unittest.main()
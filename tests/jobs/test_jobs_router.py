@@ -0,0 +1,73 @@
+"""Estos son los tests del router de jobs"""
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from app.jobs.job_store import AlmacenTrabajosMemoria, COMPLETADO
+from app.jobs.jobs_service import GestorTrabajos
+from main import app
+
+client = TestClient(app)
+
+
+def gestor_con(trabajo=None):
+    """Gestor sin workers con un trabajo ya guardado."""
+    gestor = GestorTrabajos(almacen=AlmacenTrabajosMemoria())
+    if trabajo is not None:
+        gestor.almacen.guardar(trabajo)
+    return gestor
+
+
+def test_crear_trabajo():
+    """POST /v1/jobs encola el trabajo y responde 202."""
+    gestor = gestor_con()
+    with patch("app.jobs.jobs_router.obtener_gestor", return_value=gestor):
+        response = client.post(
+            "/v1/jobs",
+            json={"tipo": "repositorios", "parametros": {"usuario": "u"}}
+        )
+
+    assert response.status_code == 202
+    assert response.json()["estado"] == "pendiente"
+
+
+def test_crear_trabajo_parametros_invalidos():
+    """Parámetros que no acepta el servicio devuelven 422."""
+    gestor = gestor_con()
+    with patch("app.jobs.jobs_router.obtener_gestor", return_value=gestor):
+        response = client.post(
+            "/v1/jobs",
+            json={"tipo": "repositorios", "parametros": {"otro": 1}}
+        )
+
+    assert response.status_code == 422
+
+
+def test_crear_trabajo_valores_no_permitidos():
+    """Concurrencia excesiva, fuentes desconocidas o progreso: 422."""
+    gestor = gestor_con()
+    with patch("app.jobs.jobs_router.obtener_gestor", return_value=gestor):
+        for parametros in (
+            {"usuario": "u", "concurrencia": 100000},
+            {"usuario": "u", "fuente": "ftp"},
+            {"usuario": "u", "modo": "otro"},
+            {"usuario": "u", "progreso": 1},
+        ):
+            response = client.post(
+                "/v1/jobs",
+                json={"tipo": "repositorios", "parametros": parametros}
+            )
+            assert response.status_code == 422, parametros
+
+
+def test_resultado_trabajo():
+    """El resultado solo se sirve cuando el trabajo ha terminado."""
+    trabajo = {"id": "1", "clave": "c", "estado": "en_curso",
+               "expira_en": None, "resultado": None, "error": None}
+    gestor = gestor_con(trabajo)
+    with patch("app.jobs.jobs_router.obtener_gestor", return_value=gestor):
+        assert client.get("/v1/jobs/1/resultado").status_code == 409
+        gestor.almacen.guardar(
+            {**trabajo, "estado": COMPLETADO, "resultado": {"total": 0}}
+        )
+        response = client.get("/v1/jobs/1/resultado")
+        assert response.json() == {"total": 0}
+        assert client.get("/v1/jobs/2").status_code == 404
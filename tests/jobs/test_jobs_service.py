@@ -0,0 +1,235 @@
+"""Pruebas unitarias del gestor de trabajos en segundo plano."""
+import asyncio
+import os
+import socket
+import tempfile
+import unittest
+from typing import Optional
+from unittest.mock import patch
+from pydantic import BaseModel, ConfigDict
+from app.jobs.job_store import (
+    COMPLETADO,
+    EN_CURSO,
+    ERROR,
+    PENDIENTE,
+    AlmacenTrabajosMemoria,
+    AlmacenTrabajosSQLite
+)
+from app.jobs.jobs_service import (
+    GestorTrabajos,
+    TrabajoNoEncontrado,
+    proceso_vivo
+)
+
+
+class ParametrosPrueba(BaseModel):
+    """Parámetros del tipo 'prueba'."""
+    model_config = ConfigDict(extra="forbid")
+
+    usuario: str
+    concurrencia: Optional[int] = None
+
+
+def tipo_prueba(ejecutor):
+    """Registro de tipos con un único tipo 'prueba'."""
+    return {"prueba": (ejecutor, ParametrosPrueba)}
+
+
+class AlmacenContador(AlmacenTrabajosMemoria):
+    """Almacén en memoria que cuenta los guardados."""
+
+    def __init__(self):
+        super().__init__()
+        self.guardados = 0
+
+    def guardar(self, trabajo):
+        self.guardados += 1
+        super().guardar(trabajo)
+
+
+class Reloj:
+    """Reloj manual para controlar ETA y caducidad."""
+
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+class TestGestorTrabajos(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del gestor de trabajos."""
+
+    async def asyncSetUp(self):
+        self.liberar = asyncio.Event()
+        self.reloj = Reloj()
+
+        async def ejecutor(parametros, progreso):
+            progreso(1, 4)
+            await self.liberar.wait()
+            if parametros["usuario"] == "falla":
+                raise RuntimeError("boom")
+            progreso(4, 4)
+            return {"usuario": parametros["usuario"]}
+
+        self.gestor = GestorTrabajos(
+            almacen=AlmacenContador(), workers=1, ttl=60,
+            tipos=tipo_prueba(ejecutor), reloj=self.reloj,
+            propietario="maquina:1", intervalo_progreso=5
+        )
+        await self.gestor.iniciar()
+
+    async def asyncTearDown(self):
+        await self.gestor.detener()
+
+    async def esperar_estado(self, id_trabajo, estado):
+        """Cede el bucle hasta que el trabajo llega al estado indicado."""
+        for _ in range(100):
+            trabajo = await self.gestor.consultar(id_trabajo)
+            if trabajo["estado"] == estado:
+                return
+            await asyncio.sleep(0)
+        self.fail(f"El trabajo no llegó a {estado}")
+
+    async def test_completa_y_devuelve_resultado(self):
+        """El trabajo pasa por en curso y guarda su resultado."""
+        trabajo = await self.gestor.enviar("prueba", {"usuario": "u"})
+        self.assertEqual(trabajo["estado"], PENDIENTE)
+
+        await self.esperar_estado(trabajo["id"], EN_CURSO)
+        self.reloj.ahora += 10
+        estado = await self.gestor.consultar(trabajo["id"])
+        self.assertEqual((estado["hechos"], estado["total"]), (1, 4))
+        self.assertEqual(estado["eta_segundos"], 30.0)
+        self.assertNotIn("resultado", estado)
+
+        self.liberar.set()
+        await self.esperar_estado(trabajo["id"], COMPLETADO)
+        self.assertEqual(
+            (await self.gestor.resultado(trabajo["id"]))["resultado"],
+            {"usuario": "u"}
+        )
+
+    async def test_trabajos_identicos_se_deduplican(self):
+        """Un trabajo igual a uno activo devuelve el mismo id."""
+        primero = await self.gestor.enviar("prueba", {"usuario": "u"})
+        segundo = await self.gestor.enviar("prueba", {"usuario": "u"})
+        otro = await self.gestor.enviar("prueba", {"usuario": "v"})
+
+        self.assertEqual(primero["id"], segundo["id"])
+        self.assertNotEqual(primero["id"], otro["id"])
+
+    async def test_parametros_equivalentes_se_deduplican(self):
+        """Los valores por defecto explícitos no crean otro trabajo."""
+        primero = await self.gestor.enviar("prueba", {"usuario": "u"})
+        segundo = await self.gestor.enviar(
+            "prueba", {"usuario": "u", "concurrencia": None}
+        )
+
+        self.assertEqual(primero["id"], segundo["id"])
+        self.assertEqual(primero["propietario"], "maquina:1")
+
+    async def test_parametros_invalidos(self):
+        """Tipos o parámetros desconocidos lanzan ValueError."""
+        with self.assertRaises(ValueError):
+            await self.gestor.enviar("otro", {})
+        with self.assertRaises(ValueError):
+            await self.gestor.enviar("prueba", {"desconocido": 1})
+        with self.assertRaises(ValueError):
+            await self.gestor.enviar(
+                "prueba", {"usuario": "u", "progreso": "no es invocable"}
+            )
+        with self.assertRaises(ValueError):
+            await self.gestor.enviar(
+                "prueba", {"usuario": "u", "concurrencia": "x"}
+            )
+
+    async def test_progreso_se_guarda_con_intervalo(self):
+        """El progreso se ve al momento pero se guarda de vez en cuando."""
+        trabajo = await self.gestor.enviar("prueba", {"usuario": "u"})
+        await self.esperar_estado(trabajo["id"], EN_CURSO)
+        guardados = self.gestor.almacen.guardados
+
+        estado = await self.gestor.consultar(trabajo["id"])
+        self.assertEqual(estado["hechos"], 1)
+        self.assertEqual(
+            self.gestor.almacen.obtener(trabajo["id"])["hechos"], 0
+        )
+
+        self.liberar.set()
+        await self.esperar_estado(trabajo["id"], COMPLETADO)
+        # Solo el guardado final: los avances intermedios no van al almacén
+        self.assertEqual(self.gestor.almacen.guardados, guardados + 1)
+        self.assertEqual(
+            self.gestor.almacen.obtener(trabajo["id"])["hechos"], 4
+        )
+
+    async def test_error_y_caducidad(self):
+        """Los errores se registran y el trabajo caduca pasado el TTL."""
+        trabajo = await self.gestor.enviar("prueba", {"usuario": "falla"})
+        self.liberar.set()
+        await self.esperar_estado(trabajo["id"], ERROR)
+        estado = await self.gestor.consultar(trabajo["id"])
+        self.assertEqual(estado["error"], "boom")
+
+        self.reloj.ahora += 61
+        with self.assertRaises(TrabajoNoEncontrado):
+            await self.gestor.consultar(trabajo["id"])
+
+
+class TestGestorConSQLite(unittest.IsolatedAsyncioTestCase):
+    """El almacén SQLite se usa siempre fuera del bucle de eventos."""
+
+    async def asyncSetUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.almacen = AlmacenTrabajosSQLite(
+            os.path.join(self.directorio.name, "jobs.sqlite3")
+        )
+
+        async def ejecutor(parametros, progreso):
+            return parametros
+
+        self.gestor = GestorTrabajos(
+            almacen=self.almacen, workers=1,
+            tipos=tipo_prueba(ejecutor), propietario="maquina:1"
+        )
+
+    async def asyncTearDown(self):
+        self.almacen.cerrar()
+        self.directorio.cleanup()
+
+    async def test_envio_y_consulta_en_hilos(self):
+        """Enviar y consultar no tocan el fichero desde el bucle."""
+        with patch("app.jobs.jobs_service.asyncio.to_thread",
+                   wraps=asyncio.to_thread) as to_thread:
+            trabajos = await asyncio.gather(*(
+                self.gestor.enviar("prueba", {"usuario": "u"})
+                for _ in range(3)
+            ))
+            estado = await self.gestor.consultar(trabajos[0]["id"])
+
+        self.assertEqual({trabajo["id"] for trabajo in trabajos},
+                         {trabajos[0]["id"]})
+        self.assertEqual(estado["estado"], PENDIENTE)
+        metodos = {llamada.args[0].__name__
+                   for llamada in to_thread.call_args_list}
+        self.assertEqual(metodos, {"purgar", "buscar_activo", "guardar",
+                                   "obtener"})
+
+
+class TestProcesoVivo(unittest.TestCase):
+    """Pruebas de la comprobación del propietario de un trabajo."""
+
+    def test_proceso_vivo(self):
+        """Solo se dan por muertos los procesos locales que no existen."""
+        maquina = socket.gethostname()
+
+        self.assertTrue(proceso_vivo(f"{maquina}:{os.getppid()}"))
+        self.assertTrue(proceso_vivo("otra-maquina:1"))
+        self.assertFalse(proceso_vivo(f"{maquina}:{os.getpid()}"))
+        self.assertFalse(proceso_vivo(f"{maquina}:999999999"))
+        self.assertFalse(proceso_vivo(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
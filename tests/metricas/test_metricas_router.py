@@ -0,0 +1,15 @@
+"""Estos son los tests del router de metricas"""
+from fastapi.testclient import TestClient
+from main import app
+
+client = TestClient(app)
+
+
+def test_obtener_metricas():
+    """El endpoint expone el presupuesto de GitHub y la caché."""
+    response = client.get("/v1/metricas")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert "github_rate_limit" in data
+    assert "github_cache" in data
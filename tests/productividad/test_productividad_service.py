@@ -3,11 +3,21 @@ import unittest
 from unittest.mock import patch
 from datetime import datetime, timedelta
 from app.productividad.productividad_service import (
-    obtener_productividad_repositorio, obtener_productividad_por_repositorio
+    agregar_productividad,
+    obtener_productividad_repositorio,
+    obtener_productividad_por_repositorio
 )
 
 
-class TestProductividadRepositorio(unittest.TestCase):
+def listado(elementos):
+    """Simula un listado paginado de GitHub como iterador asíncrono."""
+    async def iterar(*_args, **_kwargs):
+        for elemento in elementos:
+            yield elemento
+    return iterar
+
+
+class TestProductividadRepositorio(unittest.IsolatedAsyncioTestCase):
     """Esta clase testea el servicio del modulo productividad"""
 
     def setUp(self):
@@ -17,9 +27,12 @@ class TestProductividadRepositorio(unittest.TestCase):
                 '%Y-%m-%dT%H:%M:%SZ'
         )
 
-    @patch("app.productividad.productividad_service.get_commits")
-    @patch("app.productividad.productividad_service.get_pull_requests")
-    def test_obtener_productividad_repositorio_productivo(
+    @patch("app.productividad.productividad_service.iterar_commits")
+    @patch(
+        "app.productividad.productividad_service."
+        "iterar_pull_requests_recientes"
+    )
+    async def test_obtener_productividad_repositorio_productivo(
         self,
         mock_get_prs,
         mock_get_commits
@@ -27,26 +40,27 @@ class TestProductividadRepositorio(unittest.TestCase):
         """Prueba para un usuario productivo"""
 
         # Simulamos los commits
-        mock_get_commits.return_value = [
+        mock_get_commits.side_effect = listado([
             {
                 "author": {"login": "usuario1"},
                 "commit": {"author": {"date": self.fecha_prueba}}
             }
-        ]
+        ])
 
         # Simulamos los pull requests
-        mock_get_prs.return_value = [
+        mock_get_prs.side_effect = listado([
             {"user": {"login": "usuario1"}, "state": "open", "created_at":
                 self.fecha_prueba
              },
             {"user": {"login": "usuario1"}, "state": "closed", "merged": True,
                 "created_at": self.fecha_prueba
              }
-        ]
+        ])
 
         # Llamamos al servicio
-        resultado = obtener_productividad_repositorio(
-            "owner_test", "repo_test")
+        resultado, _productivos, _improductivos = (
+            await obtener_productividad_repositorio("owner_test", "repo_test")
+        )
 
         # Verificamos que el usuario sea clasificado como productivo
         self.assertEqual(len(resultado), 1)
@@ -56,9 +70,12 @@ class TestProductividadRepositorio(unittest.TestCase):
         self.assertEqual(resultado[0]['pull_requests_abiertos'], 1)
         self.assertEqual(resultado[0]['pull_requests_no_fusionados'], 0)
 
-    @patch("app.productividad.productividad_service.get_commits")
-    @patch("app.productividad.productividad_service.get_pull_requests")
-    def test_obtener_productividad_repositorio_improductivo(
+    @patch("app.productividad.productividad_service.iterar_commits")
+    @patch(
+        "app.productividad.productividad_service."
+        "iterar_pull_requests_recientes"
+    )
+    async def test_obtener_productividad_repositorio_improductivo(
         self,
         mock_get_prs,
         mock_get_commits
@@ -66,15 +83,15 @@ class TestProductividadRepositorio(unittest.TestCase):
         """Prueba para un usuario improductivo"""
 
         # Simulamos los commits
-        mock_get_commits.return_value = [
+        mock_get_commits.side_effect = listado([
             {
                 "author": {"login": "usuario2"},
                 "commit": {"author": {"date": self.fecha_prueba}}
             }
-        ]
+        ])
 
         # Simulamos los pull requests
-        mock_get_prs.return_value = [
+        mock_get_prs.side_effect = listado([
             {"user": {"login": "usuario2"}, "state": "closed", "merged": False,
                 "created_at": self.fecha_prueba
              },
@@ -90,11 +107,12 @@ class TestProductividadRepositorio(unittest.TestCase):
             {"user": {"login": "usuario2"}, "state": "closed", "merged": False,
                 "created_at": self.fecha_prueba
              }
-        ]
+        ])
 
         # Llamamos al servicio
-        resultado = obtener_productividad_repositorio(
-            "owner_test", "repo_test")
+        resultado, _productivos, _improductivos = (
+            await obtener_productividad_repositorio("owner_test", "repo_test")
+        )
 
         # Verificamos que el usuario sea clasificado como improductivo
         self.assertEqual(len(resultado), 1)
@@ -104,9 +122,12 @@ class TestProductividadRepositorio(unittest.TestCase):
         self.assertEqual(resultado[0]['pull_requests_abiertos'], 0)
         self.assertEqual(resultado[0]['pull_requests_no_fusionados'], 5)
 
-    @patch("app.productividad.productividad_service.get_commits")
-    @patch("app.productividad.productividad_service.get_pull_requests")
-    def test_obtener_productividad_por_repositorio(
+    @patch("app.productividad.productividad_service.iterar_commits")
+    @patch(
+        "app.productividad.productividad_service."
+        "iterar_pull_requests_recientes"
+    )
+    async def test_obtener_productividad_por_repositorio(
         self,
         mock_get_prs,
         mock_get_commits
@@ -114,7 +135,7 @@ class TestProductividadRepositorio(unittest.TestCase):
         """Prueba para obtener la productividad de un repositorio completo"""
 
         # Simulamos los commits
-        mock_get_commits.return_value = [
+        mock_get_commits.side_effect = listado([
             {
                 "author": {"login": "usuario1"},
                 "commit": {"author": {"date": self.fecha_prueba}}
@@ -123,10 +144,10 @@ class TestProductividadRepositorio(unittest.TestCase):
                 "author": {"login": "usuario2"},
                 "commit": {"author": {"date": self.fecha_prueba}}
             }
-        ]
+        ])
 
         # Simulamos los pull requests
-        mock_get_prs.return_value = [
+        mock_get_prs.side_effect = listado([
             {"user": {"login": "usuario1"}, "state": "open", "created_at":
                 self.fecha_prueba
              },
@@ -149,10 +170,10 @@ class TestProductividadRepositorio(unittest.TestCase):
                 "created_at": self.fecha_prueba},
             {"user": {"login": "usuario1"}, "state": "closed", "merged": True,
                 "created_at": self.fecha_prueba}
-        ]
+        ])
 
         # Llamamos al servicio
-        resultado = obtener_productividad_por_repositorio(
+        resultado = await obtener_productividad_por_repositorio(
             "owner_test", "repo_test")
 
         # Verificamos que el resultado contenga los datos esperados para cada
@@ -192,6 +213,36 @@ class TestProductividadRepositorio(unittest.TestCase):
             self.assertEqual(usuario['pull_requests_no_fusionados'],
                              usuario_data['pull_requests_no_fusionados'])
 
+    def test_agregar_productividad_filtra_por_fechas(self):
+        """Los eventos antiguos no cuentan y un commit sin autor se ignora."""
+        ahora = datetime(2025, 4, 30, 12, 0, 0)
+        commits = [
+            {"author": {"login": "ana"},
+             "commit": {"author": {"date": "2025-04-25T00:00:00Z"}}},
+            {"author": {"login": "ana"},
+             "commit": {"author": {"date": "2025-04-10T00:00:00Z"}}},
+            {"author": None,
+             "commit": {"author": {"date": "2025-04-25T00:00:00Z"}}},
+        ]
+        prs = [
+            {"user": {"login": "ana"}, "state": "open",
+             "created_at": "2025-04-20T00:00:00Z"},
+            {"user": {"login": "luis"}, "state": "open",
+             "created_at": "2025-01-01T00:00:00Z"},
+        ]
+
+        productividad, productivos, improductivos = agregar_productividad(
+            commits, prs, ahora
+        )
+
+        self.assertEqual((productivos, improductivos), (1, 1))
+        self.assertEqual(productividad[0], {
+            "usuario": "ana", "status": "productivo", "commits": 1,
+            "pull_requests_abiertos": 1, "pull_requests_no_fusionados": 0
+        })
+        self.assertEqual(productividad[1]["usuario"], "luis")
+        self.assertEqual(productividad[1]["pull_requests_abiertos"], 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,107 @@
+"""Pruebas unitarias del programador de refrescos periódicos."""
+import unittest
+from unittest.mock import AsyncMock, patch
+from app.utils.cache_resultados import CacheResultados
+from app.programador.programador_service import (
+    Programador,
+    TareaProgramada,
+    crear_tareas
+)
+
+
+class Reloj:
+    """Reloj manual para controlar cuándo toca cada tarea."""
+
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+class TestProgramador(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del programador."""
+
+    def setUp(self):
+        self.reloj = Reloj()
+        self.cache = CacheResultados(
+            ttls={"prueba": 1000}, max_entradas=10,
+            ventana_obsoleta=0, reloj=self.reloj
+        )
+
+    def tarea(self, nombre, calcular, intervalo=100):
+        """Tarea de prueba en el espacio 'prueba'."""
+        return TareaProgramada(
+            "prueba", {"nombre": nombre}, calcular, intervalo
+        )
+
+    async def test_reparte_y_repite_las_tareas(self):
+        """Las tareas se escalonan en el intervalo y se repiten."""
+        calcular = AsyncMock(return_value={"ok": True})
+        tareas = [self.tarea(n, calcular) for n in ("a", "b")]
+        programador = Programador(tareas, cache=self.cache, reloj=self.reloj)
+
+        self.assertEqual([t.proxima for t in tareas], [0.0, 50.0])
+        self.assertEqual(await programador.ejecutar_pendientes(), 1)
+        self.reloj.ahora = 50
+        self.assertEqual(await programador.ejecutar_pendientes(), 1)
+        self.reloj.ahora = 60
+        self.assertEqual(await programador.ejecutar_pendientes(), 0)
+        self.reloj.ahora = 100
+        self.assertEqual(await programador.ejecutar_pendientes(), 1)
+        self.assertEqual(calcular.await_count, 3)
+
+    async def test_deja_el_resultado_en_la_cache(self):
+        """El endpoint encuentra el resultado ya calculado."""
+        programador = Programador(
+            [self.tarea("a", AsyncMock(return_value=42))],
+            cache=self.cache, reloj=self.reloj
+        )
+        await programador.ejecutar_todas()
+
+        otro_calculo = AsyncMock(return_value=0)
+        resultado = await self.cache.obtener_o_calcular(
+            "prueba", {"nombre": "a"}, otro_calculo
+        )
+        self.assertEqual(resultado, 42)
+        otro_calculo.assert_not_called()
+
+    async def test_un_error_no_detiene_el_resto(self):
+        """Los errores se registran y las demás tareas siguen."""
+        buena = AsyncMock(return_value=1)
+        tareas = [
+            self.tarea("mala", AsyncMock(side_effect=RuntimeError("boom"))),
+            self.tarea("buena", buena),
+        ]
+        programador = Programador(tareas, cache=self.cache, reloj=self.reloj)
+        await programador.ejecutar_todas()
+
+        estadisticas = programador.estadisticas()
+        self.assertEqual(estadisticas["prueba:mala"]["errores"], 1)
+        self.assertEqual(estadisticas["prueba:mala"]["ultimo_error"], "boom")
+        buena.assert_awaited_once()
+
+
+class TestCrearTareas(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de la construcción de tareas desde la configuración."""
+
+    @patch("app.programador.programador_service.clasificar_repositorios")
+    async def test_tareas_por_usuario_y_repo(self, mock_clasificar):
+        """Un usuario genera una tarea y cada repo dos."""
+        tareas = crear_tareas(["usuario"], ["owner/repo"])
+
+        self.assertEqual(
+            [tarea.espacio for tarea in tareas],
+            ["repositorios", "productividad", "dependabots"]
+        )
+        await tareas[0].calcular()
+        mock_clasificar.assert_called_once_with("usuario", incremental=True)
+
+    def test_repo_no_valido(self):
+        """Los repositorios deben tener la forma owner/repo."""
+        with self.assertRaises(ValueError):
+            crear_tareas([], ["sin-barra"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,34 @@
 """Estas son pruebas unitarias."""
+import asyncio
 import unittest
+from datetime import datetime, timedelta
 from unittest.mock import patch
-from app.utils.github_utils import GithubAPIException
-from app.repositorios.activity_service import clasificar_repositorios
+from app.utils.github_utils import (
+    GithubAPIException,
+    GithubLimiteUsoException
+)
+from app.repositorios.marcas_agua import AlmacenMarcasMemoria
+from app.repositorios.activity_service import (
+    clasificar_repositorios,
+    iterar_clasificacion_repositorios
+)
 
 
-class TestClasificarRepositorios(unittest.TestCase):
+def listado(elementos):
+    """Simula un listado paginado de GitHub como iterador asíncrono."""
+    async def iterar(*_args, **_kwargs):
+        for elemento in elementos:
+            yield elemento
+    return iterar
+
+
+class TestClasificarRepositorios(unittest.IsolatedAsyncioTestCase):
     """Pruebas unitarias para la función clasificar_repositorios."""
 
     @patch("app.repositorios.activity_service.get_pull_requests")
     @patch("app.repositorios.activity_service.get_repos")
     @patch("app.repositorios.activity_service.get_commits")
-    def test_clasificar_repositorios_activos_inactivos(
+    async def test_clasificar_repositorios_activos_inactivos(
         self,
         mock_get_commits,
         mock_get_repos,
@@ -58,7 +75,7 @@ class TestClasificarRepositorios(unittest.TestCase):
         ]
 
         # Llamamos a la función que estamos probando
-        resultado = clasificar_repositorios("usuario_prueba")
+        resultado = await clasificar_repositorios("usuario_prueba")
 
         # Verificamos que la función retorna el número correcto de repos
         self.assertEqual(resultado["total"], 3)
@@ -99,7 +116,7 @@ class TestClasificarRepositorios(unittest.TestCase):
     @patch("app.repositorios.activity_service.get_pull_requests")
     @patch("app.repositorios.activity_service.get_repos")
     @patch("app.repositorios.activity_service.get_commits")
-    def test_clasificar_repositorios_con_error(
+    async def test_clasificar_repositorios_con_error(
         self,
         mock_get_commits,
         mock_get_repos,
@@ -128,7 +145,7 @@ class TestClasificarRepositorios(unittest.TestCase):
             []   # PRs de repo2
         ]
         # Llamamos a la función que estamos probando
-        resultado = clasificar_repositorios("usuario_prueba")
+        resultado = await clasificar_repositorios("usuario_prueba")
 
         # Verificamos que la función retorna el número correcto de repos
         self.assertEqual(resultado["total"], 2)
@@ -139,11 +156,35 @@ class TestClasificarRepositorios(unittest.TestCase):
         self.assertEqual(repos[0]["status"], "activo")
         self.assertEqual(repos[1]["repo"], "repo2")
         self.assertEqual(repos[1]["status"], "inactivo")
+        self.assertNotIn("error", repos[0])
+        self.assertEqual(repos[1]["error"], "Error al obtener commits")
+
+    @patch("app.repositorios.activity_service.get_pull_requests")
+    @patch("app.repositorios.activity_service.get_repos")
+    @patch("app.repositorios.activity_service.get_commits")
+    async def test_clasificar_repositorios_sin_presupuesto(
+        self,
+        mock_get_commits,
+        mock_get_repos,
+        mock_get_prs
+    ):
+        """Sin presupuesto de GitHub no se clasifica como inactivo: se
+        propaga la excepción para responder 429."""
+        mock_get_repos.return_value = [
+            {"name": "repo1", "html_url": "https://github.com/user/repo1"}
+        ]
+        mock_get_commits.side_effect = GithubLimiteUsoException(
+            "Límite de uso agotado", 9_999_999_999
+        )
+        mock_get_prs.return_value = []
+
+        with self.assertRaises(GithubLimiteUsoException):
+            await clasificar_repositorios("usuario_prueba")
 
     @patch("app.repositorios.activity_service.get_pull_requests")
     @patch("app.repositorios.activity_service.get_repos")
     @patch("app.repositorios.activity_service.get_commits")
-    def test_clasificar_repositorios_sin_commits(
+    async def test_clasificar_repositorios_sin_commits(
         self,
         mock_get_commits,
         mock_get_repos,
@@ -172,7 +213,7 @@ class TestClasificarRepositorios(unittest.TestCase):
         ]
 
         # Llamamos a la función que estamos probando
-        resultado = clasificar_repositorios("usuario_prueba")
+        resultado = await clasificar_repositorios("usuario_prueba")
 
         # Verificamos que la función retorna el número correcto de repos
         self.assertEqual(resultado["total"], 2)
@@ -184,6 +225,235 @@ class TestClasificarRepositorios(unittest.TestCase):
         self.assertEqual(repos[1]["repo"], "repo2")
         self.assertEqual(repos[1]["status"], "inactivo")
 
+    @patch("app.repositorios.activity_service.get_pull_requests")
+    @patch("app.repositorios.activity_service.get_repos")
+    @patch("app.repositorios.activity_service.get_commits")
+    async def test_clasificar_repositorios_concurrencia_limitada(
+        self,
+        mock_get_commits,
+        mock_get_repos,
+        mock_get_prs
+    ):
+        """Los repos se procesan en paralelo sin superar la concurrencia
+        indicada y el resultado respeta el orden del listado."""
+
+        mock_get_repos.return_value = [
+            {"name": f"repo{i}", "html_url": ""} for i in range(10)
+        ]
+
+        en_vuelo = 0
+        maximo = 0
+
+        async def commits_lentos(_usuario, _nombre):
+            nonlocal en_vuelo, maximo
+            en_vuelo += 1
+            maximo = max(maximo, en_vuelo)
+            await asyncio.sleep(0.01)
+            en_vuelo -= 1
+            return [{"sha": "commit"}]
+
+        mock_get_commits.side_effect = commits_lentos
+        mock_get_prs.return_value = []
+
+        resultado = await clasificar_repositorios(
+            "usuario_prueba", concurrencia=3
+        )
+
+        self.assertEqual(maximo, 3)
+        self.assertEqual(
+            [repo["repo"] for repo in resultado["repos_con_estado"]],
+            [f"repo{i}" for i in range(10)]
+        )
+
+    @patch("app.repositorios.activity_service.get_pull_requests")
+    @patch("app.repositorios.activity_service.iterar_repos")
+    @patch("app.repositorios.activity_service.get_commits")
+    async def test_iterar_clasificacion_emite_al_terminar(
+        self,
+        mock_get_commits,
+        mock_iterar_repos,
+        mock_get_prs
+    ):
+        """En streaming cada repo sale en cuanto termina y al final
+        llega el resumen con el total."""
+
+        mock_iterar_repos.side_effect = listado([
+            {"name": "lento", "html_url": ""},
+            {"name": "rapido", "html_url": ""},
+        ])
+
+        async def commits(_usuario, nombre):
+            if nombre == "lento":
+                await asyncio.sleep(0.05)
+            return [{"sha": "commit"}]
+
+        mock_get_commits.side_effect = commits
+        mock_get_prs.return_value = []
+
+        registros = [
+            registro async for registro in
+            iterar_clasificacion_repositorios("usuario_prueba")
+        ]
+
+        self.assertEqual(
+            [registro.get("repo") for registro in registros],
+            ["rapido", "lento", None]
+        )
+        self.assertEqual(registros[-1], {"tipo": "resumen", "total": 2})
+        self.assertEqual(registros[0]["status"], "activo")
+
+
+
+class TestClasificacionPorMetadatos(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de la clasificación con los metadatos del listado."""
+
+    def setUp(self):
+        reciente = (datetime.now() - timedelta(days=2)).isoformat()
+        antiguo = (datetime.now() - timedelta(days=90)).isoformat()
+        self.repos = [
+            {"name": "reciente", "pushed_at": reciente, "size": 10},
+            {"name": "antiguo", "pushed_at": antiguo, "size": 10},
+            {"name": "archivado", "pushed_at": reciente, "archived": True},
+            {"name": "vacio", "pushed_at": reciente, "size": 0},
+        ]
+
+    @patch("app.repositorios.activity_service.get_pull_requests")
+    @patch("app.repositorios.activity_service.get_repos")
+    @patch("app.repositorios.activity_service.get_commits")
+    async def test_modo_rapido_no_hace_peticiones_por_repo(
+        self, mock_get_commits, mock_get_repos, mock_get_prs
+    ):
+        """En modo rápido solo se usa el listado de repositorios."""
+        mock_get_repos.return_value = self.repos
+
+        with patch("app.repositorios.activity_service.encolar_documento"
+                   ) as mock_encolar:
+            resultado = await clasificar_repositorios(
+                "usuario_prueba", modo="rapido"
+            )
+
+        estados = {
+            repo["repo"]: repo["status"]
+            for repo in resultado["repos_con_estado"]
+        }
+        self.assertEqual(estados, {
+            "reciente": "activo", "antiguo": "inactivo",
+            "archivado": "inactivo", "vacio": "inactivo"
+        })
+        self.assertIsNone(resultado["repos_con_estado"][0]["pull_requests"])
+        # Se indexan aparte para no pisar las clasificaciones completas
+        modos = {llamada.args[1]["modo"]
+                 for llamada in mock_encolar.call_args_list}
+        self.assertEqual(modos, {"rapido"})
+        mock_get_commits.assert_not_called()
+        mock_get_prs.assert_not_called()
+
+    @patch("app.repositorios.activity_service.get_pull_requests")
+    @patch("app.repositorios.activity_service.get_repos")
+    @patch("app.repositorios.activity_service.get_commits")
+    async def test_modo_completo_omite_commits_sin_pushes(
+        self, mock_get_commits, mock_get_repos, mock_get_prs
+    ):
+        """Sin pushes en la ventana no se piden commits, pero sí los PRs."""
+        mock_get_repos.return_value = self.repos[:2]
+        mock_get_commits.return_value = [{"sha": "commit"}]
+        mock_get_prs.return_value = [{"number": 1, "state": "open"}]
+
+        resultado = await clasificar_repositorios("usuario_prueba")
+
+        mock_get_commits.assert_called_once_with("usuario_prueba", "reciente")
+        self.assertEqual(mock_get_prs.call_count, 2)
+        antiguo = resultado["repos_con_estado"][1]
+        self.assertEqual(antiguo["status"], "inactivo")
+        self.assertEqual(antiguo["pull_requests"]["abiertos"], 1)
+
+
+class TestClasificacionIncremental(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del modo incremental con marcas de agua."""
+
+    def setUp(self):
+        self.fecha_commit = (datetime.now() - timedelta(days=2)).isoformat()
+        self.repos = [{"name": "repo1", "html_url": "",
+                       "pushed_at": "2025-04-01T00:00:00Z"}]
+        parches = {
+            "almacen": patch(
+                "app.repositorios.activity_service.obtener_almacen_marcas",
+                return_value=AlmacenMarcasMemoria()
+            ),
+            "repos": patch(
+                "app.repositorios.activity_service.get_repos",
+                side_effect=lambda _usuario: [dict(r) for r in self.repos]
+            ),
+            "commits": patch(
+                "app.repositorios.activity_service.get_commits",
+                return_value=[{"commit": {"committer": {
+                    "date": self.fecha_commit
+                }}}]
+            ),
+            "prs": patch(
+                "app.repositorios.activity_service.get_pull_requests",
+                return_value=[
+                    {"number": 1, "state": "open",
+                     "updated_at": "2025-03-01T00:00:00Z"},
+                    {"number": 2, "state": "closed",
+                     "updated_at": "2025-03-02T00:00:00Z"},
+                ]
+            ),
+            "ultimo": patch(
+                "app.repositorios.activity_service.iterar_commits",
+                side_effect=listado([])
+            ),
+            "recientes": patch(
+                "app.repositorios.activity_service."
+                "iterar_pull_requests_recientes",
+                side_effect=listado([
+                    {"number": 1, "state": "closed",
+                     "updated_at": "2025-04-01T00:00:00Z"},
+                ])
+            ),
+        }
+        self.mocks = {}
+        for nombre, parche in parches.items():
+            self.mocks[nombre] = parche.start()
+            self.addCleanup(parche.stop)
+
+    async def clasificar(self):
+        """Clasifica en modo incremental y devuelve el único repo."""
+        resultado = await clasificar_repositorios(
+            "usuario_prueba", incremental=True
+        )
+        return resultado["repos_con_estado"][0]
+
+    async def test_sin_pushes_no_se_pide_nada(self):
+        """Con pushed_at igual se reutiliza la marca sin peticiones."""
+        primero = await self.clasificar()
+        segundo = await self.clasificar()
+
+        self.assertEqual(primero, segundo)
+        self.assertEqual(segundo["status"], "activo")
+        self.assertEqual(segundo["pull_requests"]["abiertos"], 1)
+        self.assertEqual(self.mocks["commits"].call_count, 1)
+        self.assertEqual(self.mocks["prs"].call_count, 1)
+        self.mocks["ultimo"].assert_not_called()
+        self.mocks["recientes"].assert_not_called()
+
+    async def test_con_pushes_se_piden_solo_los_cambios(self):
+        """Con pushed_at nuevo se piden los PRs desde la marca y se mezclan."""
+        await self.clasificar()
+        self.repos[0]["pushed_at"] = "2025-04-02T00:00:00Z"
+
+        repo = await self.clasificar()
+
+        self.assertEqual(self.mocks["commits"].call_count, 1)
+        self.assertEqual(self.mocks["prs"].call_count, 1)
+        args, kwargs = self.mocks["recientes"].call_args
+        self.assertEqual(args[2], datetime(2025, 3, 2))
+        self.assertEqual(kwargs["campo"], "updated")
+        # El PR 1 pasa de abierto a cerrado; el commit guardado sigue valiendo
+        self.assertEqual(repo["pull_requests"]["abiertos"], 0)
+        self.assertEqual(repo["pull_requests"]["cerrados"], 2)
+        self.assertEqual(repo["status"], "activo")
+
 
 if __name__ == "__main__":
     unittest.main()
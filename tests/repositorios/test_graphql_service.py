@@ -0,0 +1,143 @@
+"""Pruebas de la fuente GraphQL contra un servidor local simulado."""
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+import httpx
+from app.repositorios.activity_service import clasificar_repositorios
+from app.utils.github_utils import GithubAPIException
+
+
+def nodo(nombre, commits, abiertos, cerrados, fusionados):
+    """Nodo de repositorio tal y como lo devuelve GraphQL."""
+    return {
+        "name": nombre,
+        "url": f"https://github.com/user/{nombre}",
+        "abiertos": {"totalCount": abiertos},
+        "cerrados": {"totalCount": cerrados},
+        "fusionados": {"totalCount": fusionados},
+        "defaultBranchRef": (
+            None if commits is None
+            else {"target": {"history": {"totalCount": commits}}}
+        ),
+    }
+
+
+# Dos páginas de repositorios, enlazadas por cursor
+PAGINAS = {
+    None: {
+        "pageInfo": {"hasNextPage": True, "endCursor": "c1"},
+        "nodes": [nodo("repo1", 3, 1, 1, 1), nodo("repo2", 0, 2, 0, 0)],
+    },
+    "c1": {
+        "pageInfo": {"hasNextPage": False, "endCursor": None},
+        "nodes": [nodo("repo3", None, 1, 1, 4)],
+    },
+}
+
+
+class StubGraphQL(BaseHTTPRequestHandler):
+    """Servidor GraphQL mínimo que responde según el cursor recibido."""
+
+    consultas = []
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Responde a una consulta GraphQL."""
+        longitud = int(self.headers["Content-Length"])
+        cuerpo = json.loads(self.rfile.read(longitud))
+        variables = cuerpo["variables"]
+        StubGraphQL.consultas.append(variables)
+
+        if variables["owner"] == "desconocido":
+            datos = {"data": {"repositoryOwner": None}}
+        elif variables["owner"] == "con_errores":
+            datos = {"data": None, "errors": [{"message": "Bad query"}]}
+        else:
+            datos = {"data": {"repositoryOwner": {
+                "repositories": PAGINAS[variables["cursor"]]
+            }}}
+
+        contenido = json.dumps(datos).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(contenido)))
+        self.end_headers()
+        self.wfile.write(contenido)
+
+    def log_message(self, *_args):
+        """Silencia el log del servidor durante las pruebas."""
+
+
+class TestGraphQLService(unittest.IsolatedAsyncioTestCase):
+    """Clasificación de repositorios usando GraphQL."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor = ThreadingHTTPServer(("127.0.0.1", 0), StubGraphQL)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def setUp(self):
+        StubGraphQL.consultas = []
+        self.cliente = httpx.AsyncClient()
+        url = f"http://127.0.0.1:{self.servidor.server_address[1]}/graphql"
+        for parche in (
+            patch("app.utils.github_utils.obtener_cliente",
+                  return_value=self.cliente),
+            patch("app.utils.github_utils.Config.GITHUB_GRAPHQL_URL", url),
+            patch("app.repositorios.activity_service.encolar_documento"),
+        ):
+            parche.start()
+            self.addCleanup(parche.stop)
+
+    async def asyncTearDown(self):
+        await self.cliente.aclose()
+
+    async def test_clasificar_con_graphql(self):
+        """Se recorren las páginas por cursor y se clasifica cada repo."""
+        resultado = await clasificar_repositorios(
+            "usuario_prueba", fuente="graphql"
+        )
+
+        # Una consulta por página, no dos peticiones por repositorio
+        self.assertEqual([c["cursor"] for c in StubGraphQL.consultas],
+                         [None, "c1"])
+        self.assertEqual(resultado["total"], 3)
+        repos = resultado["repos_con_estado"]
+
+        self.assertEqual(repos[0]["status"], "activo")
+        self.assertEqual(repos[0]["pull_requests"]["cerrados"], 2)
+        self.assertEqual(repos[0]["pull_requests"]["resueltos"], 1)
+        self.assertEqual(
+            repos[0]["pull_requests"]["estado_repo"], "Repo Dinámico"
+        )
+
+        self.assertEqual(repos[1]["status"], "inactivo")
+        self.assertEqual(
+            repos[1]["pull_requests"]["estado_repo"], "Repo Ineficiente"
+        )
+
+        # Repositorio vacío, sin rama por defecto
+        self.assertEqual(repos[2]["status"], "inactivo")
+        self.assertEqual(
+            repos[2]["pull_requests"]["estado_repo"], "Repo Estable"
+        )
+
+    async def test_usuario_inexistente(self):
+        """Un propietario inexistente lanza GithubAPIException."""
+        with self.assertRaises(GithubAPIException):
+            await clasificar_repositorios("desconocido", fuente="graphql")
+
+    async def test_errores_graphql(self):
+        """Los errores de GraphQL se traducen a GithubAPIException."""
+        with self.assertRaises(GithubAPIException):
+            await clasificar_repositorios("con_errores", fuente="graphql")
+
+
+if __name__ == "__main__":
+    unittest.main()
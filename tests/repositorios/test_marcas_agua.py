@@ -0,0 +1,69 @@
+"""Pruebas unitarias de los almacenes de marcas de agua."""
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from app.repositorios.marcas_agua import (
+    AlmacenMarcasMemoria,
+    AlmacenMarcasSQLite,
+    llamar_almacen
+)
+
+MARCA = {"pushed_at": "2025-04-01T00:00:00Z", "pull_requests": {"1": "abierto"}}
+
+
+class TestAlmacenMarcasMemoria(unittest.TestCase):
+    """Almacén de marcas en memoria."""
+
+    def test_guardar_obtener_y_borrar(self):
+        """Las marcas se guardan por usuario y repositorio."""
+        almacen = AlmacenMarcasMemoria()
+        almacen.guardar("u", "repo", MARCA)
+
+        self.assertEqual(almacen.obtener("u", "repo"), MARCA)
+        self.assertIsNone(almacen.obtener("otro", "repo"))
+        self.assertEqual(almacen.borrar("u"), 1)
+        self.assertIsNone(almacen.obtener("u", "repo"))
+
+
+class TestAlmacenMarcasSQLite(unittest.TestCase):
+    """Almacén de marcas en SQLite."""
+
+    def test_persiste_entre_instancias(self):
+        """Una marca guardada se recupera tras reabrir el fichero."""
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "marcas.sqlite3")
+            almacen = AlmacenMarcasSQLite(ruta)
+            almacen.guardar("u", "repo", MARCA)
+            almacen.cerrar()
+
+            almacen = AlmacenMarcasSQLite(ruta)
+            self.assertEqual(almacen.obtener("u", "repo"), MARCA)
+            almacen.cerrar()
+
+
+class TestLlamarAlmacen(unittest.IsolatedAsyncioTestCase):
+    """Acceso a los almacenes desde el bucle de eventos."""
+
+    async def test_sqlite_fuera_del_bucle(self):
+        """El almacén SQLite se usa desde un hilo; el de memoria, no."""
+        with tempfile.TemporaryDirectory() as directorio:
+            almacen = AlmacenMarcasSQLite(
+                os.path.join(directorio, "marcas.sqlite3")
+            )
+            with patch("app.repositorios.marcas_agua.asyncio.to_thread",
+                       wraps=asyncio.to_thread) as to_thread:
+                await llamar_almacen(almacen, "guardar", "u", "repo", MARCA)
+                marca = await llamar_almacen(almacen, "obtener", "u", "repo")
+                await llamar_almacen(
+                    AlmacenMarcasMemoria(), "obtener", "u", "repo"
+                )
+            almacen.cerrar()
+
+        self.assertEqual(marca, MARCA)
+        self.assertEqual(to_thread.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,14 @@
 """Estas son pruebas unitarias."""
 
+import json
+import time
 from unittest.mock import patch
 from fastapi.testclient import TestClient
 from main import app
+from app.utils.github_utils import (
+    GithubAPIException,
+    GithubLimiteUsoException
+)
 
 client = TestClient(app)
 
@@ -85,3 +91,109 @@ def test_get_repositorios_error(mock_get_commits, mock_get_repos):
     assert response.status_code == 500
     data = response.json()
     assert "detail" in data
+
+
+@patch("app.repositorios.activity_service.get_pull_requests")
+@patch("app.repositorios.activity_service.iterar_repos")
+@patch("app.repositorios.activity_service.get_commits")
+def test_get_repositorios_stream(
+    mock_get_commits,
+    mock_iterar_repos,
+    mock_get_prs
+):
+    """Con stream=true se recibe NDJSON con un resumen final."""
+
+    async def iterar(*_args, **_kwargs):
+        for nombre in ("repo1", "repo2"):
+            yield {"name": nombre, "html_url": ""}
+
+    mock_iterar_repos.side_effect = iterar
+    mock_get_commits.return_value = [{"sha": "commit1"}]
+    mock_get_prs.return_value = []
+
+    response = client.get('/v1/repositorios/usuario_prueba?stream=true')
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lineas = [json.loads(linea) for linea in response.text.splitlines()]
+    assert sorted(linea["repo"] for linea in lineas[:-1]) == [
+        "repo1", "repo2"
+    ]
+    assert lineas[-1] == {"tipo": "resumen", "total": 2}
+
+
+@patch("app.repositorios.activity_service.iterar_repos")
+def test_get_repositorios_stream_error_inicial(mock_iterar_repos):
+    """Un error antes de empezar a enviar devuelve 500 como sin stream."""
+
+    async def iterar(*_args, **_kwargs):
+        raise GithubAPIException("Usuario no encontrado")
+        yield  # pylint: disable=unreachable
+
+    mock_iterar_repos.side_effect = iterar
+
+    response = client.get('/v1/repositorios/nadie?stream=true')
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Usuario no encontrado"}
+
+
+@patch("app.repositorios.repo_routes.iterar_clasificacion_repositorios")
+def test_get_repositorios_stream_error_a_mitad(mock_iterar):
+    """Si falla ya empezado el envío, la última línea es el error."""
+
+    async def iterar(*_args, **_kwargs):
+        yield {"tipo": "repo", "repo": "repo1"}
+        raise GithubAPIException("Error de GitHub")
+
+    mock_iterar.side_effect = iterar
+
+    response = client.get('/v1/repositorios/usuario_prueba?stream=true')
+
+    assert response.status_code == 200
+    lineas = [json.loads(linea) for linea in response.text.splitlines()]
+    assert lineas == [
+        {"tipo": "repo", "repo": "repo1"},
+        {"tipo": "error", "detalle": "Error de GitHub"},
+    ]
+
+
+@patch("app.repositorios.repo_routes.documentos_repositorios")
+@patch(
+    "app.elasticsearch.consultas_elasticsearch.consultar_indice",
+    return_value=None
+)
+def test_get_repositorios_indexados_sin_indice(
+    _mock_consultar, mock_documentos
+):
+    """Sin datos en el índice se clasifica en vivo y se filtra."""
+    mock_documentos.return_value = [
+        {"repo": "repo1", "usuario": "usuario_prueba", "status": "activo",
+         "modo": "completo"},
+        {"repo": "repo2", "usuario": "usuario_prueba", "status": "inactivo",
+         "modo": "completo"},
+    ]
+
+    response = client.get(
+        "/v1/repositorios/usuario_prueba/indexados?status=activo"
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["fuente"] == "github"
+    assert [doc["repo"] for doc in data["documentos"]] == ["repo1"]
+    mock_documentos.assert_called_once_with("usuario_prueba")
+
+
+@patch("app.repositorios.repo_routes.clasificar_repositorios")
+def test_get_repositorios_sin_presupuesto_devuelve_429(mock_clasificar):
+    """Sin presupuesto en GitHub se responde 429 con Retry-After."""
+    reinicio = time.time() + 120
+    mock_clasificar.side_effect = GithubLimiteUsoException(
+        "Límite de uso agotado", reinicio
+    )
+
+    response = client.get('/v1/repositorios/sin_presupuesto')
+
+    assert response.status_code == 429
+    assert 0 < int(response.headers["Retry-After"]) <= 120
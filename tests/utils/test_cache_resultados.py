@@ -0,0 +1,216 @@
+"""Pruebas unitarias de la caché de resultados."""
+import asyncio
+import unittest
+from app.utils.cache_resultados import (
+    CacheResultados,
+    dependabots_parcial,
+    repositorios_parcial
+)
+
+
+class Reloj:
+    """Reloj manual para controlar la edad de las entradas."""
+
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+class TestCacheResultados(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de TTL, stale-while-revalidate, LRU e invalidación."""
+
+    async def asyncSetUp(self):
+        self.reloj = Reloj()
+        self.cache = CacheResultados(
+            ttls={"a": 10, "b": 0}, max_entradas=2,
+            ventana_obsoleta=100, reloj=self.reloj
+        )
+        self.calculos = 0
+
+    async def calcular(self):
+        """Cálculo simulado que devuelve cuántas veces se ha ejecutado."""
+        self.calculos += 1
+        await asyncio.sleep(0)
+        return self.calculos
+
+    async def consultar(self, espacio="a", parametros=None):
+        """Consulta la caché con los parámetros indicados."""
+        return await self.cache.obtener_o_calcular(
+            espacio, parametros or {"x": 1}, self.calcular
+        )
+
+    async def test_acierto_dentro_del_ttl(self):
+        """Dentro del TTL no se recalcula."""
+        self.assertEqual(await self.consultar(), 1)
+        self.reloj.ahora = 5
+        self.assertEqual(await self.consultar(), 1)
+        self.assertEqual(self.cache.estadisticas()["aciertos"], 1)
+
+    async def test_ttl_cero_no_guarda(self):
+        """Un espacio con TTL 0 se calcula siempre."""
+        await self.consultar("b")
+        await self.consultar("b")
+        self.assertEqual(self.calculos, 2)
+
+    async def test_sirve_obsoleto_y_refresca(self):
+        """Pasado el TTL se sirve lo guardado y se recalcula en segundo plano."""
+        await self.consultar()
+        self.reloj.ahora = 20
+
+        self.assertEqual(await self.consultar(), 1)
+        await asyncio.gather(*self.cache._refrescos.values())
+        self.assertEqual(await self.consultar(), 2)
+        self.assertEqual(self.cache.estadisticas()["obsoletos"], 1)
+
+    async def test_fuera_de_la_ventana_recalcula(self):
+        """Demasiado viejo: se recalcula antes de responder."""
+        await self.consultar()
+        self.reloj.ahora = 200
+        self.assertEqual(await self.consultar(), 2)
+
+    async def test_calculos_concurrentes_se_agrupan(self):
+        """Varias consultas a la vez de la misma clave calculan una vez."""
+        resultados = await asyncio.gather(
+            *(self.consultar() for _ in range(5))
+        )
+        self.assertEqual(resultados, [1] * 5)
+        self.assertEqual(self.calculos, 1)
+
+    async def test_lru_desaloja_la_menos_usada(self):
+        """Se conservan como mucho max_entradas."""
+        await self.consultar(parametros={"x": 1})
+        await self.consultar(parametros={"x": 2})
+        await self.consultar(parametros={"x": 1})
+        await self.consultar(parametros={"x": 3})
+
+        self.assertEqual(self.cache.estadisticas()["entradas"], 2)
+        await self.consultar(parametros={"x": 1})
+        self.assertEqual(self.calculos, 3)
+
+    async def test_invalidar(self):
+        """Tras invalidar, la siguiente consulta recalcula."""
+        await self.consultar()
+        self.assertEqual(self.cache.invalidar("a"), 1)
+        self.assertEqual(await self.consultar(), 2)
+
+    async def test_errores_no_se_guardan(self):
+        """Una excepción no deja ninguna entrada."""
+        async def fallar():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            await self.cache.obtener_o_calcular("a", {}, fallar)
+        self.assertEqual(self.cache.estadisticas()["entradas"], 0)
+
+    async def test_invalidar_desengancha_calculos_en_vuelo(self):
+        """
+        Una consulta posterior a invalidar no se suma al cálculo que ya
+        estaba en marcha, y ese cálculo no se guarda.
+        """
+        liberar = asyncio.Event()
+
+        async def calcular_viejo():
+            await liberar.wait()
+            return "viejo"
+
+        async def calcular_nuevo():
+            return "nuevo"
+
+        viejo = asyncio.ensure_future(
+            self.cache.obtener_o_calcular("a", {}, calcular_viejo)
+        )
+        await asyncio.sleep(0)
+        self.cache.invalidar("a")
+
+        nuevo = await self.cache.obtener_o_calcular("a", {}, calcular_nuevo)
+        liberar.set()
+
+        self.assertEqual((await viejo, nuevo), ("viejo", "nuevo"))
+        self.assertEqual(
+            await self.cache.obtener_o_calcular("a", {}, calcular_viejo),
+            "nuevo"
+        )
+
+    async def test_invalidar_un_espacio_no_afecta_a_otros(self):
+        """Invalidar un espacio no descarta los cálculos de los demás."""
+        cache = CacheResultados(ttls={"a": 10, "c": 10}, reloj=self.reloj)
+        liberar = asyncio.Event()
+        calculos = []
+
+        async def calcular():
+            calculos.append(1)
+            await liberar.wait()
+            return "c"
+
+        primero = asyncio.ensure_future(
+            cache.obtener_o_calcular("c", {}, calcular)
+        )
+        await asyncio.sleep(0)
+        cache.invalidar("a")
+        segundo = asyncio.ensure_future(
+            cache.obtener_o_calcular("c", {}, calcular)
+        )
+        await asyncio.sleep(0)
+        liberar.set()
+
+        self.assertEqual(await asyncio.gather(primero, segundo), ["c", "c"])
+        self.assertEqual(len(calculos), 1)
+        self.assertEqual(cache.estadisticas()["entradas"], 1)
+
+
+class TestResultadosParciales(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de los resultados a los que les faltan datos."""
+
+    async def asyncSetUp(self):
+        self.reloj = Reloj()
+        self.cache = CacheResultados(
+            ttls={"a": 100}, ventana_obsoleta=1000, reloj=self.reloj,
+            parciales={"a": lambda valor: valor["parcial"]}, ttl_parcial=5
+        )
+        self.valores = []
+
+    async def calcular(self):
+        """Devuelve el siguiente valor preparado por la prueba."""
+        return self.valores.pop(0)
+
+    async def consultar(self):
+        """Consulta la caché con parámetros fijos."""
+        return await self.cache.obtener_o_calcular("a", {}, self.calcular)
+
+    async def test_parcial_caduca_pronto_y_sin_servirse_obsoleto(self):
+        """Un resultado parcial solo dura ``ttl_parcial`` segundos."""
+        self.valores = [{"parcial": True, "n": 1}, {"parcial": False, "n": 2}]
+
+        self.assertEqual((await self.consultar())["n"], 1)
+        self.reloj.ahora = 4
+        self.assertEqual((await self.consultar())["n"], 1)
+        self.reloj.ahora = 6
+        self.assertEqual((await self.consultar())["n"], 2)
+        self.assertEqual(self.cache.estadisticas()["obsoletos"], 0)
+        self.assertEqual(self.cache.estadisticas()["parciales"], 1)
+
+    async def test_ttl_parcial_cero_no_guarda(self):
+        """Con ``ttl_parcial=0`` los resultados parciales no se guardan."""
+        self.cache.ttl_parcial = 0
+        self.valores = [{"parcial": True, "n": 1}, {"parcial": True, "n": 2}]
+
+        await self.consultar()
+        self.assertEqual((await self.consultar())["n"], 2)
+        self.assertEqual(self.cache.estadisticas()["entradas"], 0)
+
+    def test_detectores_de_parciales(self):
+        """Repositorios con error y estados fallidos cuentan como parciales."""
+        self.assertTrue(repositorios_parcial({"repos_con_estado": [
+            {"repo": "a"}, {"repo": "b", "error": "403"}
+        ]}))
+        self.assertFalse(repositorios_parcial({"repos_con_estado": [
+            {"repo": "a"}
+        ]}))
+        self.assertTrue(dependabots_parcial({"estados_fallidos": ["fixed"]}))
+        self.assertFalse(dependabots_parcial({"estados_fallidos": []}))
+
+
+if __name__ == "__main__":
+    unittest.main()
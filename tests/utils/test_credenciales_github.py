@@ -0,0 +1,299 @@
+"""Pruebas unitarias del pool de credenciales de GitHub."""
+import unittest
+from unittest.mock import patch, AsyncMock
+import httpx
+from app.utils import github_utils
+from app.utils.credenciales_github import (
+    ErrorCredencial,
+    PoolCredenciales,
+    TokenEstatico,
+    TokenInstalacionApp,
+    crear_pool
+)
+from app.utils.rate_limit import PlanificadorGithub
+
+
+def cabeceras(restante, reinicio, limite=5000):
+    """Cabeceras X-RateLimit de una respuesta de GitHub."""
+    return httpx.Headers({
+        "X-RateLimit-Remaining": str(restante),
+        "X-RateLimit-Reset": str(reinicio),
+        "X-RateLimit-Limit": str(limite),
+    })
+
+
+class TestPoolCredenciales(unittest.TestCase):
+    """Pruebas de la elección de credencial."""
+
+    def setUp(self):
+        self.ahora = 1000.0
+        self.planificador = PlanificadorGithub(reloj=lambda: self.ahora)
+        self.a, self.b, self.c = (
+            TokenEstatico("a"), TokenEstatico("b"), TokenEstatico("c")
+        )
+        self.pool = PoolCredenciales(
+            [self.a, self.b, self.c], self.planificador
+        )
+
+    def test_elige_la_de_mas_presupuesto(self):
+        """Se usa la credencial con más presupuesto restante."""
+        self.planificador.actualizar(self.a.etiqueta, cabeceras(100, 2000))
+        self.planificador.actualizar(self.b.etiqueta, cabeceras(4000, 2000))
+        self.planificador.actualizar(self.c.etiqueta, cabeceras(50, 2000))
+
+        self.assertIs(self.pool.elegir(), self.b)
+
+    def test_sin_presupuesto_conocido_se_turnan(self):
+        """Las credenciales aún sin datos se reparten por turnos."""
+        elegidas = [self.pool.elegir() for _ in range(3)]
+
+        self.assertEqual(elegidas, [self.a, self.b, self.c])
+
+    def test_agotada_queda_fuera_hasta_el_reinicio(self):
+        """Un token agotado no se usa hasta que se reinicia su ventana."""
+        for credencial in (self.b, self.c):
+            self.planificador.actualizar(
+                credencial.etiqueta, cabeceras(0, 2000)
+            )
+
+        self.assertEqual({self.pool.elegir() for _ in range(3)}, {self.a})
+
+        self.ahora = 2000.0
+        self.assertEqual(
+            {self.pool.elegir() for _ in range(3)}, {self.a, self.b, self.c}
+        )
+
+    def test_todas_agotadas_usa_la_primera_en_reiniciarse(self):
+        """Si no queda presupuesto se elige la que antes se reinicia."""
+        for credencial, reinicio in ((self.a, 3000), (self.b, 1500),
+                                     (self.c, 2000)):
+            self.planificador.actualizar(
+                credencial.etiqueta, cabeceras(0, reinicio)
+            )
+
+        self.assertFalse(self.pool.hay_disponible())
+        self.assertIs(self.pool.elegir(), self.b)
+        self.assertTrue(
+            self.pool.estadisticas()[self.b.etiqueta]["agotada"]
+        )
+
+    def test_instalacion_solo_para_su_propietario(self):
+        """Una instalación de App solo se elige para su propia cuenta."""
+        app = TokenInstalacionApp("1", "clave", "42", lambda: None, "Org")
+        self.planificador.actualizar(app.etiqueta, cabeceras(5000, 2000))
+        self.planificador.actualizar(self.a.etiqueta, cabeceras(10, 2000))
+        pool = PoolCredenciales([self.a, app], self.planificador)
+
+        self.assertIs(pool.elegir("org"), app)
+        self.assertIs(pool.elegir("otra"), self.a)
+        self.assertIs(pool.elegir(), self.a)
+
+    def test_sin_credencial_para_el_propietario(self):
+        """Si ninguna credencial ve al propietario se va sin autenticar."""
+        app = TokenInstalacionApp("1", "clave", "42", lambda: None, "org")
+        pool = PoolCredenciales([app], self.planificador)
+
+        self.assertIsNone(pool.elegir("otra"))
+        self.assertFalse(pool.hay_disponible("otra"))
+        self.assertTrue(pool.hay_disponible("org"))
+
+    @patch("app.utils.credenciales_github.Config.GITHUB_APP_INSTALACIONES",
+           "org:42, usuario:7")
+    @patch("app.utils.credenciales_github.Config.GITHUB_APP_CLAVE_PRIVADA",
+           "clave")
+    @patch("app.utils.credenciales_github.Config.GITHUB_APP_ID", "1")
+    @patch("app.utils.credenciales_github.Config.GITHUB_TOKENS", "")
+    @patch("app.utils.credenciales_github.Config.GITHUB_TOKEN", None)
+    def test_crear_pool_con_instalaciones(self):
+        """Cada instalación se configura como propietario:id."""
+        pool = crear_pool(self.planificador, lambda: None)
+
+        self.assertEqual(
+            [(c.propietario, c.instalacion) for c in pool.credenciales],
+            [("org", "42"), ("usuario", "7")]
+        )
+
+    @patch("app.utils.credenciales_github.Config.GITHUB_APP_INSTALACIONES",
+           "42")
+    @patch("app.utils.credenciales_github.Config.GITHUB_APP_CLAVE_PRIVADA",
+           "clave")
+    @patch("app.utils.credenciales_github.Config.GITHUB_APP_ID", "1")
+    def test_crear_pool_instalacion_sin_propietario(self):
+        """Una instalación sin propietario es un error de configuración."""
+        with self.assertRaises(ValueError):
+            crear_pool(self.planificador, lambda: None)
+
+    @patch("app.utils.credenciales_github.Config.GITHUB_APP_ID", None)
+    @patch("app.utils.credenciales_github.Config.GITHUB_TOKENS", "b, a ,")
+    @patch("app.utils.credenciales_github.Config.GITHUB_TOKEN", "a")
+    def test_crear_pool_desde_la_configuracion(self):
+        """GITHUB_TOKEN y GITHUB_TOKENS se combinan sin duplicados."""
+        pool = crear_pool(self.planificador, lambda: None)
+
+        self.assertEqual(
+            [credencial.etiqueta for credencial in pool.credenciales],
+            [self.a.etiqueta, self.b.etiqueta]
+        )
+
+
+class TestTokenInstalacionApp(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de los tokens de instalación de una GitHub App."""
+
+    async def test_renueva_antes_de_caducar(self):
+        """El token se reutiliza y se renueva al acercarse su caducidad."""
+        self.ahora = 1_700_000_000.0
+        emitidos = []
+
+        def handler(request: httpx.Request):
+            emitidos.append(request.headers["Authorization"])
+            return httpx.Response(201, json={
+                "token": f"ghs_{len(emitidos)}",
+                "expires_at": "2023-11-14T23:13:20Z",
+            })
+
+        cliente = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        token = TokenInstalacionApp(
+            "123", "clave", "42", lambda: cliente,
+            "org", firmar=lambda app_id, _clave, _ahora: f"jwt-{app_id}",
+            reloj=lambda: self.ahora
+        )
+
+        with patch("app.utils.credenciales_github.Config.GITHUB_API_URL",
+                   "https://api.github.com"):
+            primero = await token.authorization()
+            repetido = await token.authorization()
+            # 2023-11-14T23:13:20Z es 1_700_003_600: faltan menos de 5 min
+            self.ahora = 1_700_003_400.0
+            renovado = await token.authorization()
+
+        await cliente.aclose()
+        self.assertEqual(primero, "Bearer ghs_1")
+        self.assertEqual(repetido, primero)
+        self.assertEqual(renovado, "Bearer ghs_2")
+        self.assertEqual(emitidos, ["Bearer jwt-123", "Bearer jwt-123"])
+        self.assertEqual(token.etiqueta, "app-42")
+
+    async def test_respuesta_invalida_es_error_de_credencial(self):
+        """Una respuesta sin token se traduce a ErrorCredencial."""
+        cliente = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(201, json={})
+        ))
+        token = TokenInstalacionApp(
+            "123", "clave", "42", lambda: cliente, "org",
+            firmar=lambda *_: "jwt"
+        )
+
+        with patch("app.utils.credenciales_github.Config.GITHUB_API_URL",
+                   "https://api.github.com"):
+            with self.assertRaises(ErrorCredencial):
+                await token.authorization()
+
+        await cliente.aclose()
+
+
+class TestEnvioConPool(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del reparto de peticiones entre tokens."""
+
+    def tearDown(self):
+        github_utils.configurar_pool(None)
+
+    async def test_token_agotado_cambia_de_token_sin_esperar(self):
+        """Un 403 por límite se reintenta en el acto con otro token."""
+        usados = []
+
+        def handler(request: httpx.Request):
+            usados.append(request.headers["Authorization"])
+            if request.headers["Authorization"] == "Bearer a":
+                return httpx.Response(
+                    403, headers=cabeceras(0, 9_999_999_999)
+                )
+            return httpx.Response(200, json=[{"name": "repo1"}])
+
+        cliente = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        planificador = PlanificadorGithub()
+        github_utils.configurar_pool(PoolCredenciales(
+            [TokenEstatico("a"), TokenEstatico("b")], planificador
+        ))
+        esperar = AsyncMock()
+
+        with patch("app.utils.github_utils.obtener_cliente",
+                   return_value=cliente), \
+                patch("app.utils.github_utils.Config.GITHUB_API_URL",
+                      "https://api.github.com"), \
+                patch("app.utils.github_utils.obtener_planificador",
+                      return_value=planificador), \
+                patch.object(PlanificadorGithub, "esperar_reintento",
+                             esperar):
+            repos = await github_utils.get_repos("usuario")
+
+        await cliente.aclose()
+        self.assertEqual(repos, [{"name": "repo1"}])
+        self.assertEqual(usados, ["Bearer a", "Bearer b"])
+        esperar.assert_not_called()
+
+    async def test_instalacion_se_usa_para_su_propietario(self):
+        """Cada URL se autentica con una credencial que ve a su dueño."""
+        usados = []
+
+        def handler(request: httpx.Request):
+            usados.append(
+                (request.url.path, request.headers["Authorization"])
+            )
+            return httpx.Response(200, json=[])
+
+        cliente = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        planificador = PlanificadorGithub()
+        app = TokenInstalacionApp(
+            "1", "clave", "42", lambda: cliente, "org",
+            firmar=lambda *_: "jwt"
+        )
+        app.authorization = AsyncMock(return_value="Bearer ghs_app")
+        pat = TokenEstatico("pat")
+        planificador.actualizar(pat.etiqueta, cabeceras(10, 9_999_999_999))
+        planificador.actualizar(app.etiqueta, cabeceras(5000, 9_999_999_999))
+        github_utils.configurar_pool(
+            PoolCredenciales([pat, app], planificador)
+        )
+
+        with patch("app.utils.github_utils.obtener_cliente",
+                   return_value=cliente), \
+                patch("app.utils.github_utils.Config.GITHUB_API_URL",
+                      "https://api.github.com"), \
+                patch("app.utils.github_utils.obtener_planificador",
+                      return_value=planificador):
+            await github_utils.get_repos("org")
+            await github_utils.get_repos("otra")
+
+        await cliente.aclose()
+        self.assertEqual(usados, [
+            ("/users/org/repos", "Bearer ghs_app"),
+            ("/users/otra/repos", "Bearer pat"),
+        ])
+
+    async def test_error_de_credencial_es_error_de_github(self):
+        """Un fallo al renovar el token se traduce a GithubAPIException."""
+        planificador = PlanificadorGithub()
+        app = TokenInstalacionApp(
+            "1", "clave", "42", lambda: None, "usuario",
+            firmar=lambda *_: "jwt"
+        )
+        app.authorization = AsyncMock(side_effect=ErrorCredencial("sin PyJWT"))
+        github_utils.configurar_pool(PoolCredenciales([app], planificador))
+        cliente = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json=[])
+        ))
+
+        with patch("app.utils.github_utils.obtener_cliente",
+                   return_value=cliente), \
+                patch("app.utils.github_utils.Config.GITHUB_API_URL",
+                      "https://api.github.com"), \
+                patch("app.utils.github_utils.obtener_planificador",
+                      return_value=planificador):
+            with self.assertRaises(github_utils.GithubAPIException):
+                await github_utils.get_repos("usuario")
+
+        await cliente.aclose()
+
+
+if __name__ == "__main__":
+    unittest.main()
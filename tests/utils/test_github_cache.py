@@ -0,0 +1,143 @@
+"""Pruebas unitarias de la caché de respuestas de GitHub."""
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import httpx
+from app.utils import github_utils
+from app.utils.github_cache import (
+    CacheDisco,
+    CacheMemoria,
+    CacheRespuestas,
+    clave_cache
+)
+
+
+class TestBackends(unittest.TestCase):
+    """Pruebas de los backends de la caché."""
+
+    def test_cache_memoria_descarta_la_menos_usada(self):
+        """Al superar el tamaño máximo se descarta la entrada LRU."""
+        cache = CacheMemoria(max_entradas=2)
+        cache.guardar("a", {"cuerpo": "1"})
+        cache.guardar("b", {"cuerpo": "2"})
+        cache.obtener("a")  # "a" pasa a ser la más reciente
+        cache.guardar("c", {"cuerpo": "3"})
+
+        self.assertIsNone(cache.obtener("b"))
+        self.assertIsNotNone(cache.obtener("a"))
+        self.assertEqual(len(cache), 2)
+
+    def test_cache_disco_sobrevive_reinicios(self):
+        """Las entradas siguen ahí al abrir de nuevo el fichero."""
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "cache.sqlite3")
+            cache = CacheDisco(ruta)
+            cache.guardar("url", {"etag": '"abc"', "cuerpo": "[]"})
+            cache.cerrar()
+
+            reabierta = CacheDisco(ruta)
+            self.assertEqual(reabierta.obtener("url")["etag"], '"abc"')
+            reabierta.cerrar()
+
+    def test_cache_disco_descarta_la_menos_usada(self):
+        """El fichero no crece por encima de max_entradas."""
+        self.ahora = 0
+
+        def reloj():
+            self.ahora += 1
+            return self.ahora
+
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "cache.sqlite3")
+            cache = CacheDisco(ruta, max_entradas=2, reloj=reloj)
+            cache.guardar("a", {"cuerpo": "1"})
+            cache.guardar("b", {"cuerpo": "2"})
+            cache.obtener("a")  # "a" pasa a ser la más reciente
+            cache.guardar("c", {"cuerpo": "3"})
+
+            self.assertIsNone(cache.obtener("b"))
+            self.assertIsNotNone(cache.obtener("a"))
+            self.assertEqual(len(cache), 2)
+            cache.cerrar()
+
+            reabierta = CacheDisco(ruta, max_entradas=2)
+            self.assertEqual(len(reabierta), 2)
+            reabierta.cerrar()
+
+    def test_clave_cache_ordena_parametros(self):
+        """El orden de los parámetros no cambia la clave."""
+        self.assertEqual(
+            clave_cache("u", {"b": 1, "a": 2}),
+            clave_cache("u", {"a": 2, "b": 1})
+        )
+
+
+class TestCacheRespuestasDisco(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de la caché de respuestas con el backend en disco."""
+
+    async def test_guardar_y_buscar_fuera_del_bucle(self):
+        """Las operaciones del backend bloqueante se hacen en otro hilo."""
+        with tempfile.TemporaryDirectory() as directorio:
+            backend = CacheDisco(os.path.join(directorio, "c.sqlite3"))
+            cache = CacheRespuestas(backend)
+
+            with patch("app.utils.github_cache.asyncio.to_thread",
+                       wraps=asyncio.to_thread) as to_thread:
+                await cache.guardar("url", "[]", {"etag": '"v1"'})
+                entrada = await cache.buscar("url")
+
+            self.assertEqual(entrada["etag"], '"v1"')
+            self.assertEqual(to_thread.call_count, 2)
+            backend.cerrar()
+
+class TestPeticionesCondicionales(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de las peticiones condicionales contra GitHub."""
+
+    def setUp(self):
+        self.peticiones = []
+
+        def handler(request: httpx.Request):
+            self.peticiones.append(request)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(
+                200, json=[{"name": "repo1"}], headers={"ETag": '"v1"'}
+            )
+
+        self.cliente = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        )
+        self.cache_anterior = github_utils.obtener_cache()
+        self.cache = CacheRespuestas(CacheMemoria())
+        github_utils.configurar_cache(self.cache)
+        for parche in (
+            patch("app.utils.github_utils.obtener_cliente",
+                  return_value=self.cliente),
+            patch("app.utils.github_utils.Config.GITHUB_API_URL",
+                  "https://api.github.com"),
+        ):
+            parche.start()
+            self.addCleanup(parche.stop)
+
+    async def asyncTearDown(self):
+        github_utils.configurar_cache(self.cache_anterior)
+        await self.cliente.aclose()
+
+    async def test_304_se_sirve_desde_la_cache(self):
+        """La segunda petición es condicional y reutiliza el cuerpo."""
+        primera = await github_utils.get_repos("usuario")
+        segunda = await github_utils.get_repos("usuario")
+
+        self.assertEqual(primera, segunda)
+        self.assertNotIn("If-None-Match", self.peticiones[0].headers)
+        self.assertEqual(self.peticiones[1].headers["If-None-Match"], '"v1"')
+        self.assertEqual(
+            self.cache.estadisticas(),
+            {"aciertos": 1, "fallos": 1, "entradas": 1}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,12 @@
 """Estas son pruebas unitarias."""
 
 
+import asyncio
 import unittest
-from unittest.mock import patch, MagicMock
-import requests
+from datetime import datetime
+from unittest.mock import patch, MagicMock, AsyncMock
+import httpx
+from app.utils import github_utils
 from app.utils.github_utils import (
     get_repos,
     get_commits,
@@ -15,82 +18,105 @@ from app.utils.github_utils import (
 TIMEOUT = 10  # Mismo valor de TIMEOUT que en la función original
 
 
-class TestGithubUtils(unittest.TestCase):
+def respuesta(datos, status_code=200):
+    """Construye una respuesta httpx con un request asociado."""
+    return httpx.Response(
+        status_code,
+        json=datos,
+        request=httpx.Request("GET", "https://api.github.com/test")
+    )
+
+
+def cliente_mock(**kwargs):
+    """Crea un cliente asíncrono simulado con el método get mockeado."""
+    cliente = MagicMock()
+    cliente.get = AsyncMock(**kwargs)
+    return cliente
+
+
+class TestGithubUtils(unittest.IsolatedAsyncioTestCase):
     """Pruebas unitarias para las funciones
     que interactúan con la API de GitHub."""
 
-    @patch("app.utils.github_utils.requests.get")
-    def test_get_repos_success(self, mock_get):
+    @patch("app.utils.github_utils.obtener_cliente")
+    async def test_get_repos_success(self, mock_cliente):
         """Prueba de éxito para la función get_repos."""
-        # Configuramos el mock de la respuesta
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = [
-            {"name": "repo1"},
-            {"name": "repo2"},
-        ]  # Simulamos dos repositorios
-        mock_get.return_value = mock_response
+        # Simulamos dos repositorios
+        mock_cliente.return_value = cliente_mock(
+            return_value=respuesta([{"name": "repo1"}, {"name": "repo2"}])
+        )
 
         # Llamamos a la función y verificamos que devuelve lo esperado
-        repos = get_repos("usuario_prueba")
+        repos = await get_repos("usuario_prueba")
         self.assertEqual(repos, [{"name": "repo1"}, {"name": "repo2"}])
 
-    @patch("app.utils.github_utils.requests.get")
-    def test_get_repos_timeout(self, mock_get):
+    @patch("app.utils.github_utils.obtener_cliente")
+    async def test_get_repos_timeout(self, mock_cliente):
         """Prueba para un error de tiempo de espera (Timeout)."""
         # Simulamos un timeout
-        mock_get.side_effect = requests.exceptions.Timeout
+        mock_cliente.return_value = cliente_mock(
+            side_effect=httpx.TimeoutException("Timeout")
+        )
         with self.assertRaises(GithubAPIException):
-            get_repos("usuario_prueba")
+            await get_repos("usuario_prueba")
 
-    @patch("app.utils.github_utils.requests.get")
-    def test_get_repos_request_exception(self, mock_get):
+    @patch("app.utils.github_utils.obtener_cliente")
+    async def test_get_repos_request_exception(self, mock_cliente):
         """Prueba para una excepción general en la
         solicitud
-        (RequestException)."""
-        # Simulamos una excepción de tipo RequestException
-        mock_get.side_effect = requests.exceptions.RequestException(
-            "Error de conexión")
+        (RequestError)."""
+        # Simulamos una excepción de conexión
+        mock_cliente.return_value = cliente_mock(
+            side_effect=httpx.ConnectError("Error de conexión")
+        )
         with self.assertRaises(GithubAPIException):
-            get_repos("usuario_prueba")
+            await get_repos("usuario_prueba")
 
-    @patch("app.utils.github_utils.requests.get")
-    def test_get_commits_success(self, mock_get):
+    @patch("app.utils.github_utils.obtener_cliente")
+    async def test_get_repos_http_error(self, mock_cliente):
+        """Un estado HTTP de error se traduce a GithubAPIException."""
+        mock_cliente.return_value = cliente_mock(
+            return_value=respuesta({"message": "Not Found"}, 404)
+        )
+        with self.assertRaises(GithubAPIException):
+            await get_repos("usuario_prueba")
+
+    @patch("app.utils.github_utils.obtener_cliente")
+    async def test_get_commits_success(self, mock_cliente):
         """Prueba de éxito para la función get_commits."""
-        # Configuramos el mock de la respuesta
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = [
-            {"sha": "commit1"},
-            {"sha": "commit2"},
-        ]  # Simulamos dos commits
-        mock_get.return_value = mock_response
+        # Simulamos dos commits
+        mock_cliente.return_value = cliente_mock(
+            return_value=respuesta([{"sha": "commit1"}, {"sha": "commit2"}])
+        )
 
         # Llamamos a la función y verificamos que devuelve lo esperado
-        commits = get_commits("usuario_prueba", "repo_prueba")
+        commits = await get_commits("usuario_prueba", "repo_prueba")
         self.assertEqual(commits, [{"sha": "commit1"}, {"sha": "commit2"}])
 
-    @patch("app.utils.github_utils.requests.get")
-    def test_get_commits_timeout(self, mock_get):
+    @patch("app.utils.github_utils.obtener_cliente")
+    async def test_get_commits_timeout(self, mock_cliente):
         """Prueba para un error de
         tiempo de espera (Timeout) en get_commits."""
         # Simulamos un timeout
-        mock_get.side_effect = requests.exceptions.Timeout
+        mock_cliente.return_value = cliente_mock(
+            side_effect=httpx.TimeoutException("Timeout")
+        )
         with self.assertRaises(GithubAPIException):
-            get_commits("usuario_prueba", "repo_prueba")
+            await get_commits("usuario_prueba", "repo_prueba")
 
-    @patch("app.utils.github_utils.requests.get")
-    def test_get_commits_request_exception(self, mock_get):
+    @patch("app.utils.github_utils.obtener_cliente")
+    async def test_get_commits_request_exception(self, mock_cliente):
         """Prueba para una excepción general en la solicitud
-        (RequestException) en get_commits."""
-        # Simulamos una excepción de tipo RequestException
-        mock_get.side_effect = requests.exceptions.RequestException(
-            "Error de conexión")
+        (RequestError) en get_commits."""
+        # Simulamos una excepción de conexión
+        mock_cliente.return_value = cliente_mock(
+            side_effect=httpx.ConnectError("Error de conexión")
+        )
         with self.assertRaises(GithubAPIException):
-            get_commits("usuario_prueba", "repo_prueba")
+            await get_commits("usuario_prueba", "repo_prueba")
 
-    @patch("app.utils.github_utils.requests.get")
-    def test_get_pull_requests_success(self, mock_get):
+    @patch("app.utils.github_utils.obtener_cliente")
+    async def test_get_pull_requests_success(self, mock_cliente):
         """Prueba de la función get_pull_requests
         cuando la respuesta es exitosa."""
         mock_prs = [
@@ -98,11 +124,12 @@ class TestGithubUtils(unittest.TestCase):
             {"id": 2, "state": "closed", "title": "PR 2"},
             {"id": 3, "state": "closed", "title": "PR 3", "merged": True}
         ]
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.json.return_value = mock_prs
+        mock_cliente.return_value = cliente_mock(
+            return_value=respuesta(mock_prs)
+        )
 
         # Llamamos a la función para obtener los pull requests
-        prs = get_pull_requests("user_test", "repo_test")
+        prs = await get_pull_requests("user_test", "repo_test")
 
         # Verificamos que se han obtenido correctamente los PRs
         self.assertEqual(len(prs), 3)
@@ -110,46 +137,65 @@ class TestGithubUtils(unittest.TestCase):
         self.assertEqual(prs[1]["state"], "closed")
         self.assertTrue("merged" in prs[2])
 
-    @patch("app.utils.github_utils.requests.get")
-    def test_get_pull_requests_timeout(self, mock_get):
+    @patch("app.utils.github_utils.obtener_cliente")
+    async def test_get_pull_requests_timeout(self, mock_cliente):
         """Prueba de la función get_pull_requests cuando ocurre un timeout."""
         # Simulamos que la petición a la API genera un timeout
-        mock_get.side_effect = requests.exceptions.Timeout("Timeout error")
+        mock_cliente.return_value = cliente_mock(
+            side_effect=httpx.TimeoutException("Timeout error")
+        )
 
         # Verificamos que se lanza una excepción de tipo GithubAPIException
         with self.assertRaises(GithubAPIException):
-            get_pull_requests("user_test", "repo_test")
+            await get_pull_requests("user_test", "repo_test")
 
-    @patch("app.utils.github_utils.requests.get")
-    def test_get_pull_requests_request_exception(self, mock_get):
+    @patch("app.utils.github_utils.obtener_cliente")
+    async def test_get_pull_requests_request_exception(self, mock_cliente):
         """Prueba de la función get_pull_requests
-        cuando ocurre una RequestException."""
+        cuando ocurre un RequestError."""
         # Simulamos un error genérico en la petición a la API
-        mock_get.side_effect = requests.exceptions.RequestException(
-            "Request error"
+        mock_cliente.return_value = cliente_mock(
+            side_effect=httpx.RequestError("Request error")
         )
 
         # Verificamos que se lanza una excepción de tipo GithubAPIException
         with self.assertRaises(GithubAPIException):
-            get_pull_requests("user_test", "repo_test")
+            await get_pull_requests("user_test", "repo_test")
 
-    @patch("app.utils.github_utils.requests.get")
-    def test_get_dependabot_alerts_success(self, mock_get):
+    @patch("app.utils.github_utils.obtener_cliente")
+    async def test_get_dependabot_alerts_success(self, mock_cliente):
         """Prueba de éxito para la función get_dependabot_alerts."""
         # Simulamos la respuesta de la API
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = [
-            {
-                "number": 1,
-                "state": "open",
-                "dependency": {"package": {"name": "requests"}},
-                "created_at": "2024-03-01T00:00:00Z"
-            }
-        ]
-        mock_get.return_value = mock_response
+        mock_cliente.return_value = cliente_mock(
+            return_value=respuesta([
+                {
+                    "number": 3,
+                    "state": "open",
+                    "dependency": {"package": {"name": "urllib3"}},
+                    "created_at": "2024-04-02T00:00:00Z"
+                },
+                {
+                    "number": 2,
+                    "state": "open",
+                    "dependency": {"package": {"name": "idna"}},
+                    "created_at": "2024-04-01T23:59:59Z"
+                },
+                {
+                    "number": 1,
+                    "state": "open",
+                    "dependency": {"package": {"name": "requests"}},
+                    "created_at": "2024-03-01T00:00:00Z"
+                },
+                {
+                    "number": 0,
+                    "state": "open",
+                    "dependency": {"package": {"name": "httpx"}},
+                    "created_at": "2023-12-31T23:59:59Z"
+                }
+            ])
+        )
 
-        result = get_dependabot_alerts(
+        result = await get_dependabot_alerts(
             repo_owner="test-org",
             repo_name="test-repo",
             state="open",
@@ -157,33 +203,226 @@ class TestGithubUtils(unittest.TestCase):
             end_date="2024-04-01"
         )
 
+        # Solo las creadas dentro del rango; el día final cuenta entero
         self.assertIsInstance(result, list)
-        self.assertEqual(len(result), 1)
+        self.assertEqual([alerta["number"] for alerta in result], [2, 1])
         self.assertEqual(result[0]["state"], "open")
 
-        # Validamos que los parámetros hayan sido pasados correctamente
-        called_params = mock_get.call_args[1]["params"]
+        # La API no filtra por fecha: se ordena por creación y se filtra
+        # en el cliente
+        called_params = mock_cliente.return_value.get.call_args[1]["params"]
         self.assertEqual(called_params["state"], "open")
-        self.assertEqual(called_params["created"], "<=2024-04-01")
+        self.assertEqual(called_params["sort"], "created")
+        self.assertNotIn("created", called_params)
 
-    @patch("app.utils.github_utils.requests.get")
-    def test_get_dependabot_alerts_timeout(self, mock_get):
+    @patch("app.utils.github_utils.obtener_cliente")
+    async def test_get_dependabot_alerts_timeout(self, mock_cliente):
         """Prueba para un error de Timeout en get_dependabot_alerts."""
-        mock_get.side_effect = requests.exceptions.Timeout
+        mock_cliente.return_value = cliente_mock(
+            side_effect=httpx.TimeoutException("Timeout")
+        )
 
         with self.assertRaises(GithubAPIException):
-            get_dependabot_alerts("org", "repo")
+            await get_dependabot_alerts("org", "repo")
 
-    @patch("app.utils.github_utils.requests.get")
-    def test_get_dependabot_alerts_request_exception(self, mock_get):
-        """Prueba para una excepción RequestException
-        en get_dependabot_alerts."""
-        mock_get.side_effect = requests.exceptions.RequestException(
-            "Error general"
+    @patch("app.utils.github_utils.obtener_cliente")
+    async def test_get_dependabot_alerts_request_exception(
+        self, mock_cliente
+    ):
+        """Prueba para un RequestError en get_dependabot_alerts."""
+        mock_cliente.return_value = cliente_mock(
+            side_effect=httpx.RequestError("Error general")
         )
 
         with self.assertRaises(GithubAPIException):
-            get_dependabot_alerts("org", "repo")
+            await get_dependabot_alerts("org", "repo")
+
+
+class TestPaginacion(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de la paginación por cabecera Link."""
+
+    def setUp(self):
+        self.peticiones = []
+        self.total_paginas = 3
+
+        def handler(request: httpx.Request):
+            self.peticiones.append(request.url)
+            pagina = int(request.url.params.get("page", "1"))
+            headers = {}
+            if pagina < self.total_paginas:
+                siguiente = request.url.copy_set_param("page", pagina + 1)
+                headers["Link"] = f'<{siguiente}>; rel="next"'
+            return httpx.Response(
+                200, json=[{"pagina": pagina}], headers=headers
+            )
+
+        # Cada prueba puede sustituir el handler por uno propio
+        self.handler = handler
+        self.cliente = httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: self.handler(request)
+            )
+        )
+        parche = patch(
+            "app.utils.github_utils.obtener_cliente",
+            return_value=self.cliente
+        )
+        parche.start()
+        self.addCleanup(parche.stop)
+        parche_url = patch(
+            "app.utils.github_utils.Config.GITHUB_API_URL",
+            "https://api.github.com"
+        )
+        parche_url.start()
+        self.addCleanup(parche_url.stop)
+
+    async def asyncTearDown(self):
+        await self.cliente.aclose()
+
+    async def test_paginar_sigue_link_next(self):
+        """Se recorren todas las páginas con per_page=100."""
+        paginas = [
+            pagina async for pagina in github_utils.paginar(
+                "https://api.github.com/items", {}
+            )
+        ]
+
+        self.assertEqual(paginas, [[{"pagina": 1}], [{"pagina": 2}],
+                                   [{"pagina": 3}]])
+        self.assertEqual(self.peticiones[0].params["per_page"], "100")
+
+    async def test_get_pull_requests_devuelve_todas_las_paginas(self):
+        """get_pull_requests ya no se queda en la primera página."""
+        prs = await get_pull_requests("owner", "repo")
+
+        self.assertEqual(len(prs), 3)
+        self.assertEqual(self.peticiones[0].params["state"], "all")
+
+    async def test_pull_requests_recientes_corta_fuera_de_ventana(self):
+        """La paginación se detiene al llegar a PRs fuera de la ventana."""
+        self.total_paginas = 10
+        fechas = {1: "2025-04-20T00:00:00Z", 2: "2025-04-10T00:00:00Z"}
+
+        def handler(request: httpx.Request):
+            self.peticiones.append(request.url)
+            pagina = int(request.url.params.get("page", "1"))
+            siguiente = request.url.copy_set_param("page", pagina + 1)
+            fecha = fechas.get(pagina, "2024-01-01T00:00:00Z")
+            return httpx.Response(
+                200,
+                json=[{"number": pagina, "created_at": fecha}],
+                headers={"Link": f'<{siguiente}>; rel="next"'}
+            )
+
+        self.handler = handler
+        prs = [
+            pr async for pr in github_utils.iterar_pull_requests_recientes(
+                "owner", "repo", datetime(2025, 4, 1)
+            )
+        ]
+
+        self.assertEqual([pr["number"] for pr in prs], [1, 2])
+        self.assertEqual(self.peticiones[0].params["sort"], "created")
+        self.assertEqual(self.peticiones[0].params["direction"], "desc")
+        # Página 3 fuera de ventana y, como mucho, la 4 precargada
+        self.assertLessEqual(len(self.peticiones), 4)
+
+    async def test_paginar_cancela_prefetch_al_cortar(self):
+        """Si el llamador corta, no se piden páginas de más."""
+        self.total_paginas = 10
+        paginas = github_utils.paginar("https://api.github.com/items", {})
+        async for _pagina in paginas:
+            break
+        await paginas.aclose()
+
+        # Solo la primera página y, como mucho, la precargada
+        self.assertLessEqual(len(self.peticiones), 2)
+
+    async def test_llamadas_concurrentes_identicas_se_agrupan(self):
+        """Varias llamadas iguales a la vez comparten las peticiones."""
+        resultados = await asyncio.gather(
+            *(get_pull_requests("owner", "repo") for _ in range(5))
+        )
+
+        self.assertTrue(all(len(prs) == 3 for prs in resultados))
+        self.assertEqual(len(self.peticiones), 3)
+
+
+class TestClienteGithub(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del cliente de GitHub con configuración propia."""
+
+    async def test_usa_su_sesion_url_base_y_cabeceras(self):
+        """Las rutas se completan sobre su URL base con sus cabeceras."""
+        peticiones = []
+
+        def handler(request: httpx.Request):
+            peticiones.append(request)
+            return httpx.Response(200, json=[{"number": 1}])
+
+        sesion = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        cliente = github_utils.ClienteGithub(
+            url_base="https://github.example.com/api/v3",
+            cabeceras={"User-Agent": "pruebas"},
+            max_reintentos=0,
+            sesion=sesion
+        )
+
+        alertas = [
+            alerta async for alerta in cliente.iterar_dependabot_alerts(
+                "owner", "repo", state="open"
+            )
+        ]
+
+        await sesion.aclose()
+        self.assertEqual(alertas, [{"number": 1}])
+        self.assertEqual(
+            peticiones[0].url.path,
+            "/api/v3/repos/owner/repo/dependabot/alerts"
+        )
+        self.assertEqual(peticiones[0].headers["User-Agent"], "pruebas")
+        self.assertEqual(
+            peticiones[0].headers["X-GitHub-Api-Version"], "2022-11-28"
+        )
+
+    async def test_timeout_de_conexion_y_lectura_separados(self):
+        """Los tiempos de espera de conexión y lectura son independientes."""
+        sesion = MagicMock()
+        sesion.get = AsyncMock(side_effect=httpx.ConnectTimeout("lento"))
+        cliente = github_utils.ClienteGithub(
+            timeout=httpx.Timeout(30, connect=2), sesion=sesion
+        )
+
+        with self.assertRaises(GithubAPIException) as contexto:
+            await cliente.pedir("https://api.github.com/rate_limit", {})
+
+        self.assertIn("30", str(contexto.exception))
+        self.assertEqual(
+            sesion.get.call_args.kwargs["timeout"].connect, 2
+        )
+
+
+class TestClienteCompartido(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del ciclo de vida del cliente HTTP compartido."""
+
+    async def asyncTearDown(self):
+        await github_utils.cerrar_cliente()
+
+    async def test_iniciar_y_cerrar_cliente(self):
+        """El cliente se reutiliza hasta que se cierra."""
+        cliente = await github_utils.iniciar_cliente()
+        self.assertIs(github_utils.obtener_cliente(), cliente)
+        self.assertIs(await github_utils.iniciar_cliente(), cliente)
+
+        await github_utils.cerrar_cliente()
+        self.assertTrue(cliente.is_closed)
+        self.assertIsNot(github_utils.obtener_cliente(), cliente)
+
+    @patch("app.utils.github_utils.find_spec", return_value=None)
+    async def test_crear_cliente_sin_h2(self, _mock_find_spec):
+        """Sin el paquete h2 el cliente usa HTTP/1.1 sin fallar."""
+        cliente = github_utils.crear_cliente()
+        self.assertIsInstance(cliente, httpx.AsyncClient)
+        await cliente.aclose()
 
 
 if __name__ == "__main__":
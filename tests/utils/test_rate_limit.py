@@ -0,0 +1,163 @@
+"""Pruebas unitarias del planificador de límites de uso."""
+import unittest
+from unittest.mock import patch, AsyncMock
+import httpx
+from app.utils import github_utils
+from app.utils.rate_limit import LimiteUsoAgotado, PlanificadorGithub
+
+
+def cabeceras(restante, reinicio, limite=5000, **extra):
+    """Cabeceras X-RateLimit de una respuesta de GitHub."""
+    return httpx.Headers({
+        "X-RateLimit-Remaining": str(restante),
+        "X-RateLimit-Reset": str(reinicio),
+        "X-RateLimit-Limit": str(limite),
+        **extra
+    })
+
+
+class TestPlanificadorGithub(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del planificador de peticiones."""
+
+    def setUp(self):
+        self.ahora = 1000.0
+        self.esperas = []
+
+        async def dormir(segundos):
+            self.esperas.append(segundos)
+
+        self.planificador = PlanificadorGithub(
+            umbral_ritmo=0.2, backoff_base=1, backoff_max=8, espera_max=600,
+            reloj=lambda: self.ahora, dormir=dormir
+        )
+
+    async def test_sin_espera_con_presupuesto_holgado(self):
+        """Con presupuesto de sobra las peticiones no esperan."""
+        self.planificador.actualizar("t", cabeceras(4000, 4600))
+        await self.planificador.esperar_turno("t")
+        self.assertEqual(self.esperas, [])
+
+    async def test_reparte_presupuesto_escaso(self):
+        """Con poco presupuesto las peticiones se espacian hasta el reinicio."""
+        self.planificador.actualizar("t", cabeceras(10, 1100, limite=100))
+        for _ in range(3):
+            await self.planificador.esperar_turno("t")
+
+        # La primera sale ya; la segunda espera 100 s / 10 restantes
+        self.assertEqual(self.esperas[0], 10.0)
+        self.assertGreater(self.esperas[1], self.esperas[0])
+
+    async def test_token_agotado_espera_al_reinicio(self):
+        """Con el presupuesto agotado se espera al reinicio de la ventana."""
+        self.planificador.actualizar("t", cabeceras(0, 1300))
+        await self.planificador.esperar_turno("t")
+        self.assertEqual(self.esperas, [300.0])
+
+    async def test_reparto_largo_no_falla_ni_gasta_presupuesto(self):
+        """
+        Con presupuesto restante el reparto espera lo que haga falta,
+        aunque supere la espera máxima, y cada petición descuenta uno.
+        """
+        planificador = PlanificadorGithub(
+            umbral_ritmo=0.2, espera_max=60,
+            reloj=lambda: self.ahora, dormir=AsyncMock()
+        )
+        planificador.actualizar("t", cabeceras(900, 4000))
+        for _ in range(30):
+            await planificador.esperar_turno("t")
+
+        self.assertEqual(planificador.disponible("t"), 870)
+        espera = planificador._dormir.await_args_list[-1].args[0]
+        self.assertGreater(espera, 60)
+
+    async def test_reinicio_lejano_falla_sin_esperar(self):
+        """Si el reinicio supera la espera máxima no se duerme."""
+        self.planificador.actualizar("t", cabeceras(0, 4600))
+
+        with self.assertRaises(LimiteUsoAgotado) as contexto:
+            await self.planificador.esperar_turno("t")
+
+        self.assertEqual(contexto.exception.reinicio, 4600)
+        self.assertEqual(self.esperas, [])
+
+    def test_retry_after_excesivo_falla_sin_esperar(self):
+        """Un Retry-After mayor que la espera máxima no se respeta."""
+        response = httpx.Response(429, headers={"Retry-After": "3600"})
+
+        with self.assertRaises(LimiteUsoAgotado) as contexto:
+            self.planificador.espera_reintento(0, response)
+
+        self.assertEqual(contexto.exception.reinicio, 4600)
+
+    def test_espera_reintento_respeta_retry_after(self):
+        """Retry-After tiene prioridad sobre el backoff."""
+        response = httpx.Response(403, headers={"Retry-After": "7"})
+        self.assertTrue(self.planificador.es_reintentable(response))
+        self.assertEqual(self.planificador.espera_reintento(0, response), 7)
+
+    def test_403_por_permisos_no_se_reintenta(self):
+        """Un 403 sin señales de límite de uso no se reintenta."""
+        response = httpx.Response(
+            403, headers=cabeceras(4000, 4600)
+        )
+        self.assertFalse(self.planificador.es_reintentable(response))
+
+    def test_backoff_con_jitter_acotado(self):
+        """El backoff exponencial nunca supera el máximo."""
+        response = httpx.Response(502)
+        for intento in range(10):
+            espera = self.planificador.espera_reintento(intento, response)
+            self.assertGreaterEqual(espera, 0)
+            self.assertLessEqual(espera, 8)
+
+
+class TestReintentos(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de los reintentos en las peticiones a GitHub."""
+
+    async def test_reintenta_429_y_devuelve_el_exito(self):
+        """Un 429 seguido de un 200 termina devolviendo los datos."""
+        respuestas = iter([
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(200, json=[{"name": "repo1"}]),
+        ])
+        cliente = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: next(respuestas))
+        )
+
+        with patch("app.utils.github_utils.obtener_cliente",
+                   return_value=cliente), \
+                patch("app.utils.github_utils.Config.GITHUB_API_URL",
+                      "https://api.github.com"), \
+                patch.object(PlanificadorGithub, "esperar_reintento",
+                             AsyncMock()):
+            repos = await github_utils.get_repos("usuario")
+
+        await cliente.aclose()
+        self.assertEqual(repos, [{"name": "repo1"}])
+
+    async def test_limite_agotado_se_traduce_a_excepcion_de_github(self):
+        """Sin presupuesto por delante se lanza GithubLimiteUsoException."""
+        cliente = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(
+                403, headers=cabeceras(0, 9_999_999_999)
+            )
+        ))
+        planificador = PlanificadorGithub(espera_max=60)
+
+        with patch("app.utils.github_utils.obtener_cliente",
+                   return_value=cliente), \
+                patch("app.utils.github_utils.Config.GITHUB_API_URL",
+                      "https://api.github.com"), \
+                patch("app.utils.github_utils.obtener_planificador",
+                      return_value=planificador):
+            with self.assertRaises(
+                github_utils.GithubLimiteUsoException
+            ) as contexto:
+                await github_utils.get_repos("usuario-sin-presupuesto")
+
+        await cliente.aclose()
+        self.assertEqual(contexto.exception.reinicio, 9_999_999_999)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Pruebas unitarias del agrupador de peticiones idénticas."""
+import asyncio
+import unittest
+from app.utils.single_flight import AgrupadorPeticiones
+
+
+class TestAgrupadorPeticiones(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del agrupador single-flight."""
+
+    async def asyncSetUp(self):
+        self.agrupador = AgrupadorPeticiones()
+        self.liberar = asyncio.Event()
+        self.ejecuciones = 0
+
+    async def funcion(self, resultado="ok"):
+        """Petición simulada que espera a que la prueba la libere."""
+        self.ejecuciones += 1
+        await self.liberar.wait()
+        if isinstance(resultado, Exception):
+            raise resultado
+        return resultado
+
+    async def test_llamadas_iguales_comparten_resultado(self):
+        """Solo se ejecuta una vez y todos reciben el resultado."""
+        tareas = [
+            asyncio.create_task(self.agrupador.ejecutar("a", self.funcion))
+            for _ in range(4)
+        ]
+        await asyncio.sleep(0)
+        self.liberar.set()
+
+        self.assertEqual(await asyncio.gather(*tareas), ["ok"] * 4)
+        self.assertEqual(self.ejecuciones, 1)
+        estadisticas = self.agrupador.estadisticas()
+        self.assertEqual(estadisticas["llamadas"], 4)
+        self.assertEqual(estadisticas["agrupadas"], 3)
+        self.assertEqual(estadisticas["en_vuelo"], 0)
+
+    async def test_claves_distintas_no_se_agrupan(self):
+        """Cada clave tiene su propia petición."""
+        self.liberar.set()
+        await asyncio.gather(
+            self.agrupador.ejecutar("a", self.funcion),
+            self.agrupador.ejecutar("b", self.funcion)
+        )
+
+        self.assertEqual(self.ejecuciones, 2)
+
+    async def test_excepcion_llega_a_todos(self):
+        """Un error de la petición se propaga a todas las llamadas."""
+        tareas = [
+            asyncio.create_task(self.agrupador.ejecutar(
+                "a", lambda: self.funcion(ValueError("fallo"))
+            ))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        self.liberar.set()
+
+        resultados = await asyncio.gather(*tareas, return_exceptions=True)
+        self.assertTrue(all(isinstance(r, ValueError) for r in resultados))
+
+    async def test_cancelar_una_llamada_no_afecta_al_resto(self):
+        """La petición sigue en vuelo si uno de los llamadores se cancela."""
+        primera = asyncio.create_task(
+            self.agrupador.ejecutar("a", self.funcion)
+        )
+        segunda = asyncio.create_task(
+            self.agrupador.ejecutar("a", self.funcion)
+        )
+        await asyncio.sleep(0)
+        primera.cancel()
+        self.liberar.set()
+
+        self.assertEqual(await segunda, "ok")
+        self.assertTrue(primera.cancelled())
+
+
+if __name__ == "__main__":
+    unittest.main()